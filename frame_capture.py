@@ -0,0 +1,336 @@
+"""
+Frame Capture - export snake games as image sequences, animated GIFs or raw video.
+
+Frames are drawn into an offscreen Surface, copied out as raw RGB bytes and
+handed through a bounded queue to an encoder thread, so whatever draws them
+never waits on PNG or GIF compression. When the encoder falls behind,
+capture() waits for room in the queue (or drops the frame with drop=True)
+rather than buffering without limit.
+
+Games are captured from replays, which reproduce them exactly:
+
+    python frame_capture.py replays/Hard_Classic.snkr clip.gif --last 10
+    python frame_capture.py game.snkr frames/        # numbered PNG files
+    python frame_capture.py game.snkr game.rgb       # raw RGB24 stream
+
+A raw stream can be turned into video with, for example,
+ffmpeg -f rawvideo -pix_fmt rgb24 -s 800x600 -r 12 -i game.rgb game.mp4
+"""
+import argparse
+import os
+import queue
+import struct
+import sys
+import threading
+
+import numpy as np
+import pygame
+
+from snake_replay import Replay, replay_actions
+
+# Frames waiting for the encoder before capture() blocks or drops
+QUEUE_SIZE = 32
+
+# Seconds the last frame stays up at the end of a capture
+HOLD_SECONDS = 2.0
+
+# GIF palette: 6 levels of red and blue and 7 of green; the spare entries
+# after it are black and the last one marks unchanged pixels
+GIF_LEVELS = (6, 7, 6)
+TRANSPARENT = 255
+MAX_CODE = 4096
+
+def gif_palette():
+    """Return the 256-colour GIF palette as 768 bytes."""
+    red, green, blue = GIF_LEVELS
+    palette = bytearray(768)
+    for index in range(red * green * blue):
+        r, g, b = index // (green * blue), index // blue % green, index % blue
+        palette[index * 3:index * 3 + 3] = (
+            r * 255 // (red - 1), g * 255 // (green - 1), b * 255 // (blue - 1))
+    return bytes(palette)
+
+def quantize(rgb):
+    """Map an (height, width, 3) uint8 array to GIF palette indices."""
+    red, green, blue = GIF_LEVELS
+    levels = rgb.astype(np.uint16)
+    r = (levels[..., 0] * (red - 1) + 127) // 255
+    g = (levels[..., 1] * (green - 1) + 127) // 255
+    b = (levels[..., 2] * (blue - 1) + 127) // 255
+    return (r * (green * blue) + g * blue + b).astype(np.uint8)
+
+def lzw_encode(indices):
+    """Compress 8-bit palette indices into GIF LZW data, without the sub-block framing."""
+    clear, end = 256, 257
+    out = bytearray()
+    bits = clear
+    bit_count = code_size = 9
+    table = {}
+    next_code = end + 1
+    prefix = indices[0]
+    for index in indices[1:]:
+        key = prefix << 8 | index
+        code = table.get(key)
+        if code is not None:
+            prefix = code
+            continue
+        bits |= prefix << bit_count
+        bit_count += code_size
+        if next_code < MAX_CODE:
+            table[key] = next_code
+            if next_code == 1 << code_size:
+                code_size += 1
+            next_code += 1
+        else:
+            # Table full: start over
+            bits |= clear << bit_count
+            bit_count += code_size
+            table = {}
+            next_code = end + 1
+            code_size = 9
+        while bit_count >= 8:
+            out.append(bits & 0xFF)
+            bits >>= 8
+            bit_count -= 8
+        prefix = index
+    bits |= prefix << bit_count
+    bit_count += code_size
+    bits |= end << bit_count
+    bit_count += code_size
+    while bit_count > 0:
+        out.append(bits & 0xFF)
+        bits >>= 8
+        bit_count -= 8
+    return bytes(out)
+
+def sub_blocks(data):
+    """Split data into GIF sub-blocks of up to 255 bytes, with the terminator."""
+    out = bytearray()
+    for start in range(0, len(data), 255):
+        chunk = data[start:start + 255]
+        out.append(len(chunk))
+        out += chunk
+    out.append(0)
+    return bytes(out)
+
+class ImageSequenceWriter:
+    """Writes each frame to its own numbered image file in a directory."""
+
+    def __init__(self, directory, extension="png"):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.extension = extension
+        self.count = 0
+
+    def write(self, data, size):
+        surface = pygame.image.frombytes(data, size, "RGB")
+        pygame.image.save(surface, os.path.join(self.directory, f"frame_{self.count:05d}.{self.extension}"))
+        self.count += 1
+
+    def close(self):
+        pass
+
+class RawVideoWriter:
+    """Writes frames back to back as raw RGB24 bytes, to a file or "-" for stdout."""
+
+    def __init__(self, path):
+        self.file = sys.stdout.buffer if path == "-" else open(path, "wb")
+        self.count = 0
+
+    def write(self, data, size):
+        self.file.write(data)
+        self.count += 1
+
+    def close(self):
+        if self.file is sys.stdout.buffer:
+            self.file.flush()
+        else:
+            self.file.close()
+
+class GifWriter:
+    """Writes frames as a looping animated GIF.
+
+    Each frame after the first only stores the rectangle that changed, with
+    unchanged pixels in it left transparent, and a frame identical to the one
+    before just lengthens that frame's delay. step=2 keeps every second pixel
+    in each direction, a quarter of the encoding work.
+    """
+
+    def __init__(self, path, fps, step=1):
+        self.file = open(path, "wb")
+        self.fps = fps
+        self.step = step
+        self.count = 0
+        self.previous = None
+        # The last frame is written once its delay is known
+        self.pending = None
+
+    def write(self, data, size):
+        width, height = size
+        rgb = np.frombuffer(data, np.uint8).reshape(height, width, 3)[::self.step, ::self.step]
+        indices = quantize(rgb)
+        # Frame n is shown from n / fps to (n + 1) / fps, in hundredths of a second
+        delay = round(100 * (self.count + 1) / self.fps) - round(100 * self.count / self.fps)
+        self.count += 1
+
+        if self.previous is None:
+            self.write_header(indices.shape[1], indices.shape[0])
+            self.pending = [0, 0, indices, delay, False]
+        else:
+            changed = indices != self.previous
+            rows = np.flatnonzero(changed.any(axis=1))
+            if not len(rows):
+                self.pending[3] += delay
+                return
+            columns = np.flatnonzero(changed.any(axis=0))
+            top, bottom = rows[0], rows[-1] + 1
+            left, right = columns[0], columns[-1] + 1
+            area = indices[top:bottom, left:right].copy()
+            area[~changed[top:bottom, left:right]] = TRANSPARENT
+            self.flush()
+            self.pending = [left, top, area, delay, True]
+        self.previous = indices
+
+    def write_header(self, width, height):
+        self.file.write(b"GIF89a" + struct.pack("<HHBBB", width, height, 0xF7, 0, 0))
+        self.file.write(gif_palette())
+        # Loop forever
+        self.file.write(b"\x21\xff\x0bNETSCAPE2.0\x03\x01\x00\x00\x00")
+
+    def flush(self):
+        """Write the pending frame."""
+        if self.pending is None:
+            return
+        left, top, area, delay, transparent = self.pending
+        # Keep the previous frame under this one, with TRANSPARENT see-through
+        flags = 1 << 2 | (1 if transparent else 0)
+        self.file.write(struct.pack("<BBBBHBB", 0x21, 0xF9, 4, flags, delay, TRANSPARENT, 0))
+        height, width = area.shape
+        self.file.write(struct.pack("<BHHHHB", 0x2C, left, top, width, height, 0))
+        self.file.write(b"\x08" + sub_blocks(lzw_encode(area.tobytes())))
+        self.pending = None
+
+    def close(self):
+        self.flush()
+        if self.count:
+            self.file.write(b"\x3b")
+        self.file.close()
+
+def open_writer(path, fps, step=1):
+    """Return a writer for path: a .gif, a .rgb/.raw stream, "-" or else an image directory."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".gif":
+        return GifWriter(path, fps, step)
+    if extension in (".rgb", ".raw") or path == "-":
+        return RawVideoWriter(path)
+    return ImageSequenceWriter(path)
+
+class FrameCapture:
+    """Feeds frames to a writer on a background encoder thread.
+
+    capture() copies the surface's pixels and returns; the writer encodes
+    them in the background. Call close() to finish the output.
+    """
+
+    def __init__(self, writer, queue_size=QUEUE_SIZE, drop=False):
+        self.writer = writer
+        self.drop = drop
+        # Frames left out because the queue was full, with drop=True
+        self.dropped = 0
+        # Last error from the encoder thread; later frames are discarded
+        self.error = None
+        self.frames = queue.Queue(queue_size)
+        self.encoder = threading.Thread(target=self.encode_loop, name="frame-capture", daemon=True)
+        self.encoder.start()
+
+    def capture(self, surface):
+        """Queue a copy of the surface's pixels for encoding."""
+        frame = (pygame.image.tobytes(surface, "RGB"), surface.get_size())
+        if not self.drop:
+            self.frames.put(frame)
+            return
+        try:
+            self.frames.put_nowait(frame)
+        except queue.Full:
+            self.dropped += 1
+
+    def encode_loop(self):
+        """Encoder thread: write queued frames until close()."""
+        while True:
+            frame = self.frames.get()
+            if frame is None:
+                break
+            if self.error is None:
+                try:
+                    self.writer.write(*frame)
+                except (OSError, pygame.error) as e:
+                    self.error = e
+        try:
+            self.writer.close()
+        except OSError as e:
+            self.error = self.error or e
+
+    def close(self):
+        """Encode the queued frames and finish the output."""
+        if self.encoder.is_alive():
+            self.frames.put(None)
+            self.encoder.join()
+
+def render_replay(replay, capture, last=None, hold=HOLD_SECONDS):
+    """Draw a replay offscreen one frame per tick and capture every frame.
+
+    last limits the capture to the final last seconds of the game; hold
+    repeats the final frame for that many seconds.
+    """
+    from snake_game import SnakeGame
+
+    game = SnakeGame(board_size=(replay.width, replay.height), offscreen=True)
+    game.difficulty = replay.difficulty
+    game.game_mode = replay.game_mode
+    game.connected_obstacles = replay.connected_obstacles
+    game.reset_game(replay.seed)
+    fps = replay.difficulty.value["speed"]
+    first = 0 if last is None else max(0, replay.ticks - int(last * fps))
+    if first == 0:
+        game.render()
+        capture.capture(game.screen)
+    for action in replay_actions(replay):
+        game.step(action)
+        game.update_camera()
+        if game.ticks >= first:
+            game.render()
+            capture.capture(game.screen)
+        if game.game_over:
+            break
+    for _ in range(int(hold * fps)):
+        capture.capture(game.screen)
+
+def export_replay(replay, path, last=None, step=1, hold=HOLD_SECONDS):
+    """Capture a replay to path (see open_writer) and return the FrameCapture."""
+    capture = FrameCapture(open_writer(path, replay.difficulty.value["speed"], step))
+    try:
+        render_replay(replay, capture, last, hold)
+    finally:
+        capture.close()
+    return capture
+
+def main():
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Export a recorded snake game as images, a GIF or raw video.")
+    parser.add_argument("replay", help="replay file (.snkr)")
+    parser.add_argument("output", help="a .gif file, a .rgb/.raw file, - for raw frames on stdout, "
+                                       "or a directory for PNG files")
+    parser.add_argument("--last", type=float, help="only capture the last this many seconds")
+    parser.add_argument("--step", type=int, default=1,
+                        help="GIFs keep every step-th pixel across and down (default 1)")
+    parser.add_argument("--hold", type=float, default=HOLD_SECONDS,
+                        help=f"seconds to show the final frame (default {HOLD_SECONDS})")
+    args = parser.parse_args()
+
+    replay = Replay.load(args.replay)
+    capture = export_replay(replay, args.output, args.last, args.step, args.hold)
+    if capture.error:
+        sys.exit(f"{args.output}: {capture.error}")
+
+if __name__ == "__main__":
+    main()
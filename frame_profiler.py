@@ -0,0 +1,241 @@
+"""
+Frame Profiler - per-frame phase timings for SnakeGame.
+
+While enabled, the profiler wraps the game's phase methods on the instance
+(event handling, move_snake, every draw_* call, presenting the frame and the
+frame-rate sleep), keeps rolling p50/p99 times per phase, draws them with a
+frame-time graph over the game, and can export everything it saw as a Chrome
+trace (chrome://tracing or https://ui.perfetto.dev). Disabling removes the
+wrappers again, so a disabled profiler costs nothing.
+"""
+import json
+import os
+import time
+from collections import deque
+
+import pygame
+
+# Game methods timed as phases, in the order they run in a frame
+PHASES = (
+    "handle_events",
+    "move_snake",
+    "render_dirty",
+    "draw_board",
+    "draw_food",
+    "draw_snake",
+    "draw_ui",
+    "show_game_over",
+    "present",
+    "wait_for_frame",
+)
+
+# Frames kept for percentiles and the graph
+HISTORY = 600
+GRAPH_FRAMES = 120
+
+# Trace events kept for export, newest last
+TRACE_LIMIT = 200000
+
+# Overlay statistics are recomputed this often, in frames
+STATS_INTERVAL = 15
+
+OVERLAY_WIDTH = 250
+LINE_HEIGHT = 14
+GRAPH_HEIGHT = 60
+OVERLAY_BACKGROUND = (0, 0, 0, 190)
+OVERLAY_TEXT = (255, 255, 255)
+GRAPH_COLOR = (0, 255, 0)
+BUDGET_COLOR = (255, 165, 0)
+
+def percentile(sorted_values, fraction):
+    """Return the value at fraction (0..1) of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+class FrameProfiler:
+    """Times the phases of every frame a SnakeGame draws."""
+
+    def __init__(self, game, frame_budget=None):
+        self.game = game
+        # Target frame time drawn as a line on the graph
+        self.frame_budget = frame_budget
+        self.enabled = False
+        self.frame_times = deque(maxlen=HISTORY)
+        self.phase_times = {name: deque(maxlen=HISTORY) for name in PHASES}
+        self.trace = deque(maxlen=TRACE_LIMIT)
+        self.current = {}
+        self.frame_start = None
+        self.frames_since_stats = STATS_INTERVAL
+        self.stats = []
+        self.font = None
+        # Result of the last trace export, shown under the table
+        self.message = None
+        self.epoch = time.perf_counter()
+
+    def toggle(self):
+        """Switch profiling and the overlay on or off."""
+        if self.enabled:
+            self.disable()
+        else:
+            self.enable()
+
+    def enable(self):
+        """Start timing the game's phases."""
+        if self.enabled:
+            return
+        for name in PHASES:
+            original = getattr(self.game, name)
+            if name == "present":
+                timed = self._timed_present(original)
+            elif name == "wait_for_frame":
+                timed = self._timed_frame_end(original)
+            else:
+                timed = self._timed(name, original)
+            setattr(self.game, name, timed)
+        self.enabled = True
+        self.frame_start = time.perf_counter()
+
+    def disable(self):
+        """Stop timing and remove the wrappers, leaving the game as it was."""
+        if not self.enabled:
+            return
+        for name in PHASES:
+            self.game.__dict__.pop(name, None)
+        self.enabled = False
+        self.current = {}
+        # The overlay was drawn over the board; repaint all of it
+        self.game.full_redraw = True
+
+    def _record(self, name, start, end):
+        self.current[name] = self.current.get(name, 0.0) + end - start
+        self.trace.append((name, start, end))
+
+    def _timed(self, name, func):
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self._record(name, start, time.perf_counter())
+        return timed
+
+    def _timed_present(self, func):
+        def present(rects=None):
+            if rects is not None:
+                # Only the dirty rects were repainted; restore the board under
+                # the translucent panel so it does not darken frame after frame
+                area = self.overlay_rect()
+                self.game.repaint(area)
+                rects = rects + [area]
+            self.draw_overlay()
+            start = time.perf_counter()
+            try:
+                return func(rects)
+            finally:
+                self._record("present", start, time.perf_counter())
+        return present
+
+    def _timed_frame_end(self, func):
+        def wait_for_frame(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                end = time.perf_counter()
+                self._record("wait_for_frame", start, end)
+                self.end_frame(end)
+        return wait_for_frame
+
+    def end_frame(self, now):
+        """Close the current frame and add its timings to the history."""
+        self.frame_times.append(now - self.frame_start)
+        self.trace.append(("frame", self.frame_start, now))
+        self.frame_start = now
+        for name in PHASES:
+            self.phase_times[name].append(self.current.get(name, 0.0))
+        self.current = {}
+        self.frames_since_stats += 1
+
+    def summary(self):
+        """Return [(phase, p50, p99)] in seconds, with "frame" first."""
+        rows = [("frame", self.frame_times)]
+        rows.extend((name, self.phase_times[name]) for name in PHASES)
+        result = []
+        for name, values in rows:
+            ordered = sorted(values)
+            result.append((name, percentile(ordered, 0.50), percentile(ordered, 0.99)))
+        return result
+
+    def overlay_rect(self):
+        """Return the screen rectangle the overlay covers this frame."""
+        if self.frames_since_stats >= STATS_INTERVAL:
+            self.stats = self.summary()
+            self.frames_since_stats = 0
+        lines = len(self.stats) + 1 + (self.message is not None)
+        height = LINE_HEIGHT * lines + GRAPH_HEIGHT + 12
+        screen = self.game.screen
+        return pygame.Rect(screen.get_width() - OVERLAY_WIDTH - 5, screen.get_height() - height - 5,
+                           OVERLAY_WIDTH, height)
+
+    def draw_overlay(self):
+        """Draw the p50/p99 table and the frame-time graph over the game."""
+        screen = self.game.screen
+        if self.font is None:
+            self.font = pygame.font.Font(None, 18)
+
+        left, top, width, height = self.overlay_rect()
+        panel = pygame.Surface((width, height), pygame.SRCALPHA)
+        panel.fill(OVERLAY_BACKGROUND)
+        screen.blit(panel, (left, top))
+
+        # Rendered directly: these strings change too often for the text cache
+        header = self.font.render("phase            p50 ms   p99 ms", True, OVERLAY_TEXT)
+        screen.blit(header, (left + 5, top + 4))
+        for i, (name, p50, p99) in enumerate(self.stats):
+            text = f"{name[:15]:<15} {p50 * 1e3:7.2f}  {p99 * 1e3:7.2f}"
+            line = self.font.render(text, True, OVERLAY_TEXT)
+            screen.blit(line, (left + 5, top + 4 + (i + 1) * LINE_HEIGHT))
+        if self.message is not None:
+            line = self.font.render(self.message[:40], True, OVERLAY_TEXT)
+            screen.blit(line, (left + 5, top + 4 + (len(self.stats) + 1) * LINE_HEIGHT))
+
+        # Frame-time graph, scaled so twice the budget (or 50 ms) fills it
+        graph_top = top + height - GRAPH_HEIGHT - 4
+        scale = 2 * (self.frame_budget or 0.025)
+        frames = list(self.frame_times)[-GRAPH_FRAMES:]
+        if len(frames) > 1:
+            step = (width - 10) / (GRAPH_FRAMES - 1)
+            points = [(left + 5 + i * step, graph_top + GRAPH_HEIGHT - min(1.0, t / scale) * GRAPH_HEIGHT)
+                      for i, t in enumerate(frames)]
+            pygame.draw.lines(screen, GRAPH_COLOR, False, points)
+        if self.frame_budget:
+            y = graph_top + GRAPH_HEIGHT / 2
+            pygame.draw.line(screen, BUDGET_COLOR, (left + 5, y), (left + width - 5, y))
+
+    def export_trace(self, path):
+        """Write the recorded phases as a Chrome trace JSON file.
+
+        Returns True on success; either way the outcome is shown in the overlay.
+        """
+        pid = os.getpid()
+        events = []
+        for name, start, end in self.trace:
+            events.append({
+                "name": name,
+                "cat": "frame" if name == "frame" else "phase",
+                "ph": "X",
+                "ts": (start - self.epoch) * 1e6,
+                "dur": (end - start) * 1e6,
+                "pid": pid,
+                "tid": 0 if name == "frame" else 1,
+            })
+        try:
+            with open(path, "w") as f:
+                json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+        except OSError as e:
+            self.message = f"trace not saved: {e.strerror or e}"
+            return False
+        self.message = f"trace saved to {os.path.basename(path)}"
+        return True
@@ -1,81 +1,135 @@
 """
 Game Launcher - Choose which game to play!
+
+Games run inside the launcher's own process. A game's module is only
+imported the first time it is picked, and the snake game keeps pygame, its
+window, fonts and score store between sessions, so switching games takes
+milliseconds instead of starting a new Python.
 """
-import subprocess
+import importlib
 import sys
-import os
 
-def run_game(game_file):
-    """Run a specific game file."""
+# Menu entries in order. "entry" is the module:function that plays the
+# game and returns when the player is done with it.
+GAMES = [
+    {
+        "title": "🐍 Snake Game (Advanced Edition)",
+        "features": [
+            "Multiple difficulty levels (Easy, Normal, Hard)",
+            "4 Game modes (Classic, Walls, Obstacles, Extreme)",
+            "Level progression system",
+            "High score tracking",
+            "Pause/Resume functionality",
+        ],
+        "intro": [
+            "Controls:",
+            "- Arrow keys to move",
+            "- SPACE to pause",
+            "- R to restart",
+            "- ESC to return to menu",
+            "\nHave fun! 🎉",
+        ],
+        "entry": "snake_session:play",
+    },
+    {
+        "title": "🔢 Guess the Number",
+        "features": [
+            "Classic number guessing game",
+            "Statistics tracking",
+            "Multiple rounds",
+        ],
+        "intro": [],
+        "entry": "guess_the_number:main",
+    },
+    {
+        "title": "✂️ Rock Paper Scissors",
+        "features": [
+            "Play against computer",
+            "Score tracking",
+            "Multiple rounds",
+        ],
+        "intro": [],
+        "entry": "rock_paper_scissors:main",
+    },
+]
+
+# Entry points already imported, by spec
+_entries = {}
+
+def load_entry(spec):
+    """Import a module:function entry point the first time it is needed and return it."""
+    entry = _entries.get(spec)
+    if entry is None:
+        module, _, name = spec.partition(":")
+        entry = _entries[spec] = getattr(importlib.import_module(module), name)
+    return entry
+
+def close_games():
+    """Shut down what games kept running between sessions."""
+    # Only a snake session that was started has anything to close
+    session = sys.modules.get("snake_session")
+    if session is not None:
+        session.close()
+
+def run_game(game):
+    """Run a game from GAMES until it returns to the launcher."""
     try:
-        # Get the Python executable path for the virtual environment
-        python_exe = r"C:/Users/nirma/Desktop/python game/.venv/Scripts/python.exe"
-        subprocess.run([python_exe, game_file], check=True)
-    except subprocess.CalledProcessError as e:
+        entry = load_entry(game["entry"])
+    except (ImportError, AttributeError) as e:
+        print(f"Game not found: {e}")
+        return
+    try:
+        entry()
+    except KeyboardInterrupt:
+        print("\n↩️ Back to the launcher")
+    except Exception as e:
         print(f"Error running game: {e}")
-    except FileNotFoundError:
-        print(f"Game file not found: {game_file}")
 
-def main():
-    """Main launcher menu."""
+def show_menu():
+    """Print the list of games."""
     print("🎮 Welcome to Python Game Collection! 🎮")
     print("=" * 50)
     print()
     print("Available Games:")
-    print("1. 🐍 Snake Game (Advanced Edition)")
-    print("   - Multiple difficulty levels (Easy, Normal, Hard)")
-    print("   - 4 Game modes (Classic, Walls, Obstacles, Extreme)")
-    print("   - Level progression system")
-    print("   - High score tracking")
-    print("   - Pause/Resume functionality")
-    print()
-    print("2. 🔢 Guess the Number")
-    print("   - Classic number guessing game")
-    print("   - Statistics tracking")
-    print("   - Multiple rounds")
-    print()
-    print("3. ✂️ Rock Paper Scissors")
-    print("   - Play against computer")
-    print("   - Score tracking")
-    print("   - Multiple rounds")
+    for number, game in enumerate(GAMES, 1):
+        print(f"{number}. {game['title']}")
+        for feature in game["features"]:
+            print(f"   - {feature}")
+        print()
+    print(f"{len(GAMES) + 1}. 🚪 Exit")
     print()
-    print("4. 🚪 Exit")
-    print()
-    
-    while True:
-        try:
-            choice = input("Select a game (1-4): ").strip()
-            
-            if choice == "1":
-                print("\n🐍 Starting Snake Game...")
-                print("Controls:")
-                print("- Arrow keys to move")
-                print("- SPACE to pause")
-                print("- R to restart")
-                print("- ESC to return to menu")
-                print("\nHave fun! 🎉")
-                run_game("snake_game.py")
-                
-            elif choice == "2":
-                print("\n🔢 Starting Guess the Number...")
-                run_game("guess_the_number.py")
-                
-            elif choice == "3":
-                print("\n✂️ Starting Rock Paper Scissors...")
-                run_game("rock_paper_scissors.py")
-                
-            elif choice == "4":
-                print("\n👋 Thanks for playing!")
+
+def main():
+    """Main launcher menu."""
+    show_menu()
+    exit_choice = str(len(GAMES) + 1)
+    choices = ", ".join(str(n) for n in range(1, len(GAMES) + 1))
+
+    try:
+        while True:
+            try:
+                choice = input(f"Select a game (1-{exit_choice}): ").strip()
+
+                if choice == exit_choice:
+                    print("\n👋 Thanks for playing!")
+                    break
+
+                if choice.isdigit() and 1 <= int(choice) <= len(GAMES):
+                    game = GAMES[int(choice) - 1]
+                    print(f"\nStarting {game['title']}...")
+                    for line in game["intro"]:
+                        print(line)
+                    run_game(game)
+                else:
+                    print(f"❌ Invalid choice! Please enter {choices}, or {exit_choice}.")
+
+            except (KeyboardInterrupt, EOFError):
+                print("\n\n👋 Thanks for playing!")
                 break
-                
-            else:
-                print("❌ Invalid choice! Please enter 1, 2, 3, or 4.")
-                
-        except KeyboardInterrupt:
-            print("\n\n👋 Thanks for playing!")
-            break
-        except Exception as e:
-            print(f"❌ An error occurred: {e}")
+            except Exception as e:
+                print(f"❌ An error occurred: {e}")
+    finally:
+        close_games()
 
 if __name__ == "__main__":
     main()
@@ -1,20 +1,85 @@
 import random
 
-def guess_the_number():
+# Default range and attempt budget of the interactive game
+LOW = 1
+HIGH = 100
+MAX_ATTEMPTS = 7
+
+# Largest number a game may go up to
+MAX_HIGH = 10 ** 12
+
+def check_range(low, high, max_attempts):
+    """Raise ValueError unless low..high and max_attempts make a playable game."""
+    if not 0 <= low <= high <= MAX_HIGH:
+        raise ValueError(f"the range must lie within 0..{MAX_HIGH}")
+    if max_attempts < 1:
+        raise ValueError("a game needs at least one attempt")
+
+def narrow(low, high, guess, secret):
+    """Return the range still possible after guess missed secret."""
+    if guess < secret:
+        return guess + 1, high
+    return low, guess - 1
+
+# Guessers pick a guess from the range still possible, low..high, and a
+# uniform random number u in [0, 1). They only use arithmetic, so low, high
+# and u may be NumPy arrays of many games at once (see guess_evaluator.py);
+# callers truncate the result to an integer and clamp it into the range.
+
+class BisectionGuesser:
+    """Always guesses the middle, which wins in the fewest attempts possible."""
+
+    def guess(self, low, high, u):
+        return (low + high) // 2
+
+class RandomGuesser:
+    """Guesses anywhere in the possible range with equal chance."""
+
+    def guess(self, low, high, u):
+        return low + (high - low + 1) * u
+
+class NoisyGuesser:
+    """A human-like player: aims for the middle but lands anywhere in the
+    central spread fraction of the possible range.
+    """
+
+    def __init__(self, spread=0.5):
+        self.spread = spread
+
+    def guess(self, low, high, u):
+        return low + (high - low) * (0.5 + self.spread * (u - 0.5))
+
+# Guessers by name
+GUESSERS = {
+    'bisection': BisectionGuesser,
+    'noisy': NoisyGuesser,
+    'random': RandomGuesser,
+}
+
+def play_game(guesser, secret, low=LOW, high=HIGH, max_attempts=MAX_ATTEMPTS, rng=random):
+    """Let guesser play one game; return the attempts it took, or None if it lost."""
+    for attempt in range(1, max_attempts + 1):
+        guess = min(max(int(guesser.guess(low, high, rng.random())), low), high)
+        if guess == secret:
+            return attempt
+        low, high = narrow(low, high, guess, secret)
+    return None
+
+def guess_the_number(low=LOW, high=HIGH, max_attempts=MAX_ATTEMPTS):
     """
     A simple number guessing game where the player tries to guess
-    a randomly generated number between 1 and 100.
+    a randomly generated number between low and high (1 and 100 by default).
     """
+    check_range(low, high, max_attempts)
     print("🎮 Welcome to the Number Guessing Game! 🎮")
     print("=" * 40)
-    print("I'm thinking of a number between 1 and 100.")
+    print(f"I'm thinking of a number between {low} and {high}.")
     print("Can you guess what it is?")
     print()
     
-    # Generate a random number between 1 and 100
-    secret_number = random.randint(1, 100)
+    # Generate a random number between low and high
+    secret_number = random.randint(low, high)
     attempts = 0
-    max_attempts = 7
     
     while attempts < max_attempts:
         try:
@@ -58,14 +123,14 @@ def play_again():
         else:
             print("Please enter 'y' for yes or 'n' for no.")
 
-def main():
+def main(low=LOW, high=HIGH, max_attempts=MAX_ATTEMPTS):
     """Main game loop."""
     games_played = 0
     games_won = 0
     
     while True:
         # Play a game
-        won = guess_the_number()
+        won = guess_the_number(low, high, max_attempts)
         games_played += 1
         
         if won:
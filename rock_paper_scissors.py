@@ -1,9 +1,113 @@
 import random
 
-def get_computer_choice():
-    """Generate a random choice for the computer."""
-    choices = ['rock', 'paper', 'scissors']
-    return random.choice(choices)
+CHOICES = ['rock', 'paper', 'scissors']
+
+# What each choice beats, and the choice that beats each one
+WINNING_COMBINATIONS = {
+    'rock': 'scissors',      # rock crushes scissors
+    'paper': 'rock',         # paper covers rock
+    'scissors': 'paper'      # scissors cut paper
+}
+COUNTERS = {beaten: winner for winner, beaten in WINNING_COMBINATIONS.items()}
+
+class RandomStrategy:
+    """Picks uniformly at random, which no opponent can exploit."""
+
+    def __init__(self, seed=None):
+        self.rng = random.Random(seed)
+
+    def choose(self):
+        return self.rng.choice(CHOICES)
+
+    def observe(self, own_choice, opponent_choice):
+        pass
+
+class ConstantStrategy:
+    """Always picks the same choice."""
+
+    def __init__(self, choice='rock'):
+        self.choice = choice
+
+    def choose(self):
+        return self.choice
+
+    def observe(self, own_choice, opponent_choice):
+        pass
+
+class CycleStrategy:
+    """Picks rock, paper, scissors, rock, ... in turn."""
+
+    def __init__(self):
+        self.next = 0
+
+    def choose(self):
+        return CHOICES[self.next]
+
+    def observe(self, own_choice, opponent_choice):
+        self.next = (self.next + 1) % len(CHOICES)
+
+class BeatLastStrategy:
+    """Picks what beats the opponent's last choice, at random in the first round."""
+
+    def __init__(self, seed=None):
+        self.rng = random.Random(seed)
+        self.last = None
+
+    def choose(self):
+        if self.last is None:
+            return self.rng.choice(CHOICES)
+        return COUNTERS[self.last]
+
+    def observe(self, own_choice, opponent_choice):
+        self.last = opponent_choice
+
+class MarkovStrategy:
+    """Predicts the opponent from what it picked after its last order choices.
+
+    counts holds, for each of the 3 ** order possible runs of the opponent's
+    latest choices, how often it then picked rock, paper and scissors, so
+    each round costs one table lookup and one increment. The strategy plays
+    the counter to the opponent's most frequent next choice, breaking ties at
+    random. Order 0 just counts the opponent's choices; rounds before order
+    choices have been seen count as rock.
+    """
+
+    def __init__(self, order=1, seed=None):
+        self.order = order
+        self.rng = random.Random(seed)
+        self.counts = [[0, 0, 0] for _ in range(3 ** order)]
+        # The opponent's last order choices as a base-3 number
+        self.context = 0
+
+    def predict(self):
+        """Return the opponent's most likely next choice."""
+        counts = self.counts[self.context]
+        best = max(counts)
+        return self.rng.choice([choice for choice, count in zip(CHOICES, counts) if count == best])
+
+    def choose(self):
+        return COUNTERS[self.predict()]
+
+    def observe(self, own_choice, opponent_choice):
+        index = CHOICES.index(opponent_choice)
+        self.counts[self.context][index] += 1
+        self.context = (self.context * 3 + index) % len(self.counts)
+
+# Computer opponents by name, made by a factory taking a seed (None for a random one)
+STRATEGIES = {
+    'random': RandomStrategy,
+    'rock': lambda seed: ConstantStrategy('rock'),
+    'cycle': lambda seed: CycleStrategy(),
+    'beat-last': BeatLastStrategy,
+    'frequency': lambda seed: MarkovStrategy(0, seed),
+    'markov': lambda seed: MarkovStrategy(2, seed),
+}
+
+def get_computer_choice(strategy=None):
+    """Generate the computer's choice, from strategy or else at random."""
+    if strategy is not None:
+        return strategy.choose()
+    return random.choice(CHOICES)
 
 def get_player_choice():
     """Get the player's choice with input validation."""
@@ -30,13 +134,7 @@ def determine_winner(player_choice, computer_choice):
     if player_choice == computer_choice:
         return "tie"
     
-    winning_combinations = {
-        'rock': 'scissors',      # rock crushes scissors
-        'paper': 'rock',         # paper covers rock
-        'scissors': 'paper'      # scissors cut paper
-    }
-    
-    if winning_combinations[player_choice] == computer_choice:
+    if WINNING_COMBINATIONS[player_choice] == computer_choice:
         return "player"
     else:
         return "computer"
@@ -52,10 +150,12 @@ def display_choices(player_choice, computer_choice):
     print(f"\nYou chose: {choice_emojis[player_choice]} {player_choice.capitalize()}")
     print(f"Computer chose: {choice_emojis[computer_choice]} {computer_choice.capitalize()}")
 
-def play_round():
-    """Play a single round of Rock, Paper, Scissors."""
+def play_round(strategy=None):
+    """Play a single round of Rock, Paper, Scissors against strategy (random if None)."""
     player_choice = get_player_choice()
-    computer_choice = get_computer_choice()
+    computer_choice = get_computer_choice(strategy)
+    if strategy is not None:
+        strategy.observe(computer_choice, player_choice)
     
     display_choices(player_choice, computer_choice)
     
@@ -71,6 +171,20 @@ def play_round():
         print("🤖 Computer wins this round!")
         return "computer"
 
+def choose_opponent():
+    """Ask which computer strategy to play against; Enter picks random."""
+    names = list(STRATEGIES)
+    print("Opponents: " + ", ".join(f"{number}. {name}" for number, name in enumerate(names, 1)))
+    while True:
+        choice = input("Choose an opponent (Enter for random): ").lower().strip()
+        if not choice:
+            choice = 'random'
+        if choice.isdigit() and 1 <= int(choice) <= len(names):
+            choice = names[int(choice) - 1]
+        if choice in STRATEGIES:
+            return STRATEGIES[choice](None)
+        print(f"❌ Invalid choice! Please enter 1-{len(names)} or a name.")
+
 def play_again():
     """Ask if the player wants to play again."""
     while True:
@@ -91,6 +205,7 @@ def main():
     print("📄 Paper covers Rock") 
     print("✂️ Scissors cut Paper")
     print("=" * 40)
+    strategy = choose_opponent()
     
     player_score = 0
     computer_score = 0
@@ -100,7 +215,7 @@ def main():
         print(f"\n📊 Score - You: {player_score} | Computer: {computer_score} | Ties: {ties}")
         print("-" * 40)
         
-        result = play_round()
+        result = play_round(strategy)
         
         if result == "player":
             player_score += 1
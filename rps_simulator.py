@@ -0,0 +1,259 @@
+"""
+RPS Simulator - play millions of Rock Paper Scissors rounds between strategies.
+
+Choices are encoded as 0 rock, 1 paper, 2 scissors and many independent
+matches are played in lockstep with NumPy: each round every match's choices
+come from the array versions of the strategies in rock_paper_scissors.py
+and are scored through a table built from determine_winner.
+
+    python rps_simulator.py markov random
+    python rps_simulator.py --matches 2000 --rounds 500     # every pair
+    python rps_simulator.py frequency mybots:factory --json
+
+Rounds within a match depend on each other for adaptive strategies, so
+confidence intervals are taken over the per-match rates, which are
+independent.
+
+Strategies are objects with choose() and observe(own, opponent) working
+on arrays with one entry per match, made by a factory taking the number of
+matches and a numpy Generator. Name a built-in one or any
+factory as module:function. Every strategy in rock_paper_scissors.STRATEGIES
+is built in: the ones with an array version in STRATEGIES use it, any other
+is simulated by stepping one of its objects per match (ScalarStrategies),
+which --scalar forces for all of them.
+"""
+import argparse
+import importlib
+import json
+import math
+import sys
+import time
+
+import numpy as np
+
+import rock_paper_scissors
+from rock_paper_scissors import CHOICES, COUNTERS, determine_winner
+
+# outcome[a, b] is 1 when choice a beats choice b, -1 when it loses and 0 for a tie
+OUTCOMES = np.array([[{"player": 1, "computer": -1, "tie": 0}[determine_winner(a, b)]
+                      for b in CHOICES] for a in CHOICES], dtype=np.int8)
+
+# The choice that beats each choice
+COUNTER = np.array([CHOICES.index(COUNTERS[choice]) for choice in CHOICES], dtype=np.int8)
+
+# z for two-sided 95% confidence intervals
+Z_95 = 1.959964
+
+class RandomStrategy:
+    """Picks uniformly at random."""
+
+    def __init__(self, n, rng):
+        self.n = n
+        self.rng = rng
+
+    def choose(self):
+        return self.rng.integers(0, 3, self.n, dtype=np.int8)
+
+    def observe(self, own, opponent):
+        pass
+
+class ConstantStrategy:
+    """Always picks the same choice."""
+
+    def __init__(self, n, choice=0):
+        self.choices = np.full(n, choice, dtype=np.int8)
+
+    def choose(self):
+        return self.choices
+
+    def observe(self, own, opponent):
+        pass
+
+class CycleStrategy:
+    """Picks rock, paper, scissors, rock, ... in turn."""
+
+    def __init__(self, n):
+        self.n = n
+        self.next = 0
+
+    def choose(self):
+        return np.full(self.n, self.next, dtype=np.int8)
+
+    def observe(self, own, opponent):
+        self.next = (self.next + 1) % 3
+
+class BeatLastStrategy:
+    """Picks what beats the opponent's last choice, at random in the first round."""
+
+    def __init__(self, n, rng):
+        self.rng = rng
+        self.last = None
+        self.n = n
+
+    def choose(self):
+        if self.last is None:
+            return self.rng.integers(0, 3, self.n, dtype=np.int8)
+        return COUNTER[self.last]
+
+    def observe(self, own, opponent):
+        self.last = opponent
+
+class MarkovStrategy:
+    """rock_paper_scissors.MarkovStrategy for n matches at once.
+
+    counts[m, context] holds match m's tallies of the opponent's choice
+    after each run of its last order choices; a round updates one entry
+    per match.
+    """
+
+    def __init__(self, n, rng, order=1):
+        self.rng = rng
+        self.contexts = 3 ** order
+        self.counts = np.zeros((n, self.contexts, 3), dtype=np.int32)
+        self.context = np.zeros(n, dtype=np.int32)
+        self.matches = np.arange(n)
+
+    def choose(self):
+        counts = self.counts[self.matches, self.context]
+        # Random weights on the most frequent choices pick one of them evenly
+        ties = (counts == counts.max(axis=1, keepdims=True)) * self.rng.random(counts.shape)
+        return COUNTER[ties.argmax(axis=1)]
+
+    def observe(self, own, opponent):
+        self.counts[self.matches, self.context, opponent] += 1
+        self.context = (self.context * 3 + opponent) % self.contexts
+
+class ScalarStrategies:
+    """n objects of a rock_paper_scissors strategy, one per match, stepped in turn.
+
+    factory takes a seed, as in rock_paper_scissors.STRATEGIES; each match
+    gets its own seed from rng. Much slower than an array version, but it
+    plays exactly like the strategy the game uses.
+    """
+
+    def __init__(self, factory, n, rng):
+        self.strategies = [factory(int(seed)) for seed in rng.integers(0, 2 ** 63, n)]
+
+    def choose(self):
+        return np.array([CHOICES.index(strategy.choose()) for strategy in self.strategies], dtype=np.int8)
+
+    def observe(self, own, opponent):
+        for strategy, a, b in zip(self.strategies, own, opponent):
+            strategy.observe(CHOICES[a], CHOICES[b])
+
+def scalar_strategies(factory):
+    """Return an array strategy factory stepping objects made by a scalar factory."""
+    return lambda n, rng: ScalarStrategies(factory, n, rng)
+
+# Array versions of rock_paper_scissors.STRATEGIES, by the same names
+STRATEGIES = {
+    "random": RandomStrategy,
+    "rock": lambda n, rng: ConstantStrategy(n, CHOICES.index("rock")),
+    "cycle": lambda n, rng: CycleStrategy(n),
+    "beat-last": BeatLastStrategy,
+    "frequency": lambda n, rng: MarkovStrategy(n, rng, 0),
+    "markov": lambda n, rng: MarkovStrategy(n, rng, 2),
+}
+
+def load_strategy(spec, scalar=False):
+    """Return the strategy factory for a built-in name or a module:function spec.
+
+    Built-in names are those of rock_paper_scissors.STRATEGIES; they use the
+    array version when there is one, unless scalar is True, and otherwise
+    step the game's own strategy objects.
+    """
+    if spec in rock_paper_scissors.STRATEGIES:
+        if spec in STRATEGIES and not scalar:
+            return STRATEGIES[spec]
+        return scalar_strategies(rock_paper_scissors.STRATEGIES[spec])
+    module, _, name = spec.partition(":")
+    if not name:
+        names = ", ".join(rock_paper_scissors.STRATEGIES)
+        raise ValueError(f"unknown strategy {spec!r}; use one of {names} or module:function")
+    return getattr(importlib.import_module(module), name)
+
+def play_matches(first, second, matches=1000, rounds=1000, seed=0, scalar=False):
+    """Play matches matches of rounds rounds between two strategy specs.
+
+    Returns (wins, ties, losses): per-match counts of rounds from the first
+    strategy's side. scalar is passed on to load_strategy.
+    """
+    rng = np.random.default_rng(seed)
+    a = load_strategy(first, scalar)(matches, rng)
+    b = load_strategy(second, scalar)(matches, rng)
+    wins = np.zeros(matches, dtype=np.int64)
+    losses = np.zeros(matches, dtype=np.int64)
+    for _ in range(rounds):
+        choice_a = a.choose()
+        choice_b = b.choose()
+        outcome = OUTCOMES[choice_a, choice_b]
+        wins += outcome == 1
+        losses += outcome == -1
+        a.observe(choice_a, choice_b)
+        b.observe(choice_b, choice_a)
+    return wins, rounds - wins - losses, losses
+
+def rate_interval(counts, rounds):
+    """Return the mean per-match rate and the half-width of its 95% confidence interval."""
+    rates = counts / rounds
+    if len(rates) < 2:
+        return float(rates.mean()), math.nan
+    return float(rates.mean()), Z_95 * float(rates.std(ddof=1)) / math.sqrt(len(rates))
+
+def summarize(first, second, wins, ties, losses, rounds):
+    """Return a summary row of win, tie and loss rates with confidence intervals."""
+    row = {"first": first, "second": second, "matches": len(wins), "rounds": rounds}
+    for name, counts in (("win", wins), ("tie", ties), ("loss", losses)):
+        row[name], row[f"{name}_ci"] = rate_interval(counts, rounds)
+    return row
+
+def print_table(rows):
+    """Print summary rows as a text table, rates in percent with 95% intervals."""
+    print(f"{'first':<12} {'second':<12} {'matches':>8} {'rounds':>7} "
+          f"{'win %':>14} {'tie %':>14} {'loss %':>14}")
+    for row in rows:
+        rates = " ".join(f"{100 * row[name]:>6.2f} ±{100 * row[f'{name}_ci']:>5.2f}"
+                         for name in ("win", "tie", "loss"))
+        print(f"{row['first']:<12} {row['second']:<12} {row['matches']:>8} {row['rounds']:>7} {rates}")
+
+def main():
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Play Rock Paper Scissors strategies against each other.")
+    names = list(rock_paper_scissors.STRATEGIES)
+    parser.add_argument("strategies", nargs="*", default=names,
+                        help=f"strategies to pit against each other: {', '.join(names)} "
+                             "or module:function (default all)")
+    parser.add_argument("--matches", type=int, default=1000, help="independent matches per pairing")
+    parser.add_argument("--rounds", type=int, default=1000, help="rounds per match")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the strategies' random choices")
+    parser.add_argument("--json", action="store_true", help="print the summary as JSON instead of a table")
+    parser.add_argument("--scalar", action="store_true",
+                        help="step the game's strategy objects instead of their NumPy versions (slow)")
+    args = parser.parse_args()
+
+    for spec in args.strategies:
+        try:
+            load_strategy(spec)
+        except (ValueError, ImportError, AttributeError) as e:
+            parser.error(str(e))
+    if len(args.strategies) <= 2:
+        pairs = [(args.strategies[0], args.strategies[-1])]
+    else:
+        pairs = [(a, b) for i, a in enumerate(args.strategies) for b in args.strategies[i + 1:]]
+
+    rows = []
+    start = time.perf_counter()
+    for first, second in pairs:
+        wins, ties, losses = play_matches(first, second, args.matches, args.rounds, args.seed, args.scalar)
+        rows.append(summarize(first, second, wins, ties, losses, args.rounds))
+    elapsed = time.perf_counter() - start
+    total = len(pairs) * args.matches * args.rounds
+    print(f"{total} rounds in {elapsed:.1f}s ({total / elapsed:,.0f} rounds/s)", file=sys.stderr)
+
+    if args.json:
+        print(json.dumps(rows, indent=2))
+    else:
+        print_table(rows)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+"""
+Score Store - persistent high scores and leaderboards for the snake game.
+
+Every finished game is kept in a SQLite database in WAL mode, so a crash or
+a kill mid-write leaves the last committed scores intact. Writes happen on a
+background thread; the game only touches an in-memory cache holding the
+top entries of each difficulty/mode leaderboard, so looking up or submitting
+a score never waits on the disk. The leaderboards are read through an index
+on (difficulty, mode, score), which keeps start-up fast with hundreds of
+thousands of stored games.
+
+    python score_store.py                           # every leaderboard
+    python score_store.py --difficulty Hard -n 20   # one difficulty, top 20
+"""
+import argparse
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+from snake_engine import Difficulty, GameMode
+
+DATABASE = "high_scores.db"
+# Scores saved by older versions; imported once when the database is created
+LEGACY_FILE = "high_scores.json"
+
+# Entries per leaderboard kept in memory
+TOP_N = 10
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scores (
+    id INTEGER PRIMARY KEY,
+    difficulty TEXT NOT NULL,
+    mode TEXT NOT NULL,
+    name TEXT NOT NULL,
+    score REAL NOT NULL,
+    level INTEGER NOT NULL,
+    played_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS scores_by_board ON scores (difficulty, mode, score DESC, played_at);
+"""
+
+class ScoreEntry:
+    """One finished game on a leaderboard."""
+
+    __slots__ = ("name", "score", "level", "played_at")
+
+    def __init__(self, name, score, level, played_at):
+        self.name = name
+        self.score = score
+        self.level = level
+        self.played_at = played_at
+
+    def __repr__(self):
+        return f"ScoreEntry({self.name!r}, {self.score!r}, {self.level!r}, {self.played_at!r})"
+
+class ScoreStore:
+    """High scores and top-N leaderboards, cached in memory and saved in the background.
+
+    Call close() (or flush()) before exiting so queued scores reach the disk.
+    With path None scores are only kept in memory: no database is opened
+    and no writer thread is started. A database that cannot be opened or
+    read (corrupt, or in a read-only directory) falls back to the same, with
+    the reason in error.
+    """
+
+    def __init__(self, path=DATABASE, legacy_path=LEGACY_FILE, top_n=TOP_N):
+        self.path = path
+        self.top_n = top_n
+        # Last database error, if any; scores stay cached either way
+        self.error = None
+        self.boards = {(d, m): [] for d in Difficulty for m in GameMode}
+        self.pending = queue.Queue()
+
+        self.writer = None
+        if path is None:
+            return
+
+        try:
+            connection = self.connect()
+            try:
+                self.create(connection, legacy_path)
+                self.load(connection)
+            finally:
+                connection.close()
+        except sqlite3.Error as e:
+            # Play on without saving rather than refuse to start
+            self.error = e
+            self.boards = {(d, m): [] for d in Difficulty for m in GameMode}
+            return
+
+        self.writer = threading.Thread(target=self.write_loop, name="score-store", daemon=True)
+        self.writer.start()
+
+    def connect(self):
+        """Open a connection to the database with WAL journaling."""
+        connection = sqlite3.connect(self.path)
+        connection.execute("PRAGMA journal_mode=WAL")
+        # WAL commits stay atomic with NORMAL; a power cut may only lose the newest ones
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def create(self, connection, legacy_path):
+        """Create the schema on first use and import the legacy JSON scores."""
+        version = connection.execute("PRAGMA user_version").fetchone()[0]
+        if version:
+            return
+        with connection:
+            connection.executescript(SCHEMA)
+            if legacy_path:
+                connection.executemany(
+                    "INSERT INTO scores (difficulty, mode, name, score, level, played_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    self.legacy_rows(legacy_path))
+            connection.execute("PRAGMA user_version = 1")
+
+    def legacy_rows(self, legacy_path):
+        """Return database rows for the best scores in a high_scores.json file."""
+        try:
+            with open(legacy_path) as f:
+                scores = json.load(f)
+            played_at = os.path.getmtime(legacy_path)
+        except (OSError, ValueError):
+            return []
+        difficulties = {d.value["name"]: d for d in Difficulty}
+        modes = {m.value["name"]: m for m in GameMode}
+        rows = []
+        for key, score in scores.items():
+            difficulty, _, mode = key.partition("_")
+            if difficulty in difficulties and mode in modes:
+                rows.append((difficulty, mode, "-", score, 0, played_at))
+        return rows
+
+    def load(self, connection):
+        """Fill the cache with the top entries of every leaderboard."""
+        for (difficulty, mode), board in self.boards.items():
+            rows = connection.execute(
+                "SELECT name, score, level, played_at FROM scores WHERE difficulty = ? AND mode = ? "
+                "ORDER BY score DESC, played_at LIMIT ?",
+                (difficulty.value["name"], mode.value["name"], self.top_n))
+            board[:] = [ScoreEntry(*row) for row in rows]
+
+    def best(self, difficulty, game_mode):
+        """Return the high score for a difficulty and mode, 0 if there is none."""
+        board = self.boards[difficulty, game_mode]
+        return board[0].score if board else 0
+
+    def top(self, difficulty, game_mode):
+        """Return the cached leaderboard for a difficulty and mode, best first."""
+        return list(self.boards[difficulty, game_mode])
+
+    def submit(self, difficulty, game_mode, name, score, level, played_at=None):
+        """Record a finished game and return True if it set a new high score.
+
+        The cache is updated at once; the database write is queued.
+        """
+        if played_at is None:
+            played_at = time.time()
+        board = self.boards[difficulty, game_mode]
+        is_high_score = score > (board[0].score if board else 0)
+        # Earlier entries win ties, so the new one goes after equal scores
+        index = len(board)
+        while index and board[index - 1].score < score:
+            index -= 1
+        if index < self.top_n:
+            board.insert(index, ScoreEntry(name, score, level, played_at))
+            del board[self.top_n:]
+        if self.writer is not None:
+            self.pending.put((difficulty.value["name"], game_mode.value["name"], name, score, level, played_at))
+        return is_high_score
+
+    def write_loop(self):
+        """Writer thread: insert queued scores, batching whatever has piled up."""
+        connection = None
+        while True:
+            rows = [self.pending.get()]
+            while True:
+                try:
+                    rows.append(self.pending.get_nowait())
+                except queue.Empty:
+                    break
+            stop = None in rows
+            rows = [row for row in rows if row is not None]
+            try:
+                if rows:
+                    if connection is None:
+                        connection = self.connect()
+                    with connection:
+                        connection.executemany(
+                            "INSERT INTO scores (difficulty, mode, name, score, level, played_at) "
+                            "VALUES (?, ?, ?, ?, ?, ?)", rows)
+            except sqlite3.Error as e:
+                self.error = e
+            finally:
+                for _ in range(len(rows) + stop):
+                    self.pending.task_done()
+            if stop:
+                if connection is not None:
+                    connection.close()
+                return
+
+    def flush(self):
+        """Wait until every submitted score has been written."""
+        self.pending.join()
+
+    def close(self):
+        """Write the remaining scores and stop the writer thread."""
+        if self.writer is not None and self.writer.is_alive():
+            self.pending.put(None)
+            self.writer.join()
+
+def format_time(played_at):
+    """Format a timestamp for the leaderboard, or "-" for imported scores."""
+    return time.strftime("%Y-%m-%d %H:%M", time.localtime(played_at)) if played_at else "-"
+
+def main():
+    """Command line entry point: print leaderboards."""
+    parser = argparse.ArgumentParser(description="Show the snake game leaderboards.")
+    parser.add_argument("--database", default=DATABASE, help=f"score database (default {DATABASE})")
+    parser.add_argument("--difficulty", choices=[d.value["name"] for d in Difficulty])
+    parser.add_argument("--mode", choices=[m.value["name"] for m in GameMode])
+    parser.add_argument("-n", type=int, default=TOP_N, help=f"entries per leaderboard (default {TOP_N})")
+    args = parser.parse_args()
+
+    store = ScoreStore(args.database, top_n=args.n)
+    store.close()
+    for difficulty in Difficulty:
+        for mode in GameMode:
+            if args.difficulty not in (None, difficulty.value["name"]):
+                continue
+            if args.mode not in (None, mode.value["name"]):
+                continue
+            print(f"{difficulty.value['name']} / {mode.value['name']}")
+            board = store.top(difficulty, mode)
+            if not board:
+                print("  no scores yet")
+            for rank, entry in enumerate(board, 1):
+                print(f"  {rank:>3}. {entry.name:<16} {entry.score:>10}  level {entry.level:<3} "
+                      f"{format_time(entry.played_at)}")
+
+if __name__ == "__main__":
+    main()
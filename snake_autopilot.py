@@ -0,0 +1,285 @@
+"""
+Snake Autopilot - a pathfinding player for SnakeEngine games.
+
+The autopilot heads for the food along a shortest path, but only when the
+snake could still reach its own tail after eating; otherwise it stalls by
+following its tail until a safe path opens up. Shortest paths come from a
+distance field measured outward from the food, which is repaired cell by cell
+as the snake moves instead of being rebuilt every tick.
+
+It drives a game through next_direction(engine), so the same object steers
+the window (press A, or start with --autopilot) and headless engines:
+
+    engine = SnakeEngine(Difficulty.HARD, GameMode.EXTREME, seed=1)
+    play(engine, Autopilot())
+"""
+import heapq
+from collections import deque
+
+from snake_engine import GRID_WIDTH, GRID_HEIGHT, EMPTY, SNAKE, Direction
+
+UNREACHABLE = 1 << 30
+
+def neighbor_table(width, height):
+    """Return, for every cell, a list of (neighbor cell, Direction) pairs on the board."""
+    table = []
+    for cell in range(width * height):
+        x, y = cell % width, cell // width
+        pairs = []
+        for direction in Direction:
+            dx, dy = direction.value
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < width and 0 <= ny < height:
+                pairs.append((ny * width + nx, direction))
+        table.append(pairs)
+    return table
+
+class DistanceField:
+    """Path lengths from every open cell to a target cell, kept up to date under edits.
+
+    block() and unblock() change one cell and repair only the distances that
+    the change affects, so a tick of snake movement costs a few cells of work
+    rather than a breadth-first search of the whole board.
+    """
+
+    def __init__(self, width=GRID_WIDTH, height=GRID_HEIGHT):
+        self.neighbors = [[n for n, _ in pairs] for pairs in neighbor_table(width, height)]
+        self.open = bytearray(width * height)
+        self.distance = [UNREACHABLE] * (width * height)
+        self.target = None
+
+    def rebuild(self, grid, target):
+        """Measure every distance from scratch; cells are open where grid is EMPTY."""
+        self.open = bytearray(1 if value == EMPTY else 0 for value in grid)
+        self.target = target
+        distance = self.distance = [UNREACHABLE] * len(grid)
+        if target is None or not self.open[target]:
+            return
+        distance[target] = 0
+        queue = deque([target])
+        neighbors = self.neighbors
+        is_open = self.open
+        while queue:
+            cell = queue.popleft()
+            step = distance[cell] + 1
+            for n in neighbors[cell]:
+                if is_open[n] and distance[n] > step:
+                    distance[n] = step
+                    queue.append(n)
+
+    def unblock(self, cell):
+        """Open a cell and spread any shorter paths through it."""
+        if self.open[cell]:
+            return
+        self.open[cell] = 1
+        distance = self.distance
+        neighbors = self.neighbors
+        if cell == self.target:
+            distance[cell] = 0
+        else:
+            distance[cell] = min((distance[n] for n in neighbors[cell]), default=UNREACHABLE - 1) + 1
+            if distance[cell] >= UNREACHABLE:
+                distance[cell] = UNREACHABLE
+                return
+        queue = deque([cell])
+        is_open = self.open
+        while queue:
+            current = queue.popleft()
+            step = distance[current] + 1
+            for n in neighbors[current]:
+                if is_open[n] and distance[n] > step:
+                    distance[n] = step
+                    queue.append(n)
+
+    def block(self, cell):
+        """Close a cell and lengthen the paths that went through it."""
+        if not self.open[cell]:
+            return
+        self.open[cell] = 0
+        distance = self.distance
+        old = distance[cell]
+        distance[cell] = UNREACHABLE
+        if old >= UNREACHABLE:
+            return
+        neighbors = self.neighbors
+        is_open = self.open
+
+        # Cells whose every shortest path ran through the closed cell lose
+        # their distance. Going outward one distance at a time, a cell keeps
+        # its distance if some neighbor one step closer still has one.
+        orphans = []
+        queue = deque(n for n in neighbors[cell] if distance[n] == old + 1)
+        while queue:
+            current = queue.popleft()
+            expected = distance[current] - 1
+            if expected + 1 >= UNREACHABLE:
+                continue
+            if any(distance[n] == expected for n in neighbors[current]):
+                continue
+            distance[current] = UNREACHABLE
+            orphans.append(current)
+            queue.extend(n for n in neighbors[current] if distance[n] == expected + 2)
+
+        # Give the orphans the best distance their surviving neighbors offer
+        # and settle them shortest first
+        heap = []
+        for current in orphans:
+            best = min(distance[n] for n in neighbors[current]) + 1
+            if best < UNREACHABLE:
+                distance[current] = best
+                heap.append((best, current))
+        heapq.heapify(heap)
+        while heap:
+            d, current = heapq.heappop(heap)
+            if d != distance[current]:
+                continue
+            for n in neighbors[current]:
+                if is_open[n] and distance[n] > d + 1:
+                    distance[n] = d + 1
+                    heapq.heappush(heap, (d + 1, n))
+
+class Autopilot:
+    """Steers a SnakeEngine toward the food without trapping itself."""
+
+    def __init__(self, width=GRID_WIDTH, height=GRID_HEIGHT):
+        self.width = width
+        self.moves = neighbor_table(width, height)
+        self.field = DistanceField(width, height)
+        # What the field was last synced with
+        self.grid = None
+        self.food = None
+        self.ticks = None
+        self.head = None
+        self.tail = None
+        self.obstacle_count = 0
+
+    def cell(self, position):
+        x, y = position
+        return y * self.width + x
+
+    def sync(self, engine):
+        """Bring the distance field up to date with the engine's board."""
+        food = self.cell(engine.food_position) if engine.food_position is not None else None
+        head = self.cell(engine.snake[0])
+        tail = self.cell(engine.snake[-1])
+        follows_on = (engine.grid is self.grid and food == self.food and engine.ticks == self.ticks + 1)
+        if follows_on:
+            # One tick later with the same food: the head moved on, the tail
+            # may have left its cell and a level-up may have added obstacles
+            field = self.field
+            if engine.grid[self.tail] == EMPTY:
+                field.unblock(self.tail)
+            field.block(head)
+            for position in engine.obstacles[self.obstacle_count:]:
+                field.block(self.cell(position))
+        elif not (engine.grid is self.grid and food == self.food and engine.ticks == self.ticks):
+            self.field.rebuild(engine.grid, food)
+        self.grid = engine.grid
+        self.food = food
+        self.ticks = engine.ticks
+        self.head = head
+        self.tail = tail
+        self.obstacle_count = len(engine.obstacles)
+
+    def next_direction(self, engine):
+        """Return the Direction to move in this tick, or None to go straight."""
+        self.sync(engine)
+        head = self.head
+        distance = self.field.distance
+        grid = engine.grid
+        options = [(n, d) for n, d in self.moves[head] if grid[n] == EMPTY]
+        if not options:
+            return None
+
+        # Shortest path to the food first, then any other way toward it
+        for n, direction in sorted(options, key=lambda option: distance[option[0]]):
+            if distance[n] >= UNREACHABLE:
+                break
+            if self.safe_after(engine, self.path_from(n)):
+                return direction
+
+        # No safe way to the food yet: keep the tail in reach and stay as far
+        # from it as possible so the body unwinds
+        best = None
+        for n, direction in options:
+            reach = self.tail_distance(engine, [n])
+            if reach is not None and (best is None or reach > best[0]):
+                best = (reach, direction)
+        if best is not None:
+            return best[1]
+
+        # Trapped either way: take the move with the most room
+        return max(options, key=lambda option: self.room(grid, option[0]))[1]
+
+    def path_from(self, cell):
+        """Return the shortest path to the food starting with the given cell."""
+        distance = self.field.distance
+        neighbors = self.field.neighbors
+        path = [cell]
+        while distance[cell] > 0:
+            cell = min(neighbors[cell], key=distance.__getitem__)
+            path.append(cell)
+        return path
+
+    def simulate(self, engine, path):
+        """Return (grid, body) after the snake follows path, eating only at the food."""
+        grid = bytearray(engine.grid)
+        body = deque(self.cell(p) for p in engine.snake)
+        for cell in path:
+            body.appendleft(cell)
+            grid[cell] = SNAKE
+            if cell != self.food:
+                grid[body.pop()] = EMPTY
+        return grid, body
+
+    def safe_after(self, engine, path):
+        """Return True if the snake can still reach its tail after following path."""
+        return self.tail_distance(engine, path) is not None
+
+    def tail_distance(self, engine, path):
+        """Follow path, then return the head's distance to the tail, or None if it is cut off.
+
+        Stepping straight onto the tail is a collision, since the tail only
+        moves afterwards, so the tail counts as reached from cells at least
+        one step from the head.
+        """
+        grid, body = self.simulate(engine, path)
+        if len(body) == 1:
+            return 0
+        head, tail = body[0], body[-1]
+        neighbors = self.field.neighbors
+        seen = {head: 0}
+        queue = deque([head])
+        while queue:
+            cell = queue.popleft()
+            step = seen[cell]
+            if step and tail in neighbors[cell]:
+                return step + 1
+            for n in neighbors[cell]:
+                if grid[n] == EMPTY and n not in seen:
+                    seen[n] = step + 1
+                    queue.append(n)
+        return None
+
+    def room(self, grid, start):
+        """Count the empty cells reachable from start."""
+        neighbors = self.field.neighbors
+        seen = {start}
+        stack = [start]
+        while stack:
+            cell = stack.pop()
+            for n in neighbors[cell]:
+                if grid[n] == EMPTY and n not in seen:
+                    seen.add(n)
+                    stack.append(n)
+        return len(seen)
+
+def play(engine, agent, max_ticks=None):
+    """Play the engine's current game to the end with an agent and return the engine.
+
+    agent.next_direction(engine) picks each move. max_ticks stops a game
+    that runs on without end, such as a snake circling with no way to food.
+    """
+    while not engine.game_over and (max_ticks is None or engine.ticks < max_ticks):
+        engine.step(agent.next_direction(engine))
+    return engine
@@ -0,0 +1,275 @@
+"""
+Snake Batch - N snake boards stepped in lockstep with NumPy.
+
+Every board follows the SnakeEngine rules and draws its game seeds and its
+randomness from its own random.Random, in the same order SnakeEngine does,
+so board i created with seed s plays exactly like SnakeEngine(seed=s) given
+the same actions.
+Movement, collisions and the free-cell pools are vectorised across boards;
+only food, obstacle placement and resets (which need the RNG) run per board.
+"""
+import random
+
+import numpy as np
+
+import snake_engine
+from snake_engine import (
+    GRID_WIDTH, GRID_HEIGHT, EMPTY, SNAKE, OBSTACLE, Direction, Difficulty, GameMode,
+    board_template, is_inner_cell, splits_open_area
+)
+
+# Actions are indices into DIRECTIONS; -1 keeps the current direction
+DIRECTIONS = list(Direction)
+_DX = np.array([d.value[0] for d in DIRECTIONS], dtype=np.int32)
+_DY = np.array([d.value[1] for d in DIRECTIONS], dtype=np.int32)
+_OPPOSITE = np.array([DIRECTIONS.index(Direction.DOWN), DIRECTIONS.index(Direction.UP),
+                      DIRECTIONS.index(Direction.RIGHT), DIRECTIONS.index(Direction.LEFT)],
+                     dtype=np.int8)
+_RIGHT = DIRECTIONS.index(Direction.RIGHT)
+
+class SnakeBatch:
+    """N snake boards held as NumPy arrays and advanced together by step()."""
+
+    def __init__(self, n, difficulty=Difficulty.NORMAL, game_mode=GameMode.CLASSIC, seed=None):
+        self.n = n
+        self.difficulty = difficulty
+        self.game_mode = game_mode
+        self.width = GRID_WIDTH
+        self.height = GRID_HEIGHT
+        cells = self.width * self.height
+
+        # Board i is seeded with seed + i so it can be replayed by SnakeEngine;
+        # each game on it gets a seed of its own as in SnakeEngine.reset_game
+        if seed is None:
+            self.seed_sources = [random.Random() for _ in range(n)]
+        else:
+            self.seed_sources = [random.Random(seed + i) for i in range(n)]
+        self.rngs = [None] * n
+        self.seeds = np.zeros(n, dtype=np.uint32)
+
+        self.grid = np.zeros((n, self.height, self.width), dtype=np.uint8)
+        self._flat = self.grid.reshape(n, cells)
+        # Free pools as in SnakeEngine: inner cells fill free_cells[:, :inner]
+        # and border cells fill free_cells[:, inner:], each swap-removed, with
+        # free_slot giving every free cell's column in free_cells.
+        self._pool_of = np.array([0 if is_inner_cell(c) else 1 for c in range(cells)], dtype=np.int8)
+        inner = int(np.count_nonzero(self._pool_of == 0))
+        self._pool_base = np.array([0, inner], dtype=np.int32)
+        self.free_cells = np.zeros((n, cells), dtype=np.int32)
+        self.free_slot = np.zeros((n, cells), dtype=np.int32)
+        self.free_count = np.zeros((n, 2), dtype=np.int32)
+        # Snake bodies are ring buffers of cell indices running tail -> head
+        self.body = np.zeros((n, cells), dtype=np.int32)
+        self.head = np.zeros(n, dtype=np.int32)
+        self.tail = np.zeros(n, dtype=np.int32)
+        self.food = np.zeros(n, dtype=np.int32)
+        self.direction = np.zeros(n, dtype=np.int8)
+        self.score = np.zeros(n, dtype=np.float64)
+        self.level = np.zeros(n, dtype=np.int32)
+        self.food_eaten = np.zeros(n, dtype=np.int32)
+        self.food_for_next_level = np.zeros(n, dtype=np.int32)
+        self.ticks = np.zeros(n, dtype=np.int64)
+
+        # Result of the last finished game on each board
+        self.last_score = np.zeros(n, dtype=np.float64)
+        self.last_level = np.zeros(n, dtype=np.int32)
+        self.last_won = np.zeros(n, dtype=bool)
+
+        self._boards = np.arange(n)
+        self._points = 10 * difficulty.value["multiplier"]
+        # Balance settings are read now, so changes made to the snake_engine
+        # constants beforehand apply here as they do to SnakeEngine
+        self._first_level_food = snake_engine.FIRST_LEVEL_FOOD
+        self._level_food_step = snake_engine.LEVEL_FOOD_STEP
+        self._start_obstacles = snake_engine.START_OBSTACLES
+        self._obstacles_per_level = snake_engine.OBSTACLES_PER_LEVEL
+        self._obstacle_tries = snake_engine.OBSTACLE_TRIES
+        self._load_template()
+        for b in range(n):
+            self.reset_board(b)
+
+    def _load_template(self):
+        """Convert the engine's reset board for this mode into array rows."""
+        grid, free_inner, free_edge = board_template(self.game_mode.value["walls"])
+        cells = len(grid)
+        base = self._pool_base[1]
+        self._template_grid = np.frombuffer(bytes(grid), dtype=np.uint8)
+        self._template_cells = np.zeros(cells, dtype=np.int32)
+        self._template_cells[:len(free_inner)] = free_inner.cells
+        self._template_cells[base:base + len(free_edge)] = free_edge.cells
+        self._template_slot = np.zeros(cells, dtype=np.int32)
+        for cell, slot in free_inner.slots.items():
+            self._template_slot[cell] = slot
+        for cell, slot in free_edge.slots.items():
+            self._template_slot[cell] = base + slot
+        self._template_count = np.array([len(free_inner), len(free_edge)], dtype=np.int32)
+        self._template_start = self._template_grid.tolist().index(SNAKE)
+
+    def reset_board(self, b):
+        """Start a new game on board b, mirroring SnakeEngine.reset_game."""
+        game_seed = self.seed_sources[b].getrandbits(32)
+        self.seeds[b] = game_seed
+        self.rngs[b] = random.Random(game_seed)
+        self._flat[b] = self._template_grid
+        self.free_cells[b] = self._template_cells
+        self.free_slot[b] = self._template_slot
+        self.free_count[b] = self._template_count
+
+        self.body[b, 0] = self._template_start
+        self.head[b] = 0
+        self.tail[b] = 0
+        self.direction[b] = _RIGHT
+        self.score[b] = 0
+        self.level[b] = 1
+        self.food_eaten[b] = 0
+        self.food_for_next_level[b] = self._first_level_food
+        self.ticks[b] = 0
+
+        self.food[b] = -1
+        if self.game_mode.value["obstacles"]:
+            self._place_obstacles(b, self._start_obstacles)
+        self.food[b] = self._place_food(b)
+
+    def _take_free(self, boards, cells):
+        """Remove cells from the free pools, at most one per board."""
+        pools = self._pool_of[cells]
+        slots = self.free_slot[boards, cells]
+        top = self.free_count[boards, pools] - 1
+        last = self.free_cells[boards, self._pool_base[pools] + top]
+        self.free_cells[boards, slots] = last
+        self.free_slot[boards, last] = slots
+        self.free_count[boards, pools] = top
+
+    def _return_free(self, boards, cells):
+        """Add cells back to the free pools, at most one per board."""
+        pools = self._pool_of[cells]
+        count = self.free_count[boards, pools]
+        slots = self._pool_base[pools] + count
+        self.free_cells[boards, slots] = cells
+        self.free_slot[boards, cells] = slots
+        self.free_count[boards, pools] = count + 1
+
+    def _place_food(self, b):
+        """Pick a food cell on board b the way SnakeEngine.generate_food does, or -1 if full."""
+        inner, edge = self.free_count[b]
+        total = inner + edge
+        if total == 0:
+            return -1
+        index = self.rngs[b].randrange(total)
+        if index >= inner:
+            index = self._pool_base[1] + index - inner
+        cell = self.free_cells[b, index]
+        self._take_free(b, cell)
+        return cell
+
+    def _place_obstacles(self, b, count):
+        """Add obstacles to board b the way SnakeEngine.generate_obstacles does."""
+        randrange = self.rngs[b].randrange
+        grid = self._flat[b].tolist()
+        head = int(self.body[b, self.head[b]])
+        head_x, head_y = head % self.width, head // self.width
+        for _ in range(min(count, int(self.free_count[b, 0]))):
+            free = int(self.free_count[b, 0])
+            start = randrange(free)
+            for offset in range(min(free, self._obstacle_tries)):
+                cell = int(self.free_cells[b, (start + offset) % free])
+                x, y = cell % self.width, cell // self.width
+                if (abs(x - head_x) + abs(y - head_y) != 1
+                        and not splits_open_area(grid, cell, self.width)):
+                    break
+            else:
+                break
+            grid[cell] = OBSTACLE
+            self._flat[b, cell] = OBSTACLE
+            self._take_free(b, cell)
+
+    def step(self, actions=None):
+        """Advance every board by one tick.
+
+        actions holds one index into DIRECTIONS per board (-1 to go straight),
+        or is None to keep every snake going straight. Finished games (a
+        collision or a full board) are reset in the same call; their results
+        are kept in last_score, last_level and last_won.
+        Returns (state, rewards, dones) with state as returned by get_state().
+        """
+        boards = self._boards
+        cells = self.body.shape[1]
+        flat = self._flat
+
+        if actions is not None:
+            actions = np.asarray(actions)
+            turn = (actions >= 0) & (actions != _OPPOSITE[self.direction])
+            self.direction = np.where(turn, actions, self.direction).astype(np.int8)
+
+        head_cell = self.body[boards, self.head]
+        x = head_cell % self.width + _DX[self.direction]
+        y = head_cell // self.width + _DY[self.direction]
+        inside = (x >= 0) & (x < self.width) & (y >= 0) & (y < self.height)
+        new_cell = np.where(inside, y * self.width + x, 0)
+        # The tail has not moved yet, so running into it is a collision too
+        dead = ~inside | (flat[boards, new_cell] != EMPTY)
+        alive = ~dead
+        eat = alive & (new_cell == self.food)
+
+        # Heads move onto the new cell on every surviving board; a food cell
+        # is already out of the free pools
+        living = np.flatnonzero(alive)
+        self.head[living] = (self.head[living] + 1) % cells
+        self.body[living, self.head[living]] = new_cell[living]
+        flat[living, new_cell[living]] = SNAKE
+        self.ticks[living] += 1
+
+        # Tails move forward on boards that did not eat
+        movers = np.flatnonzero(alive & ~eat)
+        self._take_free(movers, new_cell[movers])
+        tail_cell = self.body[movers, self.tail[movers]]
+        flat[movers, tail_cell] = EMPTY
+        self._return_free(movers, tail_cell)
+        self.tail[movers] = (self.tail[movers] + 1) % cells
+
+        rewards = np.zeros(self.n, dtype=np.float64)
+        won = np.zeros(self.n, dtype=bool)
+        for b in np.flatnonzero(eat):
+            points = self._points * self.level[b]
+            rewards[b] = points
+            self.score[b] += points
+            self.food_eaten[b] += 1
+            self.food[b] = self._place_food(b)
+            if self.food[b] < 0:
+                won[b] = True
+            elif self.food_eaten[b] >= self.food_for_next_level[b]:
+                self._level_up(b)
+
+        done = dead | won
+        for b in np.flatnonzero(done):
+            self.last_score[b] = self.score[b]
+            self.last_level[b] = self.level[b]
+            self.last_won[b] = won[b]
+            self.reset_board(b)
+
+        return self.get_state(), rewards, done
+
+    def _level_up(self, b):
+        """Raise the level on board b, mirroring SnakeEngine.level_up."""
+        self.level[b] += 1
+        self.food_for_next_level[b] = self._first_level_food + (self.level[b] - 1) * self._level_food_step
+        if self.game_mode.value["obstacles"]:
+            self._place_obstacles(b, (int(self.level[b]) - 1) * self._obstacles_per_level)
+
+    def get_state(self):
+        """Return the live board arrays; copy them to keep a state across ticks."""
+        return {
+            "grid": self.grid,
+            "head": self.body[self._boards, self.head],
+            "food": self.food,
+            "direction": self.direction,
+            "score": self.score,
+            "level": self.level,
+        }
+
+    def snake(self, b):
+        """Return board b's snake as a list of (x, y) from head to tail, like SnakeEngine.snake."""
+        cells = self.body.shape[1]
+        length = (self.head[b] - self.tail[b]) % cells + 1
+        order = (self.head[b] - np.arange(length)) % cells
+        return [(int(c) % self.width, int(c) // self.width) for c in self.body[b, order]]
@@ -0,0 +1,250 @@
+"""
+Snake Bench - performance benchmarks for the snake engine and renderer.
+
+Runs without a display through SDL's dummy video driver and prints the
+results as JSON. Save a run with --output and pass it back with --baseline to
+flag regressions; the exit status is 1 if any result got worse than the
+baseline by more than --tolerance.
+
+    python snake_bench.py --output baseline.json
+    python snake_bench.py --baseline baseline.json
+"""
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+# Keep pygame's banner out of the JSON on stdout
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+from snake_engine import GRID_WIDTH, GRID_HEIGHT, SNAKE, Direction, GameMode, SnakeEngine
+
+SNAKE_LENGTHS = [1, 100, 1000]
+BOARD_FILLS = [0.10, 0.50, 0.90, 0.99]
+
+# Script timed from process start to the first menu frame on screen. It
+# runs in a scratch directory, so opening the score store creates a fresh
+# database there, which the script closes again.
+STARTUP_SCRIPT = (
+    "import snake_game; "
+    "game = snake_game.SnakeGame(); "
+    "game.draw_menu(1, 0); "
+    "game.score_store.close()"
+)
+
+def measure(func, min_time=0.2, repeat=3):
+    """Return the best seconds per call of func over repeat timed batches."""
+    best = None
+    for _ in range(repeat):
+        calls = 0
+        start = time.perf_counter()
+        elapsed = 0.0
+        while elapsed < min_time:
+            func()
+            calls += 1
+            elapsed = time.perf_counter() - start
+        per_call = elapsed / calls
+        best = per_call if best is None else min(best, per_call)
+    return best
+
+def board_cycle():
+    """Return a Hamiltonian cycle over the board as a list of (x, y).
+
+    The snake can follow it forever at any length without running into
+    itself: row 0 left to right, then rows 1.. in a zigzag over columns
+    1.., and back up column 0.
+    """
+    cycle = [(x, 0) for x in range(GRID_WIDTH)]
+    for y in range(1, GRID_HEIGHT):
+        xs = range(GRID_WIDTH - 1, 0, -1) if y % 2 else range(1, GRID_WIDTH)
+        cycle.extend((x, y) for x in xs)
+    cycle.extend((0, y) for y in range(GRID_HEIGHT - 1, 0, -1))
+    return cycle
+
+def engine_with_snake(length, engine=None):
+    """Return a Classic engine whose snake covers the first length cells of board_cycle().
+
+    The head is on cycle[length - 1]. Food is moved off the board so the
+    snake never grows. Pass engine (on a freshly reset default board) to
+    set up that one instead of a new one.
+    """
+    cycle = board_cycle()
+    if engine is None:
+        engine = SnakeEngine(game_mode=GameMode.CLASSIC, seed=0)
+    for x, y in engine.snake:
+        engine.vacate(y * GRID_WIDTH + x)
+    if engine.food_position is not None:
+        x, y = engine.food_position
+        engine.vacate(y * GRID_WIDTH + x)
+    engine.food_position = (-1, -1)
+    engine.snake.clear()
+    for x, y in reversed(cycle[:length]):
+        engine.snake.append((x, y))
+        engine.occupy(y * GRID_WIDTH + x, SNAKE)
+    return engine
+
+def cycle_turns():
+    """Return the Direction to take from every board_cycle() position to the next."""
+    cycle = board_cycle()
+    turns = []
+    for i, (x, y) in enumerate(cycle):
+        nx, ny = cycle[(i + 1) % len(cycle)]
+        turns.append(Direction((nx - x, ny - y)))
+    return turns
+
+def bench_move_snake(length):
+    """Ticks per second of move_snake with a snake of the given length."""
+    engine = engine_with_snake(length)
+    turns = cycle_turns()
+    position = [length - 1]
+
+    def tick():
+        engine.next_direction = turns[position[0]]
+        position[0] = (position[0] + 1) % len(turns)
+        if not engine.move_snake():
+            raise RuntimeError("benchmark snake collided")
+    return 1.0 / measure(tick)
+
+def bench_generate_food(fill):
+    """Seconds per generate_food call with the given fraction of the board filled."""
+    engine = engine_with_snake(max(1, int(GRID_WIDTH * GRID_HEIGHT * fill)))
+
+    def place():
+        x, y = engine.generate_food()
+        # Put the cell back so the fill level stays the same
+        engine.vacate(y * GRID_WIDTH + x)
+    return measure(place)
+
+def bench_render(game, mode):
+    """Seconds per full frame in a game mode, from draw_board through draw_ui."""
+    game.game_mode = mode
+    game.reset_game(seed=0)
+    # A mid-game board: a long snake and, in obstacle modes, a few levels of
+    # obstacles. Only drawing is timed, so the snake may overlap walls.
+    for _ in range(4):
+        game.level_up()
+    game.snake = engine_with_snake(200).snake
+
+    def frame():
+        game.draw_board()
+        game.draw_food()
+        game.draw_snake()
+        game.draw_ui()
+    return measure(frame)
+
+def bench_render_snake(game, length):
+    """Seconds per frame with a snake of the given length moving one cell every frame."""
+    game.game_mode = GameMode.CLASSIC
+    game.reset_game(seed=0)
+    engine_with_snake(length, game)
+    game.previous_tail = game.snake[-1]
+    turns = cycle_turns()
+    position = [length - 1]
+
+    def frame():
+        game.next_direction = turns[position[0]]
+        position[0] = (position[0] + 1) % len(turns)
+        game.previous_tail = game.snake[-1]
+        if not game.move_snake():
+            raise RuntimeError("benchmark snake collided")
+        game.draw_board()
+        game.draw_food()
+        game.draw_snake()
+        game.draw_ui()
+    return measure(frame)
+
+def bench_startup(repeat=3):
+    """Seconds from starting Python to the first menu frame, best of repeat runs."""
+    here = os.path.dirname(os.path.abspath(__file__))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [here, os.environ.get("PYTHONPATH")])))
+    best = None
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory() as scratch:
+            start = time.perf_counter()
+            subprocess.run([sys.executable, "-c", STARTUP_SCRIPT], cwd=scratch, check=True,
+                           stdout=subprocess.DEVNULL, env=env)
+            elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def run_benchmarks():
+    """Run every benchmark and return {name: {"value", "unit", "better"}}."""
+    results = {}
+
+    def add(name, value, unit, better):
+        results[name] = {"value": value, "unit": unit, "better": better}
+
+    for length in SNAKE_LENGTHS:
+        add(f"move_snake.length_{length}", bench_move_snake(length), "ticks/s", "higher")
+    for fill in BOARD_FILLS:
+        add(f"generate_food.fill_{round(fill * 100)}", bench_generate_food(fill) * 1e6, "us", "lower")
+
+    import snake_env
+    add("env_step.random_actions", snake_env.bench_single(100000, seed=0), "steps/s", "higher")
+
+    import snake_game
+    game = snake_game.SnakeGame(save_scores=False)
+    for mode in GameMode:
+        add(f"render.{mode.name.lower()}", bench_render(game, mode) * 1e3, "ms", "lower")
+    for length in SNAKE_LENGTHS:
+        add(f"render_snake.length_{length}", bench_render_snake(game, length) * 1e3, "ms", "lower")
+
+    add("startup.first_menu_frame", bench_startup() * 1e3, "ms", "lower")
+    return results
+
+def compare(results, baseline, tolerance):
+    """Return the names of results worse than baseline by more than tolerance."""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None or not base["value"]:
+            continue
+        change = (result["value"] - base["value"]) / base["value"]
+        if result["better"] == "higher":
+            change = -change
+        result["baseline"] = base["value"]
+        result["change"] = change
+        if change > tolerance:
+            regressions.append(name)
+    return regressions
+
+def main():
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Benchmark the snake engine and renderer.")
+    parser.add_argument("--output", help="write the JSON results to this file")
+    parser.add_argument("--baseline", help="compare against results saved earlier with --output")
+    parser.add_argument("--tolerance", type=float, default=0.15,
+                        help="allowed slowdown against the baseline as a fraction (default 0.15)")
+    args = parser.parse_args()
+
+    import pygame
+
+    report = {
+        "python": platform.python_version(),
+        "pygame": pygame.version.ver,
+        "platform": platform.platform(),
+        "results": run_benchmarks(),
+    }
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(report["results"], baseline, args.tolerance)
+        report["regressions"] = regressions
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    sys.exit(1 if regressions else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,551 @@
+"""
+Snake Engine - the snake rules without any pygame work.
+
+SnakeGame in snake_game.py draws on top of this class; simulations and
+AI evaluation can drive it directly through step() at CPU speed.
+"""
+import random
+from collections import deque
+from enum import Enum
+
+# Default board size in cells
+GRID_WIDTH = 40
+GRID_HEIGHT = 30
+
+# Limits on per-game board sizes
+MIN_BOARD_SIZE = 5
+MAX_BOARD_SIZE = 2000
+
+# Boards with more cells than this keep only occupied cells (see SparseGrid)
+DENSE_CELLS = 256 * 256
+
+# Cell values in the occupancy grid
+EMPTY = 0
+SNAKE = 1
+WALL = 2
+OBSTACLE = 3
+
+# Level progression: food needed to reach level 2, and how much more each
+# later level needs than the one before
+FIRST_LEVEL_FOOD = 5
+LEVEL_FOOD_STEP = 2
+
+# Obstacle modes start with START_OBSTACLES and reaching level n adds
+# (n - 1) * OBSTACLES_PER_LEVEL more
+START_OBSTACLES = 2
+OBSTACLES_PER_LEVEL = 1
+
+# Cells tried for one obstacle before giving up on the rest, so placement
+# stays constant-time once few safe cells are left
+OBSTACLE_TRIES = 100
+
+# Random picks for a free cell on a sparse board before scanning for one
+FREE_CELL_TRIES = 100
+
+# What ended a game, as set in SnakeEngine.death_cause (None for a win)
+DEATH_CAUSES = {SNAKE: "self", WALL: "wall", OBSTACLE: "obstacle"}
+EDGE = "edge"
+
+class Direction(Enum):
+    UP = (0, -1)
+    DOWN = (0, 1)
+    LEFT = (-1, 0)
+    RIGHT = (1, 0)
+
+class Difficulty(Enum):
+    EASY = {"speed": 8, "name": "Easy", "multiplier": 1}
+    NORMAL = {"speed": 12, "name": "Normal", "multiplier": 1.5}
+    HARD = {"speed": 16, "name": "Hard", "multiplier": 2}
+
+class GameMode(Enum):
+    CLASSIC = {"name": "Classic", "walls": False, "obstacles": False}
+    WALLS = {"name": "Walls", "walls": True, "obstacles": False}
+    OBSTACLES = {"name": "Obstacles", "walls": False, "obstacles": True}
+    EXTREME = {"name": "Extreme", "walls": True, "obstacles": True}
+
+OPPOSITE = {
+    Direction.UP: Direction.DOWN,
+    Direction.DOWN: Direction.UP,
+    Direction.LEFT: Direction.RIGHT,
+    Direction.RIGHT: Direction.LEFT,
+}
+
+def is_inner_cell(cell, width=GRID_WIDTH, height=GRID_HEIGHT):
+    """Return True if the cell is off the border, where obstacles may go."""
+    x, y = cell % width, cell // width
+    return 0 < x < width - 1 and 0 < y < height - 1
+
+class CellPool:
+    """A set of cells with O(1) add, discard and uniform sampling.
+
+    Cells sit in a list; a discard moves the last cell into the hole and the
+    slots map records where each cell lives. While journal is a list, every
+    change is appended to it as (pool, cell, slot) so undo() can reverse it.
+    """
+
+    def __init__(self, cells=()):
+        self.cells = []
+        self.slots = {}
+        self.journal = None
+        for cell in cells:
+            self.add(cell)
+
+    def __len__(self):
+        return len(self.cells)
+
+    def __contains__(self, cell):
+        return cell in self.slots
+
+    def add(self, cell):
+        """Add a cell if it is not already in the pool."""
+        if cell not in self.slots:
+            self.slots[cell] = len(self.cells)
+            self.cells.append(cell)
+            if self.journal is not None:
+                self.journal.append((self, cell, -1))
+
+    def discard(self, cell):
+        """Remove a cell if it is in the pool."""
+        slot = self.slots.pop(cell, None)
+        if slot is None:
+            return
+        last = self.cells.pop()
+        if last != cell:
+            self.cells[slot] = last
+            self.slots[last] = slot
+        if self.journal is not None:
+            self.journal.append((self, cell, slot))
+
+    def undo(self, cell, slot):
+        """Reverse the latest change: the add of cell (slot -1) or its discard from slot."""
+        if slot < 0:
+            self.cells.pop()
+            del self.slots[cell]
+            return
+        if slot < len(self.cells):
+            moved = self.cells[slot]
+            self.slots[moved] = len(self.cells)
+            self.cells.append(moved)
+            self.cells[slot] = cell
+        else:
+            self.cells.append(cell)
+        self.slots[cell] = slot
+
+    def copy(self):
+        """Return an independent copy of the pool."""
+        pool = CellPool()
+        pool.cells = self.cells.copy()
+        pool.slots = self.slots.copy()
+        return pool
+
+class SparseGrid:
+    """An occupancy grid for very large boards that stores only occupied cells.
+
+    It is indexed by cell like the bytearray grid of smaller boards. Border
+    walls are implied by the walls flag rather than stored, so memory grows
+    with the snake and obstacles instead of with the board.
+    """
+
+    def __init__(self, width, height, walls):
+        self.width = width
+        self.height = height
+        self.walls = walls
+        self.cells = {}
+
+    def __len__(self):
+        return self.width * self.height
+
+    def __getitem__(self, cell):
+        value = self.cells.get(cell)
+        if value is not None:
+            return value
+        if self.walls and not is_inner_cell(cell, self.width, self.height):
+            return WALL
+        return EMPTY
+
+    def __setitem__(self, cell, value):
+        if value == EMPTY:
+            self.cells.pop(cell, None)
+        else:
+            self.cells[cell] = value
+
+    def occupied(self):
+        """Return the number of cells that are not EMPTY."""
+        walls = 2 * (self.width + self.height) - 4 if self.walls else 0
+        return len(self.cells) + walls
+
+def splits_open_area(grid, cell, width):
+    """Return True if blocking an inner cell could cut the open cells around it apart.
+
+    Open cells are the ones a snake can move through: empty, food and snake
+    cells. Blocking a cell keeps every open cell reachable when its open side
+    neighbours join up through the ring of eight cells around it, so only
+    that ring is looked at. A cell whose neighbours only meet further away
+    counts as a split too, which errs on the safe side.
+    """
+    # The ring clockwise from the cell above
+    ring = [grid[cell + offset] not in (WALL, OBSTACLE)
+            for offset in (-width, 1 - width, 1, 1 + width, width, width - 1, -1, -1 - width)]
+    # Each open side cell starts a group; an open corner between two open
+    # side cells joins their groups
+    groups = 0
+    for side in range(0, 8, 2):
+        if ring[side]:
+            groups += 1
+            if ring[side + 1] and ring[(side + 2) % 8]:
+                groups -= 1
+    return groups > 1
+
+def wall_positions(width=GRID_WIDTH, height=GRID_HEIGHT):
+    """Return the border cells walled off in wall modes, in placement order."""
+    walls = []
+    # Top and bottom walls
+    for x in range(width):
+        walls.append((x, 0))
+        walls.append((x, height - 1))
+    # Left and right walls
+    for y in range(height):
+        walls.append((0, y))
+        walls.append((width - 1, y))
+    return walls
+
+# Freshly reset boards (grid, inner pool, edge pool) keyed by (walls, width, height)
+_board_templates = {}
+
+def board_template(walls, width=GRID_WIDTH, height=GRID_HEIGHT):
+    """Return the grid and free pools of a reset board before obstacles and food.
+
+    The result is shared between games; use new_board() for a private copy.
+    """
+    key = (walls, width, height)
+    template = _board_templates.get(key)
+    if template is None:
+        grid = bytearray(width * height)
+        cells = range(width * height)
+        free_inner = CellPool(c for c in cells if is_inner_cell(c, width, height))
+        free_edge = CellPool(c for c in cells if not is_inner_cell(c, width, height))
+        start = (height // 2) * width + width // 2
+        grid[start] = SNAKE
+        free_inner.discard(start)
+        if walls:
+            for x, y in wall_positions(width, height):
+                cell = y * width + x
+                grid[cell] = WALL
+                free_edge.discard(cell)
+        template = (grid, free_inner, free_edge)
+        _board_templates[key] = template
+    return template
+
+def new_board(walls, width=GRID_WIDTH, height=GRID_HEIGHT):
+    """Return a private copy of board_template(), or a SparseGrid and no pools on huge boards."""
+    if width * height > DENSE_CELLS:
+        grid = SparseGrid(width, height, walls)
+        grid[(height // 2) * width + width // 2] = SNAKE
+        return grid, None, None
+    grid, free_inner, free_edge = board_template(walls, width, height)
+    return bytearray(grid), free_inner.copy(), free_edge.copy()
+
+class SnakeEngine:
+    """The snake rules on a width x height board.
+
+    Boards over DENSE_CELLS cells use a SparseGrid and sample food and
+    obstacle cells by retrying random picks instead of keeping free pools;
+    their walls are left out of self.walls and implied by the grid.
+
+    Obstacles never go next to the snake's head or where they would split
+    the open cells in two, so the food and every free cell stay reachable.
+    Set connected_obstacles to False before reset_game() for the older
+    placement that allowed both, which replays recorded with it need.
+    """
+
+    def __init__(self, difficulty=Difficulty.NORMAL, game_mode=GameMode.CLASSIC, seed=None,
+                 width=GRID_WIDTH, height=GRID_HEIGHT):
+        if not (MIN_BOARD_SIZE <= width <= MAX_BOARD_SIZE and MIN_BOARD_SIZE <= height <= MAX_BOARD_SIZE):
+            raise ValueError(f"board size must be between {MIN_BOARD_SIZE} and {MAX_BOARD_SIZE} cells a side")
+        self.difficulty = difficulty
+        self.game_mode = game_mode
+        self.width = width
+        self.height = height
+        self.sparse = width * height > DENSE_CELLS
+        self.connected_obstacles = True
+        # Every game draws its own seed from here, so one game can be played
+        # again from its seed and turns alone
+        self.seed_source = random.Random(seed)
+        self.reset_game()
+
+    def reset_game(self, seed=None):
+        """Reset the game to initial state, including walls and obstacles for the mode.
+
+        seed replays a particular game; by default the next seed is drawn.
+        """
+        if seed is None:
+            seed = self.seed_source.getrandbits(32)
+        self.seed = seed
+        self.rng = random.Random(seed)
+
+        # Snake starting position (center of the board)
+        start_x = self.width // 2
+        start_y = self.height // 2
+        self.snake = deque([(start_x, start_y)])
+        self.direction = Direction.RIGHT
+        self.next_direction = Direction.RIGHT
+
+        # Game stats
+        self.score = 0
+        self.level = 1
+        self.food_eaten = 0
+        self.ticks = 0
+        self.game_over = False
+        self.won = False
+        self.death_cause = None
+
+        # Level progression
+        self.food_for_next_level = FIRST_LEVEL_FOOD
+
+        # Board contents; food goes last so it never lands on a wall or obstacle.
+        # The grid mirrors snake, walls and obstacles one byte per cell so
+        # collision checks never scan the lists, and the free pools hold every
+        # cell that is empty and not food, split into the border and the
+        # inside so obstacles can be drawn from the inside alone.
+        self.food_position = None
+        self.grid, self.free_inner, self.free_edge = new_board(
+            self.game_mode.value["walls"], self.width, self.height)
+        self.walls = []
+        self.obstacles = []
+        if self.game_mode.value["walls"] and not self.sparse:
+            self.walls = self.generate_walls()
+        if self.game_mode.value["obstacles"]:
+            self.obstacles = self.generate_obstacles(START_OBSTACLES)
+        self.food_position = self.generate_food()
+
+    def occupy(self, cell, value):
+        """Mark a cell as snake, wall or obstacle and take it out of the free pools."""
+        self.grid[cell] = value
+        if self.sparse:
+            return
+        if is_inner_cell(cell, self.width, self.height):
+            self.free_inner.discard(cell)
+        else:
+            self.free_edge.discard(cell)
+
+    def vacate(self, cell):
+        """Clear a cell and return it to the free pools."""
+        self.grid[cell] = EMPTY
+        if self.sparse:
+            return
+        if is_inner_cell(cell, self.width, self.height):
+            self.free_inner.add(cell)
+        else:
+            self.free_edge.add(cell)
+
+    def generate_food(self):
+        """Generate food on a random free cell, or return None if the board is full."""
+        if self.sparse:
+            if self.grid.occupied() >= self.width * self.height:
+                return None
+            return self.sample_free_cell(0, 0, self.width, self.height)
+        inner = len(self.free_inner)
+        total = inner + len(self.free_edge)
+        if total == 0:
+            return None
+        index = self.rng.randrange(total)
+        if index < inner:
+            cell = self.free_inner.cells[index]
+            self.free_inner.discard(cell)
+        else:
+            cell = self.free_edge.cells[index - inner]
+            self.free_edge.discard(cell)
+        return (cell % self.width, cell // self.width)
+
+    def sample_free_cell(self, left, top, right, bottom):
+        """Return a random free (x, y), not food, in [left, right) x [top, bottom), or None.
+
+        Used on sparse boards, which are nearly empty, so a few random picks
+        find a free cell. After FREE_CELL_TRIES misses the area is scanned
+        from a random cell on, so a full area returns None instead of
+        picking forever.
+        """
+        grid = self.grid
+        for _ in range(FREE_CELL_TRIES):
+            x = self.rng.randrange(left, right)
+            y = self.rng.randrange(top, bottom)
+            if grid[y * self.width + x] == EMPTY and not self.is_food((x, y)):
+                return (x, y)
+        area_width = right - left
+        area = area_width * (bottom - top)
+        start = self.rng.randrange(area)
+        for i in range(area):
+            y, x = divmod((start + i) % area, area_width)
+            x += left
+            y += top
+            if grid[y * self.width + x] == EMPTY and not self.is_food((x, y)):
+                return (x, y)
+        return None
+
+    def is_food(self, position):
+        """Return True if food lies on an (x, y); food is not marked on the grid."""
+        return position == self.food_position
+
+    def generate_obstacles(self, count):
+        """Generate random obstacles for obstacle modes and mark them on the grid.
+
+        Fewer than count obstacles are returned if the inside of the board
+        fills up or OBSTACLE_TRIES cells in a row are not safe for one.
+        """
+        obstacles = []
+        if self.sparse:
+            # Stop before the inside could be full; snake cells on the
+            # border make this count a little early
+            room = (self.width - 2) * (self.height - 2) - len(self.grid.cells) - 1
+            for _ in range(min(count, room)):
+                for _ in range(OBSTACLE_TRIES):
+                    position = self.sample_free_cell(1, 1, self.width - 1, self.height - 1)
+                    if position is None:
+                        return obstacles
+                    x, y = position
+                    if self.obstacle_allowed(y * self.width + x):
+                        break
+                else:
+                    break
+                self.occupy(y * self.width + x, OBSTACLE)
+                obstacles.append((x, y))
+            return obstacles
+        free = self.free_inner.cells
+        for _ in range(min(count, len(free))):
+            # Take the first safe cell from a random slot on, so a placement
+            # costs one pick unless it lands on a cell that is not allowed;
+            # only the next OBSTACLE_TRIES slots are checked
+            start = self.rng.randrange(len(free))
+            for offset in range(min(len(free), OBSTACLE_TRIES)):
+                cell = free[(start + offset) % len(free)]
+                if self.obstacle_allowed(cell):
+                    break
+            else:
+                break
+            self.occupy(cell, OBSTACLE)
+            obstacles.append((cell % self.width, cell // self.width))
+        return obstacles
+
+    def obstacle_allowed(self, cell):
+        """Return True if an obstacle may go on a free cell.
+
+        It may not touch a side of the snake's head or split the open cells
+        (see splits_open_area), unless connected_obstacles is off.
+        """
+        if not self.connected_obstacles:
+            return True
+        head_x, head_y = self.snake[0]
+        x, y = cell % self.width, cell // self.width
+        if abs(x - head_x) + abs(y - head_y) == 1:
+            return False
+        return not splits_open_area(self.grid, cell, self.width)
+
+    def generate_walls(self):
+        """Generate walls around the border for wall modes."""
+        return wall_positions(self.width, self.height)
+
+    def turn(self, direction):
+        """Queue a direction change, ignoring reversals onto the snake's own neck."""
+        if direction != OPPOSITE[self.direction]:
+            self.next_direction = direction
+
+    def move_snake(self):
+        """Move the snake in the current direction.
+
+        Returns False when the game ends, either on a collision (recorded in
+        self.death_cause) or because the snake filled the board (self.won is
+        set in that case).
+        """
+        self.direction = self.next_direction
+        head_x, head_y = self.snake[0]
+        dx, dy = self.direction.value
+        new_head = (head_x + dx, head_y + dy)
+
+        # Check for collisions
+        cause = self.check_collision(new_head)
+        if cause:
+            self.death_cause = cause
+            return False
+
+        self.snake.appendleft(new_head)
+        self.occupy(new_head[1] * self.width + new_head[0], SNAKE)
+
+        # Check if food is eaten
+        if new_head == self.food_position:
+            self.score += 10 * self.difficulty.value["multiplier"] * self.level
+            self.food_eaten += 1
+            self.food_position = self.generate_food()
+
+            # No free cell left for food: the snake has filled the board
+            if self.food_position is None:
+                self.won = True
+                return False
+
+            # Check for level up
+            if self.food_eaten >= self.food_for_next_level:
+                self.level_up()
+        else:
+            # Remove tail if no food eaten
+            tail_x, tail_y = self.snake.pop()
+            self.vacate(tail_y * self.width + tail_x)
+
+        return True
+
+    def check_collision(self, position):
+        """Check if the given position results in a collision.
+
+        Returns what the snake would hit ("edge", "self", "wall" or
+        "obstacle"), or None if the cell is free.
+        """
+        x, y = position
+
+        # Leaving the board is fatal in every mode
+        if x < 0 or x >= self.width or y < 0 or y >= self.height:
+            return EDGE
+
+        # Snake, walls and obstacles all occupy their grid cell
+        return DEATH_CAUSES.get(self.grid[y * self.width + x])
+
+    def level_up(self):
+        """Increase the level and add obstacles/challenges."""
+        self.level += 1
+        self.food_for_next_level = FIRST_LEVEL_FOOD + (self.level - 1) * LEVEL_FOOD_STEP
+
+        # Add obstacles in obstacle modes
+        if self.game_mode.value["obstacles"]:
+            new_obstacles = self.generate_obstacles((self.level - 1) * OBSTACLES_PER_LEVEL)
+            self.obstacles.extend(new_obstacles)
+
+    def get_state(self):
+        """Return the current game state.
+
+        The snake deque and obstacle list are the live ones, not copies; callers
+        that keep a state across ticks must copy what they need.
+        """
+        return {
+            "snake": self.snake,
+            "direction": self.direction,
+            "food": self.food_position,
+            "obstacles": self.obstacles,
+            "score": self.score,
+            "level": self.level,
+            "game_over": self.game_over,
+            "won": self.won,
+        }
+
+    def step(self, action=None):
+        """Advance the game by one tick.
+
+        action is a Direction to turn towards, or None to keep going straight.
+        Returns (state, reward, done) where reward is the score gained this tick.
+        """
+        if self.game_over:
+            return self.get_state(), 0, True
+        if action is not None:
+            self.turn(action)
+
+        score_before = self.score
+        self.ticks += 1
+        if not self.move_snake():
+            self.game_over = True
+        return self.get_state(), self.score - score_before, self.game_over
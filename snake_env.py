@@ -0,0 +1,408 @@
+"""
+Snake Env - the snake rules as a reinforcement-learning environment.
+
+SnakeEnv plays SnakeEngine games (the rules SnakeGame runs, without pygame)
+behind the Gymnasium reset()/step() signatures, without needing Gymnasium:
+
+    env = SnakeEnv(Difficulty.HARD, GameMode.OBSTACLES, seed=0)
+    obs, info = env.reset()
+    obs, reward, terminated, truncated, info = env.step(action)
+
+Actions index ACTIONS (-1 or None keeps going straight). Observations are
+{"planes": uint8 (PLANES, height, width), "direction": uint8 one-hot (4,)},
+with one 0/1 plane each for the snake, its head, the food, walls and
+obstacles. A tick changes only a few cells, so step() updates just those
+instead of rebuilding the planes. Eating pays the level the food was eaten
+at, the score formula 10 x multiplier x level over 10 x multiplier, so
+rewards mean the same on every difficulty; dying adds death_reward.
+
+SharedVectorEnv runs many SnakeEnvs on worker processes, which write
+observations, rewards and flags straight into one shared-memory block.
+step() returns NumPy views of that block, so the learner reads a batch
+without any pickling or copying; only a byte per worker goes over a pipe
+each step.
+
+    python snake_env.py --envs 64 --workers 4 --steps 2000    # steps/s
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import time
+
+import numpy as np
+
+from snake_engine import (
+    GRID_WIDTH, GRID_HEIGHT, SNAKE, WALL, OBSTACLE, DENSE_CELLS, Direction, Difficulty, GameMode,
+    SnakeEngine
+)
+
+# Actions are indices into ACTIONS; -1 keeps the current direction
+ACTIONS = list(Direction)
+
+# Observation planes
+SNAKE_PLANE = 0
+HEAD_PLANE = 1
+FOOD_PLANE = 2
+WALL_PLANE = 3
+OBSTACLE_PLANE = 4
+PLANES = 5
+
+# Ticks after which a game is cut off (truncated)
+MAX_TICKS = 10000
+
+# Reward added when the snake dies
+DEATH_REWARD = -1.0
+
+# Worker commands and replies, one byte each
+_STEP = b"s"
+_RESET = b"r"
+_CLOSE = b"c"
+_DONE = b"d"
+_ERROR = b"!"
+
+# Fields of the shared block: name, dtype and shape after the number of envs
+_FIELDS = (
+    ("planes", np.uint8, (PLANES,)),
+    ("direction", np.uint8, (len(ACTIONS),)),
+    ("actions", np.int8, ()),
+    ("rewards", np.float32, ()),
+    ("terminated", np.bool_, ()),
+    ("truncated", np.bool_, ()),
+    ("score", np.int64, ()),
+    ("level", np.int32, ()),
+    ("final_score", np.int64, ()),
+    ("final_level", np.int32, ()),
+)
+
+# Fields start on cache-line boundaries
+_ALIGN = 64
+
+class SnakeEnv:
+    """One snake game with reset()/step() as in Gymnasium.
+
+    out, if given, is a dict of "planes" and "direction" arrays that
+    observations are written into instead of arrays of the env's own;
+    step() and reset() return those same arrays every time.
+    """
+
+    def __init__(self, difficulty=Difficulty.NORMAL, game_mode=GameMode.CLASSIC, seed=None,
+                 width=GRID_WIDTH, height=GRID_HEIGHT, max_ticks=MAX_TICKS,
+                 death_reward=DEATH_REWARD, out=None):
+        if width * height > DENSE_CELLS:
+            raise ValueError(f"observations cover the whole board, so it must have at most {DENSE_CELLS} cells")
+        self.engine = SnakeEngine(difficulty, game_mode, seed, width, height)
+        self.max_ticks = max_ticks
+        self.death_reward = death_reward
+        self.reward_scale = 1 / (10 * difficulty.value["multiplier"])
+        if out is None:
+            out = {
+                "planes": np.zeros((PLANES, height, width), dtype=np.uint8),
+                "direction": np.zeros(len(ACTIONS), dtype=np.uint8),
+            }
+        self.observation = out
+        self.planes = out["planes"]
+        self.direction = out["direction"]
+        self.obstacle_count = 0
+        # Set once a game terminates or is truncated, until reset()
+        self.ended = False
+
+    def reset(self, seed=None, options=None):
+        """Start a new game and return (observation, info).
+
+        seed reseeds the env, so this game and every one after it can be
+        played again; info["seed"] replays one game with SnakeEngine.reset_game.
+        """
+        engine = self.engine
+        if seed is not None:
+            engine.seed_source = random.Random(seed)
+        engine.reset_game()
+
+        # The board is only read in full here; step() updates single cells
+        grid = np.frombuffer(engine.grid, dtype=np.uint8).reshape(engine.height, engine.width)
+        planes = self.planes
+        np.equal(grid, SNAKE, out=planes[SNAKE_PLANE])
+        np.equal(grid, WALL, out=planes[WALL_PLANE])
+        np.equal(grid, OBSTACLE, out=planes[OBSTACLE_PLANE])
+        planes[HEAD_PLANE] = 0
+        planes[FOOD_PLANE] = 0
+        x, y = engine.snake[0]
+        planes[HEAD_PLANE, y, x] = 1
+        if engine.food_position is not None:
+            x, y = engine.food_position
+            planes[FOOD_PLANE, y, x] = 1
+        self.obstacle_count = len(engine.obstacles)
+        self.direction[:] = 0
+        self.direction[ACTIONS.index(engine.direction)] = 1
+        self.ended = False
+        return self.observation, self.info()
+
+    def step(self, action):
+        """Advance one tick; return (observation, reward, terminated, truncated, info).
+
+        terminated is set when the game ends (a collision or a full board)
+        and truncated when it reaches max_ticks; call reset() after either.
+        Stepping a finished game raises RuntimeError, as Gymnasium's
+        order checks do.
+        """
+        if self.ended:
+            raise RuntimeError("the game has ended; call reset() before step()")
+        engine = self.engine
+        planes = self.planes
+        head = engine.snake[0]
+        tail = engine.snake[-1]
+        food = engine.food_position
+        direction = engine.direction
+        turn = None if action is None or action < 0 else ACTIONS[action]
+        _, points, terminated = engine.step(turn)
+
+        if engine.snake[0] != head:
+            # The head moved on; the tail moved up unless the snake grew
+            if engine.snake[-1] != tail:
+                planes[SNAKE_PLANE, tail[1], tail[0]] = 0
+            x, y = engine.snake[0]
+            planes[SNAKE_PLANE, y, x] = 1
+            planes[HEAD_PLANE, y, x] = 1
+            planes[HEAD_PLANE, head[1], head[0]] = 0
+        if engine.food_position != food:
+            if food is not None:
+                planes[FOOD_PLANE, food[1], food[0]] = 0
+            if engine.food_position is not None:
+                x, y = engine.food_position
+                planes[FOOD_PLANE, y, x] = 1
+        for x, y in engine.obstacles[self.obstacle_count:]:
+            planes[OBSTACLE_PLANE, y, x] = 1
+        self.obstacle_count = len(engine.obstacles)
+        if engine.direction != direction:
+            self.direction[:] = 0
+            self.direction[ACTIONS.index(engine.direction)] = 1
+
+        reward = points * self.reward_scale
+        if terminated and not engine.won:
+            reward += self.death_reward
+        truncated = not terminated and engine.ticks >= self.max_ticks
+        self.ended = terminated or truncated
+        return self.observation, reward, terminated, truncated, self.info()
+
+    def info(self):
+        """Return the info dict of the current game."""
+        engine = self.engine
+        return {
+            "score": engine.score,
+            "level": engine.level,
+            "ticks": engine.ticks,
+            "seed": engine.seed,
+            "won": engine.won,
+            "death_cause": engine.death_cause,
+        }
+
+def _layout(num_envs, height, width):
+    """Return ([(name, dtype, shape, offset)], total bytes) of the shared block."""
+    fields = []
+    offset = 0
+    for name, dtype, shape in _FIELDS:
+        shape = (num_envs,) + shape + ((height, width) if name == "planes" else ())
+        fields.append((name, dtype, shape, offset))
+        size = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        offset += -(-size // _ALIGN) * _ALIGN
+    return fields, offset
+
+def _views(buffer, num_envs, height, width):
+    """Return {name: NumPy view} of the fields of a shared block."""
+    memory = np.frombuffer(buffer, dtype=np.uint8)
+    views = {}
+    for name, dtype, shape, offset in _layout(num_envs, height, width)[0]:
+        size = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        views[name] = memory[offset:offset + size].view(dtype).reshape(shape)
+    return views
+
+def _worker(conn, buffer, num_envs, start, stop, options):
+    """Step envs start..stop-1 of a SharedVectorEnv on command from its pipe."""
+    views = _views(buffer, num_envs, options["height"], options["width"])
+    seed = options.pop("seed")
+    envs = []
+    for i in range(start, stop):
+        out = {"planes": views["planes"][i], "direction": views["direction"][i]}
+        envs.append(SnakeEnv(seed=None if seed is None else seed + i, out=out, **options))
+    rewards = views["rewards"][start:stop]
+    terminated = views["terminated"][start:stop]
+    truncated = views["truncated"][start:stop]
+    score = views["score"][start:stop]
+    level = views["level"][start:stop]
+    final_score = views["final_score"][start:stop]
+    final_level = views["final_level"][start:stop]
+    try:
+        while True:
+            command = conn.recv_bytes()
+            if command == _STEP:
+                actions = views["actions"][start:stop].tolist()
+                results = [env.step(action)[1:4] for env, action in zip(envs, actions)]
+                rewards[:], terminated[:], truncated[:] = zip(*results)
+                for i, (_, ended, cut) in enumerate(results):
+                    if ended or cut:
+                        # Finished games restart at once, as in SnakeBatch
+                        final_score[i] = envs[i].engine.score
+                        final_level[i] = envs[i].engine.level
+                        envs[i].reset()
+                score[:] = [env.engine.score for env in envs]
+                level[:] = [env.engine.level for env in envs]
+            elif command.startswith(_RESET):
+                reset_seed = int(command[1:]) if len(command) > 1 else None
+                for i, env in enumerate(envs):
+                    env.reset(None if reset_seed is None else reset_seed + start + i)
+                    score[i] = 0
+                    level[i] = 1
+                rewards[:] = 0
+                terminated[:] = False
+                truncated[:] = False
+            elif command == _CLOSE:
+                break
+            conn.send_bytes(_DONE)
+    except Exception as e:
+        conn.send_bytes(_ERROR + f"{type(e).__name__}: {e}".encode())
+    finally:
+        conn.close()
+
+class SharedVectorEnv:
+    """num_envs SnakeEnvs stepped together on worker processes.
+
+    Every worker owns a slice of the envs and writes their observations,
+    rewards and flags into a shared-memory block; reset() and step() return
+    NumPy views of it, with one row per env. They are overwritten by the
+    next step, so copy what you keep. Env i is seeded with seed + i.
+    Games that end are reset within the same step: their row then holds
+    the new game's first observation, with terminated or truncated set and
+    the finished game's score and level in info["final_score"] and
+    info["final_level"].
+
+    Use it as a context manager, or call close(), to stop the workers.
+    """
+
+    def __init__(self, num_envs, difficulty=Difficulty.NORMAL, game_mode=GameMode.CLASSIC, seed=None,
+                 width=GRID_WIDTH, height=GRID_HEIGHT, max_ticks=MAX_TICKS,
+                 death_reward=DEATH_REWARD, workers=None):
+        if width * height > DENSE_CELLS:
+            raise ValueError(f"observations cover the whole board, so it must have at most {DENSE_CELLS} cells")
+        self.num_envs = num_envs
+        # Shared memory handed to the workers as they start; unlike
+        # multiprocessing.shared_memory it needs no unlinking
+        self.buffer = multiprocessing.RawArray("B", _layout(num_envs, height, width)[1])
+        views = _views(self.buffer, num_envs, height, width)
+        self.views = views
+        self.observation = {"planes": views["planes"], "direction": views["direction"]}
+        self.info = {name: views[name] for name in ("score", "level", "final_score", "final_level")}
+
+        workers = max(1, min(workers or os.cpu_count() or 1, num_envs))
+        options = {
+            "difficulty": difficulty, "game_mode": game_mode, "seed": seed,
+            "width": width, "height": height, "max_ticks": max_ticks, "death_reward": death_reward,
+        }
+        self.pipes = []
+        self.processes = []
+        bounds = [num_envs * w // workers for w in range(workers + 1)]
+        for start, stop in zip(bounds, bounds[1:]):
+            parent, child = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=_worker, daemon=True,
+                                              args=(child, self.buffer, num_envs, start, stop, options))
+            process.start()
+            child.close()
+            self.pipes.append(parent)
+            self.processes.append(process)
+
+    def reset(self, seed=None, options=None):
+        """Start a new game in every env and return (observations, info)."""
+        command = _RESET if seed is None else _RESET + str(seed).encode()
+        for pipe in self.pipes:
+            pipe.send_bytes(command)
+        self.wait()
+        return self.observation, self.info
+
+    def step_async(self, actions):
+        """Start a step with one action per env (indices into ACTIONS, -1 for straight)."""
+        self.views["actions"][:] = actions
+        for pipe in self.pipes:
+            pipe.send_bytes(_STEP)
+
+    def step_wait(self):
+        """Finish a step; return (observations, rewards, terminated, truncated, info)."""
+        self.wait()
+        views = self.views
+        return self.observation, views["rewards"], views["terminated"], views["truncated"], self.info
+
+    def step(self, actions):
+        """Step every env; see step_wait() for what is returned."""
+        self.step_async(actions)
+        return self.step_wait()
+
+    def wait(self):
+        """Wait until every worker has finished its command."""
+        for pipe in self.pipes:
+            reply = pipe.recv_bytes()
+            if reply != _DONE:
+                self.close()
+                raise RuntimeError(f"snake env worker failed: {reply[1:].decode()}")
+
+    def close(self):
+        """Stop the workers."""
+        for pipe in self.pipes:
+            try:
+                pipe.send_bytes(_CLOSE)
+            except OSError:
+                pass
+            pipe.close()
+        for process in self.processes:
+            process.join()
+        self.pipes = []
+        self.processes = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def bench_single(steps, seed, **options):
+    """Return steps per second of one SnakeEnv taking random actions."""
+    env = SnakeEnv(seed=seed, **options)
+    env.reset()
+    actions = np.random.default_rng(seed).integers(0, len(ACTIONS), steps).tolist()
+    start = time.perf_counter()
+    for action in actions:
+        _, _, terminated, truncated, _ = env.step(action)
+        if terminated or truncated:
+            env.reset()
+    return steps / (time.perf_counter() - start)
+
+def bench_vector(num_envs, workers, steps, seed, **options):
+    """Return env steps per second of a SharedVectorEnv taking random actions."""
+    rng = np.random.default_rng(seed)
+    with SharedVectorEnv(num_envs, seed=seed, workers=workers, **options) as envs:
+        envs.reset()
+        start = time.perf_counter()
+        for _ in range(steps):
+            envs.step(rng.integers(0, len(ACTIONS), num_envs, dtype=np.int8))
+        return num_envs * steps / (time.perf_counter() - start)
+
+def main():
+    """Command line entry point: measure environment steps per second."""
+    difficulties = {d.value["name"].lower(): d for d in Difficulty}
+    modes = {m.value["name"].lower(): m for m in GameMode}
+
+    parser = argparse.ArgumentParser(description="Measure snake environment steps per second.")
+    parser.add_argument("--envs", type=int, default=64, help="environments in the vector env")
+    parser.add_argument("--workers", type=int, help="worker processes (default one per core)")
+    parser.add_argument("--steps", type=int, default=1000, help="vector steps to time")
+    parser.add_argument("--difficulty", type=str.lower, choices=difficulties, default="normal")
+    parser.add_argument("--mode", type=str.lower, choices=modes, default="classic")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the games and random actions")
+    args = parser.parse_args()
+
+    options = {"difficulty": difficulties[args.difficulty], "game_mode": modes[args.mode]}
+    single = bench_single(args.envs * args.steps, args.seed, **options)
+    print(f"SnakeEnv: {single:,.0f} steps/s")
+    vector = bench_vector(args.envs, args.workers, args.steps, args.seed, **options)
+    print(f"SharedVectorEnv ({args.envs} envs, {args.workers or os.cpu_count()} workers): "
+          f"{vector:,.0f} steps/s")
+
+if __name__ == "__main__":
+    main()
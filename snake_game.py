@@ -1,18 +1,37 @@
+import time
+
+# When this module started loading, the zero point of the startup report
+IMPORT_STARTED = time.perf_counter()
+
 import pygame
-import random
-import json
+import getpass
 import os
-from enum import Enum
+import signal
+import subprocess
+import sys
+from collections import deque
+from itertools import islice
 
-# Initialize Pygame
-pygame.init()
+from snake_engine import (
+    GRID_WIDTH, GRID_HEIGHT, SNAKE, OBSTACLE, OPPOSITE, Direction, Difficulty, GameMode, SnakeEngine
+)
+from snake_replay import Replay, ReplayError, ReplayRecorder
+from snake_state import RewindBuffer, Snapshot, SnapshotError
+from frame_profiler import FrameProfiler
+from score_store import ScoreStore
+from snake_autopilot import Autopilot
 
 # Constants
-WINDOW_WIDTH = 800
-WINDOW_HEIGHT = 600
 GRID_SIZE = 20
-GRID_WIDTH = WINDOW_WIDTH // GRID_SIZE
-GRID_HEIGHT = WINDOW_HEIGHT // GRID_SIZE
+WINDOW_WIDTH = GRID_WIDTH * GRID_SIZE
+WINDOW_HEIGHT = GRID_HEIGHT * GRID_SIZE
+
+# Cells the window shows; bigger boards scroll to follow the head
+VIEW_COLUMNS = WINDOW_WIDTH // GRID_SIZE
+VIEW_ROWS = WINDOW_HEIGHT // GRID_SIZE
+
+# Board size of --marathon games
+MARATHON_SIZE = (2000, 2000)
 
 # Colors
 BLACK = (0, 0, 0)
@@ -26,310 +45,794 @@ ORANGE = (255, 165, 0)
 GRAY = (128, 128, 128)
 DARK_GREEN = (0, 128, 0)
 
-class Direction(Enum):
-    UP = (0, -1)
-    DOWN = (0, 1)
-    LEFT = (-1, 0)
-    RIGHT = (1, 0)
-
-class Difficulty(Enum):
-    EASY = {"speed": 8, "name": "Easy", "multiplier": 1}
-    NORMAL = {"speed": 12, "name": "Normal", "multiplier": 1.5}
-    HARD = {"speed": 16, "name": "Hard", "multiplier": 2}
-
-class GameMode(Enum):
-    CLASSIC = {"name": "Classic", "walls": False, "obstacles": False}
-    WALLS = {"name": "Walls", "walls": True, "obstacles": False}
-    OBSTACLES = {"name": "Obstacles", "walls": False, "obstacles": True}
-    EXTREME = {"name": "Extreme", "walls": True, "obstacles": True}
-
-class SnakeGame:
-    def __init__(self):
-        self.screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
-        pygame.display.set_caption("Snake Game - Advanced Edition")
-        self.clock = pygame.time.Clock()
-        self.font = pygame.font.Font(None, 36)
-        self.small_font = pygame.font.Font(None, 24)
-        
-        # Game state
-        self.reset_game()
-        self.difficulty = Difficulty.NORMAL
-        self.game_mode = GameMode.CLASSIC
-        self.high_scores = self.load_high_scores()
-        self.paused = False
-        
-    def reset_game(self):
-        """Reset the game to initial state."""
-        # Snake starting position (center of screen)
-        start_x = GRID_WIDTH // 2
-        start_y = GRID_HEIGHT // 2
-        self.snake = [(start_x, start_y)]
-        self.direction = Direction.RIGHT
-        self.next_direction = Direction.RIGHT
-        
-        # Game stats
-        self.score = 0
-        self.level = 1
-        self.food_eaten = 0
-        self.food_position = self.generate_food()
-        self.obstacles = []
-        self.walls = []
-        
-        # Level progression
-        self.food_for_next_level = 5
-        
-    def generate_food(self):
-        """Generate food at a random position not occupied by snake or obstacles."""
-        while True:
-            x = random.randint(0, GRID_WIDTH - 1)
-            y = random.randint(0, GRID_HEIGHT - 1)
-            if (x, y) not in self.snake and (x, y) not in self.obstacles:
-                return (x, y)
-    
-    def generate_obstacles(self, count):
-        """Generate random obstacles for obstacle modes."""
-        obstacles = []
-        for _ in range(count):
-            while True:
-                x = random.randint(1, GRID_WIDTH - 2)
-                y = random.randint(1, GRID_HEIGHT - 2)
-                pos = (x, y)
-                if (pos not in self.snake and pos != self.food_position and 
-                    pos not in obstacles):
-                    obstacles.append(pos)
-                    break
-        return obstacles
-    
-    def generate_walls(self):
-        """Generate walls around the border for wall modes."""
-        walls = []
-        # Top and bottom walls
-        for x in range(GRID_WIDTH):
-            walls.append((x, 0))
-            walls.append((x, GRID_HEIGHT - 1))
-        # Left and right walls
-        for y in range(GRID_HEIGHT):
-            walls.append((0, y))
-            walls.append((GRID_WIDTH - 1, y))
-        return walls
-    
-    def move_snake(self):
-        """Move the snake in the current direction."""
-        self.direction = self.next_direction
-        head_x, head_y = self.snake[0]
-        dx, dy = self.direction.value
-        new_head = (head_x + dx, head_y + dy)
-        
-        # Check for collisions
-        if self.check_collision(new_head):
+# Body segments from this index on share the darkest gradient colour
+GRADIENT_STEPS = 16
+
+# Rendered text surfaces kept before the cache is emptied
+TEXT_CACHE_SIZE = 256
+
+# Frames per second for input and drawing, independent of the tick rate
+FRAME_RATE = 60
+
+# Ticks run in one frame before the loop gives up catching up after a stall
+MAX_TICKS_PER_FRAME = 5
+
+# Replays of high-score games and of games that crashed are written here
+REPLAY_DIR = "replays"
+
+# A high-score game's last seconds are also saved there as a GIF, drawn by
+# frame_capture.py in its own process so the game keeps its frame rate
+HIGHLIGHT_SECONDS = 10
+CAPTURE_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "frame_capture.py")
+
+# BACKSPACE rewinds REWIND_STEP seconds, as far as REWIND_SECONDS back
+REWIND_SECONDS = 10
+REWIND_STEP = 2
+
+# A game left unfinished is saved here, with its replay so far, for --resume
+SUSPEND_FILE = "suspended.snks"
+SUSPEND_REPLAY = os.path.join(REPLAY_DIR, "suspended.snkr")
+
+# F4 writes the frame profiler's Chrome trace here
+TRACE_FILE = "frame_trace.json"
+
+# Turns that can wait for upcoming ticks, and input latencies kept for stats
+INPUT_QUEUE_SIZE = 3
+LATENCY_HISTORY = 256
+
+# (phase, time it ended) for each startup phase reached so far
+startup_marks = [("start", IMPORT_STARTED)]
+
+def init_pygame(display=True):
+    """Start only the pygame subsystems the game uses: font, and display unless drawing offscreen.
+
+    pygame.init() would also open the mixer and joysticks, which cost
+    startup time and devices the game never uses.
+    """
+    if display and not pygame.display.get_init():
+        pygame.display.init()
+    if not pygame.font.get_init():
+        pygame.font.init()
+
+def mark_startup(phase):
+    """Record that startup reached phase; returns False if it already had."""
+    if any(name == phase for name, _ in startup_marks):
+        return False
+    startup_marks.append((phase, time.perf_counter()))
+    return True
+
+def startup_report():
+    """Return a line with the milliseconds each startup phase took."""
+    parts = [f"{name} {(end - start) * 1000:.1f} ms"
+             for (_, start), (name, end) in zip(startup_marks, startup_marks[1:])]
+    total = (startup_marks[-1][1] - startup_marks[0][1]) * 1000
+    return f"startup: {', '.join(parts)}, total {total:.1f} ms"
+
+class InputQueue:
+    """Turns pressed between ticks, applied one per tick in the order pressed.
+
+    Each turn is checked against the turn queued before it rather than the
+    direction of the last tick, so UP then LEFT inside one tick both count.
+    The time from key press to the tick that applies it is recorded.
+    """
+
+    def __init__(self, size=INPUT_QUEUE_SIZE):
+        self.size = size
+        self.turns = deque()
+        self.latencies = deque(maxlen=LATENCY_HISTORY)
+
+    def clear(self):
+        """Drop all waiting turns."""
+        self.turns.clear()
+
+    def push(self, direction, current, timestamp):
+        """Queue a turn pressed at timestamp; current is the snake's direction.
+
+        Returns False if the queue is full or the turn would be a no-op or a
+        reversal after the turns already queued.
+        """
+        last = self.turns[-1][0] if self.turns else current
+        if len(self.turns) >= self.size or direction == last or direction == OPPOSITE[last]:
             return False
-        
-        self.snake.insert(0, new_head)
-        
-        # Check if food is eaten
-        if new_head == self.food_position:
-            self.score += 10 * self.difficulty.value["multiplier"] * self.level
-            self.food_eaten += 1
-            self.food_position = self.generate_food()
-            
-            # Check for level up
-            if self.food_eaten >= self.food_for_next_level:
-                self.level_up()
+        self.turns.append((direction, timestamp))
+        return True
+
+    def pop(self, now):
+        """Return the next turn to apply at time now, or None."""
+        if not self.turns:
+            return None
+        direction, timestamp = self.turns.popleft()
+        self.latencies.append(now - timestamp)
+        return direction
+
+    def latency_stats(self):
+        """Return (mean, max) input-to-move latency in seconds over recent turns."""
+        if not self.latencies:
+            return None
+        return sum(self.latencies) / len(self.latencies), max(self.latencies)
+
+class SnakeGame(SnakeEngine):
+    """Windowed snake game drawing the SnakeEngine rules with pygame.
+
+    With dirty_rects=True only the cells that changed since the last frame are
+    repainted over a cached background and pushed with display.update(rects).
+    With interpolate=True the snake glides between cells from one tick to the
+    next; this needs full redraws, so it is ignored when dirty_rects is set.
+    board_size is the (width, height) of the board in cells; boards larger
+    than the window are viewed through a camera centred on the head, and
+    only the cells in view are drawn. With offscreen=True frames are drawn
+    into a plain Surface and never shown, for capturing them. save_scores=False
+    keeps high scores in memory only, never opening the score database;
+    offscreen games never save them. highlights=False
+    skips the GIF clip of each new high score. startup_report=True prints how
+    long each startup phase took once the first menu frame is up. With
+    resume=True the game suspended when the last one quit mid-game carries
+    on, paused, instead of the menu showing.
+    """
+
+    def __init__(self, dirty_rects=False, interpolate=False, player_name=None, autopilot=False,
+                 board_size=None, offscreen=False, highlights=True, startup_report=False,
+                 resume=False, save_scores=True):
+        init_pygame(display=not offscreen)
+        mark_startup("pygame init")
+        self.offscreen = offscreen
+        self.highlights = highlights
+        self.startup_report = startup_report
+        self.resume = resume
+        if offscreen:
+            self.screen = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
+            dirty_rects = False
         else:
-            # Remove tail if no food eaten
-            self.snake.pop()
+            self.screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+            pygame.display.set_caption("Snake Game - Advanced Edition")
+        self.clock = pygame.time.Clock()
+        # Fonts and the game over overlay are made when first drawn
+        self._font = None
+        self._small_font = None
+        self.overlay = None
+        self.text_cache = {}
         
-        return True
+        # Cached background (grid, walls, obstacles) and the board layer:
+        # the background with the settled middle of the snake drawn on,
+        # which holds the cells of layer_body
+        self.background = None
+        self.board_layer = None
+        self.layer_body = None
+        # Pre-rendered head and body gradient tiles, made when first drawn
+        self.tiles = None
     
-    def check_collision(self, position):
-        """Check if the given position results in a collision."""
-        x, y = position
+        # Dirty rectangle rendering state
+        self.dirty_rects = dirty_rects
+        self.full_redraw = True
+        self.drawn_cells = set()
+        self.ui_rects = []
+        self.ui_key = None
         
-        # Check bounds (only if not in wall mode - walls handle bounds)
-        if not self.game_mode.value["walls"]:
-            if x < 0 or x >= GRID_WIDTH or y < 0 or y >= GRID_HEIGHT:
-                return True
-        else:
-            # In wall mode, going out of bounds is handled by wall collision
-            if x < 0 or x >= GRID_WIDTH or y < 0 or y >= GRID_HEIGHT:
-                return True
+        # Where the tail was before the last tick, for interpolated drawing
+        self.interpolate = interpolate and not dirty_rects
+        self.previous_tail = None
+        self.input_queue = InputQueue()
         
-        # Check self collision
-        if position in self.snake:
-            return True
+        # Top-left board cell in view
+        self.camera = (0, 0)
         
-        # Check wall collision
-        if position in self.walls:
-            return True
+        # F3 shows per-phase frame timings, F4 exports them as a trace
+        self.profiler = FrameProfiler(self, 1.0 / FRAME_RATE)
         
-        # Check obstacle collision
-        if position in self.obstacles:
-            return True
+        # High scores and leaderboards, saved on a background thread
+        self.score_store = ScoreStore() if save_scores and not offscreen else ScoreStore(None)
+        if self.score_store.error:
+            print(f"High scores will not be saved: {self.score_store.error}", file=sys.stderr)
+        self.player_name = player_name or default_player_name()
         
-        return False
-    
-    def level_up(self):
-        """Increase the level and add obstacles/challenges."""
-        self.level += 1
-        self.food_for_next_level = 5 + (self.level - 1) * 2
+        # Game state
+        width, height = board_size or (GRID_WIDTH, GRID_HEIGHT)
+        super().__init__(width=width, height=height)
+        self.paused = False
         
-        # Add obstacles in obstacle modes
-        if self.game_mode.value["obstacles"]:
-            new_obstacles = self.generate_obstacles(self.level - 1)
-            self.obstacles.extend(new_obstacles)
+        # With an autopilot set, it steers instead of the queued key presses.
+        # Its distance maps cover the whole board, so huge boards go without.
+        self.autopilot = None
+        if autopilot and not self.sparse:
+            self.autopilot = Autopilot(self.width, self.height)
+        mark_startup("setup")
+    
+    @property
+    def font(self):
+        """Large text font."""
+        if self._font is None:
+            self._font = pygame.font.Font(None, 36)
+        return self._font
     
-    def handle_input(self, event):
-        """Handle keyboard input."""
+    @property
+    def small_font(self):
+        """Small text font."""
+        if self._small_font is None:
+            self._small_font = pygame.font.Font(None, 24)
+        return self._small_font
+    
+    def handle_input(self, event, timestamp=None):
+        """Handle keyboard input; timestamp is when the event loop received it."""
+        if timestamp is None:
+            timestamp = time.perf_counter()
         if event.type == pygame.KEYDOWN:
-            if event.key == pygame.K_UP and self.direction != Direction.DOWN:
-                self.next_direction = Direction.UP
-            elif event.key == pygame.K_DOWN and self.direction != Direction.UP:
-                self.next_direction = Direction.DOWN
-            elif event.key == pygame.K_LEFT and self.direction != Direction.RIGHT:
-                self.next_direction = Direction.LEFT
-            elif event.key == pygame.K_RIGHT and self.direction != Direction.LEFT:
-                self.next_direction = Direction.RIGHT
+            if event.key == pygame.K_UP:
+                self.input_queue.push(Direction.UP, self.direction, timestamp)
+            elif event.key == pygame.K_DOWN:
+                self.input_queue.push(Direction.DOWN, self.direction, timestamp)
+            elif event.key == pygame.K_LEFT:
+                self.input_queue.push(Direction.LEFT, self.direction, timestamp)
+            elif event.key == pygame.K_RIGHT:
+                self.input_queue.push(Direction.RIGHT, self.direction, timestamp)
             elif event.key == pygame.K_SPACE:
                 self.paused = not self.paused
+            elif event.key == pygame.K_a and not self.sparse:
+                self.autopilot = None if self.autopilot else Autopilot(self.width, self.height)
+                self.input_queue.clear()
             elif event.key == pygame.K_r:
                 self.reset_game()
-                if self.game_mode.value["walls"]:
-                    self.walls = self.generate_walls()
-                if self.game_mode.value["obstacles"]:
-                    self.obstacles = self.generate_obstacles(2)
     
-    def draw_grid(self):
+    def reset_game(self, seed=None):
+        """Reset the game, drop the cached background and start recording a replay."""
+        super().reset_game(seed)
+        self.background = None
+        self.previous_tail = self.snake[-1]
+        self.input_queue.clear()
+        self.recorder = ReplayRecorder(self)
+        self.rewind_buffer = RewindBuffer(self, REWIND_SECONDS * self.difficulty.value["speed"])
+        self.is_high_score = False
+        # Games the autopilot played any part of, or that were rewound, stay
+        # off the leaderboard
+        self.autopiloted = False
+        self.rewound = False
+        # Difficulty and mode only change between games, so the high score
+        # shown every frame is looked up here
+        self.high_score = self.score_store.best(self.difficulty, self.game_mode)
+        self.update_camera()
+    
+    def tick(self):
+        """Advance the game one tick with the next queued turn, remembering where the tail was."""
+        tail = self.snake[-1]
+        length = len(self.snake)
+        if self.autopilot:
+            self.autopiloted = True
+            self.rewind_buffer.step(self.autopilot.next_direction(self))
+        else:
+            self.rewind_buffer.step(self.input_queue.pop(time.perf_counter()))
+        self.recorder.record()
+        if self.game_over:
+            self.is_high_score = self.update_high_score()
+        # A snake that grew kept its tail in place
+        self.previous_tail = tail if len(self.snake) == length else self.snake[-1]
+        self.update_camera()
+    
+    def rewind_game(self, seconds=REWIND_STEP):
+        """Take back the last seconds of play, a crash included."""
+        if not self.rewind_buffer.rewind(int(seconds * self.difficulty.value["speed"])):
+            return
+        self.rewound = True
+        self.is_high_score = False
+        self.recorder.rewind()
+        self.previous_tail = self.snake[-1]
+        self.input_queue.clear()
+        # Obstacles added since may be gone again
+        self.background = None
+        self.full_redraw = True
+        self.update_camera()
+    
+    def suspend(self):
+        """Save an unfinished game to SUSPEND_FILE so --resume can carry on with it.
+
+        Its replay is kept too unless the game could not go on the
+        leaderboard anyway; a resumed game without one stays off it.
+        """
+        if self.game_over or self.ticks == 0:
+            return
+        try:
+            Snapshot.capture(self).save(SUSPEND_FILE)
+            if self.autopiloted or self.rewound:
+                if os.path.exists(SUSPEND_REPLAY):
+                    os.remove(SUSPEND_REPLAY)
+            else:
+                os.makedirs(REPLAY_DIR, exist_ok=True)
+                self.recorder.finish().save(SUSPEND_REPLAY)
+        except OSError:
+            pass
+    
+    def resume_game(self):
+        """Carry on the game in SUSPEND_FILE, paused; returns False if there is none."""
+        try:
+            snapshot = Snapshot.load(SUSPEND_FILE)
+            snapshot.restore(self)
+        except (OSError, SnapshotError, ValueError):
+            return False
+        try:
+            replay = Replay.load(SUSPEND_REPLAY)
+        except (OSError, ReplayError):
+            replay = None
+        for path in (SUSPEND_FILE, SUSPEND_REPLAY):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        self.background = None
+        self.full_redraw = True
+        self.previous_tail = self.snake[-1]
+        self.input_queue.clear()
+        self.recorder = ReplayRecorder(self, replay)
+        self.rewind_buffer = RewindBuffer(self, REWIND_SECONDS * self.difficulty.value["speed"])
+        self.is_high_score = False
+        self.autopiloted = False
+        # A replay from before connected obstacles would not reproduce the rest
+        self.rewound = replay is None or replay.ticks != self.ticks or not replay.connected_obstacles
+        self.high_score = self.score_store.best(self.difficulty, self.game_mode)
+        self.paused = True
+        self.update_camera()
+        return True
+    
+    def update_camera(self):
+        """Centre the view on the head without looking past the board's edges.
+
+        The cached background shows the old view, so a move drops it.
+        """
+        head_x, head_y = self.snake[0]
+        x = min(max(0, head_x - VIEW_COLUMNS // 2), max(0, self.width - VIEW_COLUMNS))
+        y = min(max(0, head_y - VIEW_ROWS // 2), max(0, self.height - VIEW_ROWS))
+        if (x, y) != self.camera:
+            self.camera = (x, y)
+            self.background = None
+    
+    def cell_rect(self, x, y):
+        """Return the screen rectangle of board cell (x, y)."""
+        return pygame.Rect((x - self.camera[0]) * GRID_SIZE, (y - self.camera[1]) * GRID_SIZE,
+                           GRID_SIZE, GRID_SIZE)
+    
+    def in_view(self, x, y):
+        """Return True if board cell (x, y) is on screen."""
+        cx, cy = self.camera
+        return cx <= x < cx + VIEW_COLUMNS and cy <= y < cy + VIEW_ROWS
+    
+    def board_fits(self):
+        """Return True if the whole board is in view."""
+        return self.width <= VIEW_COLUMNS and self.height <= VIEW_ROWS
+    
+    def visible_obstacles(self):
+        """Return the obstacles in view.
+
+        Work is bounded by the view: the obstacle list is filtered while it
+        is shorter than the view has cells, after that the view is scanned.
+        """
+        if self.board_fits():
+            return self.obstacles
+        if len(self.obstacles) <= VIEW_COLUMNS * VIEW_ROWS:
+            return [(x, y) for x, y in self.obstacles if self.in_view(x, y)]
+        cx, cy = self.camera
+        grid = self.grid
+        width = self.width
+        return [(x, y)
+                for y in range(cy, min(cy + VIEW_ROWS, self.height))
+                for x in range(cx, min(cx + VIEW_COLUMNS, width))
+                if grid[y * width + x] == OBSTACLE]
+    
+    def visible_walls(self):
+        """Return the wall cells in view, worked out from the border on large boards."""
+        if not self.game_mode.value["walls"]:
+            return []
+        if self.board_fits():
+            return self.walls
+        cx, cy = self.camera
+        right = min(cx + VIEW_COLUMNS, self.width)
+        bottom = min(cy + VIEW_ROWS, self.height)
+        walls = []
+        for y in (0, self.height - 1):
+            if cy <= y < bottom:
+                walls.extend((x, y) for x in range(cx, right))
+        for x in (0, self.width - 1):
+            if cx <= x < right:
+                walls.extend((x, y) for y in range(cy, bottom))
+        return walls
+    
+    def level_up(self):
+        """Level up and drop the cached background, which may gain obstacles."""
+        super().level_up()
+        self.background = None
+    
+    def draw_grid(self, surface=None):
         """Draw a subtle grid for better visibility."""
-        for x in range(0, WINDOW_WIDTH, GRID_SIZE):
-            pygame.draw.line(self.screen, GRAY, (x, 0), (x, WINDOW_HEIGHT))
-        for y in range(0, WINDOW_HEIGHT, GRID_SIZE):
-            pygame.draw.line(self.screen, GRAY, (0, y), (WINDOW_WIDTH, y))
-    
-    def draw_snake(self):
-        """Draw the snake with a gradient effect."""
-        for i, (x, y) in enumerate(self.snake):
-            rect = pygame.Rect(x * GRID_SIZE, y * GRID_SIZE, GRID_SIZE, GRID_SIZE)
-            if i == 0:  # Head
-                pygame.draw.rect(self.screen, DARK_GREEN, rect)
-                pygame.draw.rect(self.screen, GREEN, rect, 2)
-            else:  # Body
-                color_intensity = max(100, 255 - i * 10)
-                color = (0, color_intensity, 0)
-                pygame.draw.rect(self.screen, color, rect)
+        surface = surface or self.screen
+        # Boards smaller than the window leave the rest of it blank
+        width = min(self.width, VIEW_COLUMNS) * GRID_SIZE
+        height = min(self.height, VIEW_ROWS) * GRID_SIZE
+        for x in range(0, width, GRID_SIZE):
+            pygame.draw.line(surface, GRAY, (x, 0), (x, height))
+        for y in range(0, height, GRID_SIZE):
+            pygame.draw.line(surface, GRAY, (0, y), (width, y))
+    
+    def segment_tiles(self):
+        """Return the tiles for snake segments: index 0 is the head, then body gradient steps.
+
+        Segment i uses tile min(i, GRADIENT_STEPS).
+        """
+        if self.tiles is None:
+            self.tiles = []
+            rect = pygame.Rect(0, 0, GRID_SIZE, GRID_SIZE)
+            for i in range(GRADIENT_STEPS + 1):
+                tile = pygame.Surface((GRID_SIZE, GRID_SIZE), 0, self.screen)
+                if i == 0:  # Head
+                    pygame.draw.rect(tile, DARK_GREEN, rect)
+                    pygame.draw.rect(tile, GREEN, rect, 2)
+                else:  # Body
+                    pygame.draw.rect(tile, (0, max(100, 255 - i * 10), 0), rect)
+                self.tiles.append(tile)
+        return self.tiles
+    
+    def draw_board(self):
+        """Draw the board layer: background plus the settled middle of the snake."""
+        self.update_board_layer()
+        self.screen.blit(self.board_layer, (0, 0))
+    
+    def update_board_layer(self):
+        """Bring the board layer up to date with the snake.
+
+        The layer holds snake[GRADIENT_STEPS + 1:-1], which is all one colour
+        and sits still between ticks. From tick to tick that run gains cells
+        at the front and loses them at the back, so only those are repainted
+        and frames cost the same however long the snake is. Anything else
+        (a new background, a reset or a rewind) repaints the whole run.
+        """
+        if self.background is None:
+            self.build_background()
+        snake = self.snake
+        start = GRADIENT_STEPS + 1
+        length = max(0, len(snake) - start - 1)
+        body = self.layer_body
+        new = None
+        if body and length:
+            # Cells that moved into the run since the last frame
+            for count in range(min(length, GRADIENT_STEPS) + 1):
+                if snake[start + count] == body[0]:
+                    new = count
+                    break
+        if new is None:
+            # An empty layer_body means nothing is painted on the background
+            if body is None or body:
+                self.board_layer.blit(self.background, (0, 0))
+            self.layer_body = deque()
+            self.paint_layer(list(islice(snake, start, start + length)))
+            return
+        self.paint_layer(list(islice(snake, start, start + new)))
+        while len(body) > length:
+            x, y = body.pop()
+            if self.in_view(x, y):
+                rect = self.cell_rect(x, y)
+                self.board_layer.blit(self.background, rect, rect)
+        if len(body) != length or body[-1] != snake[-2]:
+            self.layer_body = None
+            self.update_board_layer()
+    
+    def paint_layer(self, cells):
+        """Paint cells onto the board layer and add them, in order, to the front of layer_body."""
+        tile = self.segment_tiles()[GRADIENT_STEPS]
+        self.layer_body.extendleft(reversed(cells))
+        self.board_layer.blits([(tile, self.cell_rect(x, y)) for x, y in cells if self.in_view(x, y)],
+                               doreturn=False)
+    
+    def draw_snake(self, alpha=1.0):
+        """Draw the moving ends of the snake with a gradient effect.
+
+        The front GRADIENT_STEPS + 1 segments and the tail are blitted from
+        pre-rendered tiles in one call; the rest of the body is on the board
+        layer (see update_board_layer). With alpha below 1 each of these
+        segments is drawn that far along its move from the previous tick,
+        where it sat on the next segment's cell. Segments out of view are
+        skipped.
+        """
+        cx, cy = self.camera
+        # One cell of margin for segments sliding in from off screen
+        left, top = cx - 1, cy - 1
+        right, bottom = cx + VIEW_COLUMNS, cy + VIEW_ROWS
+        tiles = self.segment_tiles()
+        snake = self.snake
+        front = min(len(snake), GRADIENT_STEPS + 1)
+        segments = list(islice(snake, front + 1))
+        moving = list(enumerate(zip(segments, segments[1:] + [self.previous_tail])))[:front]
+        if len(snake) > front:
+            if alpha < 1:
+                # The run on the layer stops a cell short of the sliding tail
+                moving.append((len(snake) - 1, (snake[-1], snake[-1])))
+            moving.append((len(snake) - 1, (snake[-1], self.previous_tail)))
+        blits = []
+        for i, ((x, y), (px, py)) in moving:
+            if not (left <= x <= right and top <= y <= bottom):
+                continue
+            if alpha < 1:
+                x = px + (x - px) * alpha
+                y = py + (y - py) * alpha
+            position = (round((x - cx) * GRID_SIZE), round((y - cy) * GRID_SIZE))
+            blits.append((tiles[min(i, GRADIENT_STEPS)], position))
+        self.screen.blits(blits, doreturn=False)
+    
+    def draw_cell(self, x, y, segments):
+        """Redraw whatever moves over the background at one cell.
+
+        segments maps the front GRADIENT_STEPS snake cells to their index; any
+        other snake cell gets the darkest body colour.
+        """
+        rect = self.cell_rect(x, y)
+        if (x, y) == self.food_position:
+            pygame.draw.rect(self.screen, RED, rect)
+            pygame.draw.rect(self.screen, YELLOW, rect, 2)
+        elif self.grid[y * self.width + x] == SNAKE:
+            self.screen.blit(self.segment_tiles()[segments.get((x, y), GRADIENT_STEPS)], rect)
     
     def draw_food(self):
         """Draw the food with a pulsing effect."""
-        x, y = self.food_position
-        rect = pygame.Rect(x * GRID_SIZE, y * GRID_SIZE, GRID_SIZE, GRID_SIZE)
+        if self.food_position is None or not self.in_view(*self.food_position):
+            return
+        rect = self.cell_rect(*self.food_position)
         pygame.draw.rect(self.screen, RED, rect)
         pygame.draw.rect(self.screen, YELLOW, rect, 2)
     
-    def draw_obstacles(self):
+    def draw_obstacles(self, surface=None):
         """Draw obstacles."""
-        for x, y in self.obstacles:
-            rect = pygame.Rect(x * GRID_SIZE, y * GRID_SIZE, GRID_SIZE, GRID_SIZE)
-            pygame.draw.rect(self.screen, PURPLE, rect)
+        surface = surface or self.screen
+        for x, y in self.visible_obstacles():
+            pygame.draw.rect(surface, PURPLE, self.cell_rect(x, y))
     
-    def draw_walls(self):
+    def draw_walls(self, surface=None):
         """Draw walls."""
-        for x, y in self.walls:
-            rect = pygame.Rect(x * GRID_SIZE, y * GRID_SIZE, GRID_SIZE, GRID_SIZE)
-            pygame.draw.rect(self.screen, BLUE, rect)
+        surface = surface or self.screen
+        for x, y in self.visible_walls():
+            pygame.draw.rect(surface, BLUE, self.cell_rect(x, y))
+    
+    def build_background(self):
+        """Pre-render the grid, walls and obstacles into the cached background."""
+        self.background = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT), 0, self.screen)
+        self.background.fill(BLACK)
+        self.draw_grid(self.background)
+        self.draw_walls(self.background)
+        self.draw_obstacles(self.background)
+        self.board_layer = self.background.copy()
+        self.layer_body = None
+        self.full_redraw = True
+    
+    def render_text(self, font, text, color):
+        """Render antialiased text, reusing the surface while (font, text, color) repeats."""
+        key = (font, text, color)
+        surface = self.text_cache.get(key)
+        if surface is None:
+            # Changing values such as the score would grow the cache forever
+            if len(self.text_cache) >= TEXT_CACHE_SIZE:
+                self.text_cache.clear()
+            surface = font.render(text, True, color)
+            self.text_cache[key] = surface
+        return surface
     
     def draw_ui(self):
-        """Draw the user interface."""
+        """Draw the user interface and return the rectangles it covered."""
+        rects = []
+        
         # Score
-        score_text = self.font.render(f"Score: {self.score}", True, WHITE)
-        self.screen.blit(score_text, (10, 10))
+        score_text = self.render_text(self.font, f"Score: {self.score}", WHITE)
+        rects.append(self.screen.blit(score_text, (10, 10)))
         
         # Level
-        level_text = self.font.render(f"Level: {self.level}", True, WHITE)
-        self.screen.blit(level_text, (10, 50))
+        level_text = self.render_text(self.font, f"Level: {self.level}", WHITE)
+        rects.append(self.screen.blit(level_text, (10, 50)))
         
         # Food progress
         progress = self.food_eaten % self.food_for_next_level
-        progress_text = self.small_font.render(f"Progress: {progress}/{self.food_for_next_level}", True, WHITE)
-        self.screen.blit(progress_text, (10, 90))
+        progress_text = self.render_text(self.small_font, f"Progress: {progress}/{self.food_for_next_level}", WHITE)
+        rects.append(self.screen.blit(progress_text, (10, 90)))
         
         # Difficulty and mode
-        diff_text = self.small_font.render(f"Difficulty: {self.difficulty.value['name']}", True, WHITE)
-        self.screen.blit(diff_text, (10, 110))
+        diff_text = self.render_text(self.small_font, f"Difficulty: {self.difficulty.value['name']}", WHITE)
+        rects.append(self.screen.blit(diff_text, (10, 110)))
         
-        mode_text = self.small_font.render(f"Mode: {self.game_mode.value['name']}", True, WHITE)
-        self.screen.blit(mode_text, (10, 130))
+        mode_text = self.render_text(self.small_font, f"Mode: {self.game_mode.value['name']}", WHITE)
+        rects.append(self.screen.blit(mode_text, (10, 130)))
         
         # High score
         high_score = self.get_high_score()
-        high_text = self.small_font.render(f"High Score: {high_score}", True, WHITE)
-        self.screen.blit(high_text, (10, 150))
+        high_text = self.render_text(self.small_font, f"High Score: {high_score}", WHITE)
+        rects.append(self.screen.blit(high_text, (10, 150)))
         
         # Controls
         controls = [
             "Controls:",
             "Arrow Keys - Move",
             "SPACE - Pause",
-            "R - Restart"
+            "R - Restart",
+            "BKSP - Rewind"
         ]
         for i, control in enumerate(controls):
-            control_text = self.small_font.render(control, True, WHITE)
-            self.screen.blit(control_text, (WINDOW_WIDTH - 150, 10 + i * 20))
+            control_text = self.render_text(self.small_font, control, WHITE)
+            rects.append(self.screen.blit(control_text, (WINDOW_WIDTH - 150, 10 + i * 20)))
         
         if self.paused:
-            pause_text = self.font.render("PAUSED", True, YELLOW)
+            pause_text = self.render_text(self.font, "PAUSED", YELLOW)
             text_rect = pause_text.get_rect(center=(WINDOW_WIDTH//2, WINDOW_HEIGHT//2))
-            self.screen.blit(pause_text, text_rect)
+            rects.append(self.screen.blit(pause_text, text_rect))
+        
+        return rects
     
-    def load_high_scores(self):
-        """Load high scores from file."""
-        try:
-            if os.path.exists("high_scores.json"):
-                with open("high_scores.json", "r") as f:
-                    return json.load(f)
-        except:
-            pass
-        return {}
+    def render(self, alpha=1.0):
+        """Draw the current frame and put it on the display.
+
+        alpha is how far the game is between the last tick and the next one;
+        it only matters when interpolating.
+        """
+        if self.dirty_rects:
+            self.render_dirty()
+            return
+        
+        self.draw_board()
+        self.draw_food()
+        self.draw_snake(alpha if self.interpolate and not self.game_over else 1.0)
+        self.draw_ui()
+        
+        if self.game_over:
+            self.show_game_over()
+        
+        self.present()
     
-    def save_high_scores(self):
-        """Save high scores to file."""
-        try:
-            with open("high_scores.json", "w") as f:
-                json.dump(self.high_scores, f)
-        except:
-            pass
+    def present(self, rects=None):
+        """Put the drawn frame on the display, only the given rects if any."""
+        if self.offscreen:
+            return
+        if rects is None:
+            pygame.display.flip()
+        else:
+            pygame.display.update(rects)
+    
+    def moving_cells(self):
+        """Return the cells whose look can change from one tick to the next."""
+        cells = set()
+        for i, cell in enumerate(self.snake):
+            if i > GRADIENT_STEPS:
+                break
+            cells.add(cell)
+        cells.add(self.snake[-1])
+        if self.food_position is not None:
+            cells.add(self.food_position)
+        return cells
+    
+    def head_segments(self):
+        """Map the cells of the snake's gradient-coloured front to their index from the head."""
+        segments = {}
+        for i, cell in enumerate(self.snake):
+            if i >= GRADIENT_STEPS:
+                break
+            segments[cell] = i
+        return segments
+    
+    def cells_under(self, rect):
+        """Yield the board cells a screen rectangle overlaps."""
+        cx, cy = self.camera
+        for y in range(rect.top // GRID_SIZE, (rect.bottom - 1) // GRID_SIZE + 1):
+            for x in range(rect.left // GRID_SIZE, (rect.right - 1) // GRID_SIZE + 1):
+                yield (cx + x, cy + y)
+    
+    def repaint(self, rect):
+        """Restore the board under a screen rectangle, for dirty-rect drawing."""
+        if self.background is None:
+            return
+        self.screen.blit(self.background, rect, rect)
+        segments = self.head_segments()
+        for x, y in self.cells_under(rect):
+            if 0 <= x < self.width and 0 <= y < self.height and self.in_view(x, y):
+                self.draw_cell(x, y, segments)
+    
+    def render_dirty(self):
+        """Repaint only the changed cells over the cached background."""
+        if self.background is None:
+            self.build_background()
+        
+        segments = self.head_segments()
+        cells = self.moving_cells()
+        
+        # Pause and game over dim or cover the board, so draw those in full
+        if self.full_redraw or self.paused or self.game_over:
+            self.draw_board()
+            self.draw_food()
+            self.draw_snake()
+            self.ui_rects = self.draw_ui()
+            if self.game_over:
+                self.show_game_over()
+            self.present()
+            self.drawn_cells = cells
+            self.ui_key = None
+            self.full_redraw = self.paused or self.game_over
+            return
+        
+        dirty = cells | self.drawn_cells
+        rects = [self.cell_rect(x, y) for x, y in dirty]
+        
+        # Text is redrawn when it changes or when a changed cell lies under it;
+        # its old area is restored first so antialiased edges don't build up
+        ui_key = (self.score, self.level, self.food_eaten, self.get_high_score())
+        redraw_ui = ui_key != self.ui_key or any(
+            rect.collidelist(self.ui_rects) != -1 for rect in rects)
+        if redraw_ui:
+            for rect in self.ui_rects:
+                self.screen.blit(self.background, rect, rect)
+                dirty.update(self.cells_under(rect))
+        
+        for rect in rects:
+            self.screen.blit(self.background, rect, rect)
+        for x, y in dirty:
+            if 0 <= x < self.width and 0 <= y < self.height and self.in_view(x, y):
+                self.draw_cell(x, y, segments)
+        
+        if redraw_ui:
+            rects.extend(self.ui_rects)
+            self.ui_rects = self.draw_ui()
+            rects.extend(self.ui_rects)
+            self.ui_key = ui_key
+        
+        self.present(rects)
+        self.drawn_cells = cells
     
     def get_high_score(self):
         """Get the high score for current difficulty and mode."""
-        key = f"{self.difficulty.value['name']}_{self.game_mode.value['name']}"
-        return self.high_scores.get(key, 0)
+        return self.high_score
     
     def update_high_score(self):
-        """Update high score if current score is higher."""
-        key = f"{self.difficulty.value['name']}_{self.game_mode.value['name']}"
-        current_high = self.high_scores.get(key, 0)
-        if self.score > current_high:
-            self.high_scores[key] = self.score
-            self.save_high_scores()
-            return True
-        return False
+        """Record the finished game and return True if it set a new high score.
+
+        Autopilot games, rewound games and games on other board sizes are not recorded.
+        """
+        if self.autopiloted or self.rewound or (self.width, self.height) != (GRID_WIDTH, GRID_HEIGHT):
+            return False
+        is_high_score = self.score_store.submit(self.difficulty, self.game_mode, self.player_name,
+                                                self.score, self.level)
+        if is_high_score:
+            self.high_score = self.score
+            path = self.save_replay(f"{self.difficulty.value['name']}_{self.game_mode.value['name']}")
+            if path and self.highlights:
+                self.export_highlight(path)
+        return is_high_score
+    
+    def save_replay(self, name):
+        """Save the current game's replay as REPLAY_DIR/<name>.snkr and return its path, or None."""
+        path = os.path.join(REPLAY_DIR, f"{name}.snkr")
+        try:
+            os.makedirs(REPLAY_DIR, exist_ok=True)
+            self.recorder.finish().save(path)
+        except OSError:
+            return None
+        return path
+    
+    def export_highlight(self, replay_path):
+        """Start drawing the replay's last HIGHLIGHT_SECONDS into a GIF beside it."""
+        gif_path = os.path.splitext(replay_path)[0] + ".gif"
+        command = [sys.executable, CAPTURE_SCRIPT, replay_path, gif_path,
+                   "--last", str(HIGHLIGHT_SECONDS), "--step", "2"]
+        try:
+            subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        except OSError:
+            pass
     
     def show_game_over(self):
         """Show game over screen."""
-        is_high_score = self.update_high_score()
-        
-        overlay = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
-        overlay.set_alpha(128)
-        overlay.fill(BLACK)
-        self.screen.blit(overlay, (0, 0))
+        if self.overlay is None:
+            self.overlay = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
+            self.overlay.set_alpha(128)
+            self.overlay.fill(BLACK)
+        self.screen.blit(self.overlay, (0, 0))
         
-        game_over_text = self.font.render("GAME OVER!", True, RED)
-        score_text = self.font.render(f"Final Score: {self.score}", True, WHITE)
-        level_text = self.font.render(f"Level Reached: {self.level}", True, WHITE)
+        if self.won:
+            game_over_text = self.render_text(self.font, "YOU WIN!", GREEN)
+        else:
+            game_over_text = self.render_text(self.font, "GAME OVER!", RED)
+        score_text = self.render_text(self.font, f"Final Score: {self.score}", WHITE)
+        level_text = self.render_text(self.font, f"Level Reached: {self.level}", WHITE)
         
-        if is_high_score:
-            high_score_text = self.font.render("NEW HIGH SCORE!", True, YELLOW)
+        if self.is_high_score:
+            high_score_text = self.render_text(self.font, "NEW HIGH SCORE!", YELLOW)
             self.screen.blit(high_score_text, (WINDOW_WIDTH//2 - high_score_text.get_width()//2, WINDOW_HEIGHT//2 - 60))
         
-        restart_text = self.small_font.render("Press R to restart or ESC to quit", True, WHITE)
+        restart_text = self.render_text(self.small_font, "Press R to restart or ESC to quit", WHITE)
         
         # Center all text
         self.screen.blit(game_over_text, (WINDOW_WIDTH//2 - game_over_text.get_width()//2, WINDOW_HEIGHT//2 - 20))
@@ -337,6 +840,50 @@ class SnakeGame:
         self.screen.blit(level_text, (WINDOW_WIDTH//2 - level_text.get_width()//2, WINDOW_HEIGHT//2 + 60))
         self.screen.blit(restart_text, (WINDOW_WIDTH//2 - restart_text.get_width()//2, WINDOW_HEIGHT//2 + 100))
     
+    def draw_menu(self, selected_difficulty, selected_mode):
+        """Draw the main menu with the given difficulty and mode indices highlighted."""
+        self.screen.fill(BLACK)
+        
+        # Title
+        title_text = self.render_text(self.font, "SNAKE GAME - ADVANCED EDITION", GREEN)
+        self.screen.blit(title_text, (WINDOW_WIDTH//2 - title_text.get_width()//2, 50))
+        
+        # Difficulty selection
+        diff_title = self.render_text(self.font, "Difficulty (UP/DOWN):", WHITE)
+        self.screen.blit(diff_title, (WINDOW_WIDTH//2 - diff_title.get_width()//2, 150))
+        
+        for i, diff in enumerate(Difficulty):
+            color = YELLOW if i == selected_difficulty else WHITE
+            diff_text = self.render_text(self.small_font, diff.value['name'], color)
+            self.screen.blit(diff_text, (WINDOW_WIDTH//2 - diff_text.get_width()//2, 180 + i * 30))
+        
+        # Mode selection
+        mode_title = self.render_text(self.font, "Game Mode (LEFT/RIGHT):", WHITE)
+        self.screen.blit(mode_title, (WINDOW_WIDTH//2 - mode_title.get_width()//2, 300))
+        
+        for i, mode in enumerate(GameMode):
+            color = YELLOW if i == selected_mode else WHITE
+            mode_text = self.render_text(self.small_font, mode.value['name'], color)
+            self.screen.blit(mode_text, (WINDOW_WIDTH//2 - mode_text.get_width()//2, 330 + i * 30))
+        
+        # Instructions
+        instructions = [
+            "ENTER - Start Game",
+            "ESC - Quit",
+            "",
+            "Game Modes:",
+            "Classic - Basic snake game",
+            "Walls - Walls around the border",
+            "Obstacles - Random obstacles appear",
+            "Extreme - Walls + Obstacles"
+        ]
+        
+        for i, instruction in enumerate(instructions):
+            inst_text = self.render_text(self.small_font, instruction, WHITE)
+            self.screen.blit(inst_text, (50, 450 + i * 20))
+        
+        pygame.display.flip()
+    
     def show_menu(self):
         """Show the main menu."""
         menu_running = True
@@ -345,12 +892,14 @@ class SnakeGame:
         
         difficulties = list(Difficulty)
         modes = list(GameMode)
+        needs_redraw = True
         
         while menu_running:
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
                     return False
                 elif event.type == pygame.KEYDOWN:
+                    needs_redraw = True
                     if event.key == pygame.K_UP:
                         selected_difficulty = (selected_difficulty - 1) % len(difficulties)
                     elif event.key == pygame.K_DOWN:
@@ -363,109 +912,164 @@ class SnakeGame:
                         self.difficulty = difficulties[selected_difficulty]
                         self.game_mode = modes[selected_mode]
                         self.reset_game()
-                        if self.game_mode.value["walls"]:
-                            self.walls = self.generate_walls()
-                        if self.game_mode.value["obstacles"]:
-                            self.obstacles = self.generate_obstacles(2)
                         menu_running = False
                     elif event.key == pygame.K_ESCAPE:
                         return False
+                elif event.type == pygame.VIDEOEXPOSE:
+                    needs_redraw = True
             
-            self.screen.fill(BLACK)
-            
-            # Title
-            title_text = self.font.render("SNAKE GAME - ADVANCED EDITION", True, GREEN)
-            self.screen.blit(title_text, (WINDOW_WIDTH//2 - title_text.get_width()//2, 50))
-            
-            # Difficulty selection
-            diff_title = self.font.render("Difficulty (UP/DOWN):", True, WHITE)
-            self.screen.blit(diff_title, (WINDOW_WIDTH//2 - diff_title.get_width()//2, 150))
-            
-            for i, diff in enumerate(difficulties):
-                color = YELLOW if i == selected_difficulty else WHITE
-                diff_text = self.small_font.render(diff.value['name'], True, color)
-                self.screen.blit(diff_text, (WINDOW_WIDTH//2 - diff_text.get_width()//2, 180 + i * 30))
-            
-            # Mode selection
-            mode_title = self.font.render("Game Mode (LEFT/RIGHT):", True, WHITE)
-            self.screen.blit(mode_title, (WINDOW_WIDTH//2 - mode_title.get_width()//2, 300))
+            if not menu_running:
+                break
             
-            for i, mode in enumerate(modes):
-                color = YELLOW if i == selected_mode else WHITE
-                mode_text = self.small_font.render(mode.value['name'], True, color)
-                self.screen.blit(mode_text, (WINDOW_WIDTH//2 - mode_text.get_width()//2, 330 + i * 30))
+            # Nothing on the menu moves, so only draw it after a key press
+            if not needs_redraw:
+                self.clock.tick(60)
+                continue
+            needs_redraw = False
             
-            # Instructions
-            instructions = [
-                "ENTER - Start Game",
-                "ESC - Quit",
-                "",
-                "Game Modes:",
-                "Classic - Basic snake game",
-                "Walls - Walls around the border",
-                "Obstacles - Random obstacles appear",
-                "Extreme - Walls + Obstacles"
-            ]
-            
-            for i, instruction in enumerate(instructions):
-                inst_text = self.small_font.render(instruction, True, WHITE)
-                self.screen.blit(inst_text, (50, 450 + i * 20))
-            
-            pygame.display.flip()
+            self.draw_menu(selected_difficulty, selected_mode)
+            if mark_startup("first frame") and self.startup_report:
+                print(startup_report(), file=sys.stderr)
             self.clock.tick(60)
         
+        self.full_redraw = True
         return True
     
-    def run(self):
-        """Main game loop."""
-        if not self.show_menu():
+    def run(self, keep_open=False):
+        """Main game loop; a crash saves the game's replay before propagating.
+
+        A game left unfinished, by quitting or by SIGTERM or Ctrl+C, is
+        suspended for resume=True to pick up. With keep_open=True pygame and
+        the score store stay up afterwards, so the same game can be run again
+        without starting over.
+        """
+        try:
+            self.play()
+        except Exception:
+            # Keep what led up to the crash so it can be played back
+            self.save_replay("crash")
+            raise
+        except BaseException:
+            self.suspend()
+            raise
+        else:
+            self.suspend()
+        finally:
+            if keep_open:
+                self.score_store.flush()
+            else:
+                self.score_store.close()
+        if not keep_open:
+            pygame.quit()
+    
+    def show_window(self, visible=True):
+        """Show or hide the game window between runs."""
+        flags = pygame.SHOWN if visible else pygame.HIDDEN
+        self.screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT), flags)
+        pygame.event.clear()
+        self.background = None
+        self.full_redraw = True
+    
+    def play(self):
+        """Run menus and games until the player quits.
+
+        The game ticks at the difficulty speed on a fixed timestep while input
+        and drawing run every display frame, so a key press is seen within a
+        frame rather than within a tick.
+        """
+        if not (self.resume and self.resume_game()) and not self.show_menu():
             return
         
         running = True
-        game_over = False
+        self.accumulator = 0.0
+        self.last_time = time.perf_counter()
         
         while running:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    running = False
-                elif event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_ESCAPE:
-                        if game_over:
-                            running = False
-                        else:
-                            if not self.show_menu():
-                                running = False
-                    elif event.key == pygame.K_r and game_over:
-                        game_over = False
-                        self.reset_game()
-                        if self.game_mode.value["walls"]:
-                            self.walls = self.generate_walls()
-                        if self.game_mode.value["obstacles"]:
-                            self.obstacles = self.generate_obstacles(2)
-                    else:
-                        self.handle_input(event)
+            now = time.perf_counter()
+            if not self.game_over and not self.paused:
+                self.accumulator += now - self.last_time
+            self.last_time = now
             
-            if not game_over and not self.paused:
-                if not self.move_snake():
-                    game_over = True
+            running, changed = self.handle_events()
             
-            # Draw everything
-            self.screen.fill(BLACK)
-            self.draw_grid()
-            self.draw_walls()
-            self.draw_obstacles()
-            self.draw_food()
-            self.draw_snake()
-            self.draw_ui()
+            tick_length = 1.0 / self.difficulty.value["speed"]
+            ticks = 0
+            while self.accumulator >= tick_length and not self.game_over:
+                self.tick()
+                self.accumulator -= tick_length
+                ticks += 1
+                # After a long stall skip ahead instead of fast-forwarding
+                if ticks == MAX_TICKS_PER_FRAME:
+                    self.accumulator = 0.0
             
-            if game_over:
-                self.show_game_over()
-            
-            pygame.display.flip()
-            self.clock.tick(self.difficulty.value["speed"])
-        
-        pygame.quit()
+            # Without interpolation a frame with no tick and no input looks
+            # exactly like the last one (the profiler overlay always changes)
+            if ticks or changed or self.interpolate or self.profiler.enabled:
+                self.render(self.accumulator / tick_length)
+            self.wait_for_frame()
+    
+    def handle_events(self):
+        """Process pending events; returns (running, whether anything happened)."""
+        running = True
+        changed = False
+        for event in pygame.event.get():
+            changed = True
+            received = time.perf_counter()
+            if event.type == pygame.QUIT:
+                running = False
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_ESCAPE:
+                    if self.game_over:
+                        running = False
+                    else:
+                        if not self.show_menu():
+                            running = False
+                        self.accumulator = 0.0
+                        self.last_time = time.perf_counter()
+                elif event.key == pygame.K_r and self.game_over:
+                    self.reset_game()
+                    self.accumulator = 0.0
+                elif event.key == pygame.K_BACKSPACE:
+                    self.rewind_game()
+                    self.accumulator = 0.0
+                elif event.key == pygame.K_F3:
+                    self.profiler.toggle()
+                elif event.key == pygame.K_F4:
+                    self.profiler.export_trace(TRACE_FILE)
+                else:
+                    self.handle_input(event, received)
+        return running, changed
+    
+    def wait_for_frame(self):
+        """Sleep until the next display frame is due."""
+        self.clock.tick(FRAME_RATE)
+
+def default_player_name():
+    """Return the login name to put on the leaderboard, or "Player"."""
+    try:
+        return getpass.getuser()
+    except (KeyError, OSError):
+        return "Player"
+
+mark_startup("import")
 
 if __name__ == "__main__":
-    game = SnakeGame()
+    # --name NAME puts NAME on the leaderboard instead of the login name
+    name = sys.argv[sys.argv.index("--name") + 1] if "--name" in sys.argv[:-1] else None
+    # --board WIDTHxHEIGHT plays on a board of that many cells
+    board_size = None
+    if "--board" in sys.argv[:-1]:
+        board_size = tuple(int(n) for n in sys.argv[sys.argv.index("--board") + 1].lower().split("x"))
+    elif "--marathon" in sys.argv:
+        board_size = MARATHON_SIZE
+    game = SnakeGame(dirty_rects="--dirty-rects" in sys.argv,
+                     interpolate="--smooth" in sys.argv,
+                     player_name=name,
+                     autopilot="--autopilot" in sys.argv,
+                     board_size=board_size,
+                     highlights="--no-highlights" not in sys.argv,
+                     startup_report="--startup-report" in sys.argv,
+                     resume="--resume" in sys.argv)
+    # Shutting the machine down suspends the game like quitting does
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
     game.run()
@@ -0,0 +1,763 @@
+"""
+Snake Multiplayer - several snakes on one board over the network.
+
+An asyncio server holds any number of rooms. Each room runs its own tick
+loop with the SnakeEngine rules for every snake in it. Clients send only
+direction changes. After each tick the server sends every client the
+changes made by that tick (heads added, tails removed, food moved, snakes
+dying or spawning) as a few bytes of varints. Clients joining a room get
+one full snapshot first.
+
+    python snake_multiplayer.py server --port 5555
+    python snake_multiplayer.py play 192.168.1.20 --room cabinet --name ann
+    python snake_multiplayer.py bots --local --rooms 24 --bots 4 --seconds 10
+
+Every CHECK_INTERVAL ticks the server also sends a checksum of the room,
+so clients (and the bots command) can tell if their copy has drifted.
+"""
+import argparse
+import asyncio
+import random
+import struct
+import sys
+import time
+import zlib
+from collections import deque
+
+from snake_engine import (
+    GRID_WIDTH, GRID_HEIGHT, SNAKE, OPPOSITE, Direction, Difficulty, GameMode, SnakeEngine
+)
+from snake_replay import write_varint, read_varint
+
+DEFAULT_PORT = 5555
+
+DIRECTIONS = list(Direction)
+DIFFICULTIES = {d.value["name"].lower(): d for d in Difficulty}
+MODES = {m.value["name"].lower(): m for m in GameMode}
+
+# Food on the board at once in every room
+ROOM_FOOD = 3
+
+# Ticks a dead snake waits before it respawns
+RESPAWN_TICKS = 24
+
+# Players in one room
+MAX_PLAYERS = 16
+
+# Ticks between state checksums
+CHECK_INTERVAL = 64
+
+# Clients with more unsent bytes than this are too slow and get dropped
+MAX_BACKLOG = 256 * 1024
+
+# Largest message a client may send (a JOIN holds two short names); a
+# longer one drops the connection
+MAX_MESSAGE = 1024
+# Largest message a client accepts; a WELCOME to a full 2000x2000 board
+# takes about 3 bytes per cell
+MAX_SERVER_MESSAGE = 64 * 1024 * 1024
+
+# Message types, client to server
+JOIN = 1
+TURN = 2
+# Message types, server to client
+WELCOME = 16
+TICK = 17
+REFUSED = 18
+
+# Events in a TICK message
+HEAD = 1
+TAIL = 2
+FOOD = 3
+DIE = 4
+SPAWN = 5
+EAT = 6
+ENTER = 7
+LEAVE = 8
+CHECK = 9
+
+# Death causes sent in DIE events; "head" is two heads meeting in one cell
+CAUSES = ["edge", "self", "wall", "obstacle", "head", "left"]
+
+# Every message is a 4-byte little-endian length followed by the payload
+_LENGTH = struct.Struct("<I")
+
+def write_text(out, text):
+    """Append a varint-prefixed UTF-8 string."""
+    data = text.encode("utf-8")
+    write_varint(out, len(data))
+    out += data
+
+def read_text(data, offset):
+    """Read a string written by write_text, returning (text, next offset).
+
+    Raises IndexError or ValueError (UnicodeDecodeError included) for a
+    truncated or badly encoded string.
+    """
+    length, offset = read_varint(data, offset)
+    if offset + length > len(data):
+        raise ValueError("text runs past the end of the message")
+    return bytes(data[offset:offset + length]).decode("utf-8"), offset + length
+
+def frame(payload):
+    """Return a message ready to send."""
+    return _LENGTH.pack(len(payload)) + bytes(payload)
+
+async def read_message(reader, limit=MAX_MESSAGE):
+    """Read one message payload.
+
+    Returns None when the connection closes or sends an empty message or
+    one longer than limit bytes; the caller then drops the connection.
+    """
+    try:
+        header = await reader.readexactly(_LENGTH.size)
+        length = _LENGTH.unpack(header)[0]
+        if not 0 < length <= limit:
+            return None
+        return await reader.readexactly(length)
+    except (asyncio.IncompleteReadError, ConnectionError):
+        return None
+
+def state_checksum(width, snakes, foods):
+    """Return a CRC32 of the snakes' cells and the food, as both ends see them.
+
+    snakes maps player id to a body of (x, y) from head to tail, empty while
+    the player is dead; foods lists (x, y) or None per food slot.
+    """
+    out = bytearray()
+    for player_id in sorted(snakes):
+        write_varint(out, player_id)
+        write_varint(out, len(snakes[player_id]))
+        for x, y in snakes[player_id]:
+            write_varint(out, y * width + x)
+    for food in foods:
+        write_varint(out, 0 if food is None else food[1] * width + food[0] + 1)
+    return zlib.crc32(out)
+
+class Player:
+    """One snake in a room."""
+
+    def __init__(self, player_id, name):
+        self.id = player_id
+        self.name = name
+        self.body = deque()
+        self.direction = Direction.RIGHT
+        self.next_direction = Direction.RIGHT
+        self.eaten = 0
+        self.alive = False
+        self.respawn_tick = 0
+
+    def turn(self, direction):
+        """Queue a direction change, ignoring reversals as SnakeEngine.turn does."""
+        if direction != OPPOSITE[self.direction]:
+            self.next_direction = direction
+
+class RoomEngine(SnakeEngine):
+    """Several snakes on one SnakeEngine board, all moved each tick.
+
+    The board, walls, obstacles, free pools, food placement and collision
+    checks are SnakeEngine's; the single snake SnakeEngine starts with is
+    taken off the board. tick() returns the events it caused, encoded for a
+    TICK message.
+    """
+
+    def __init__(self, difficulty=Difficulty.NORMAL, game_mode=GameMode.CLASSIC, seed=None,
+                 width=GRID_WIDTH, height=GRID_HEIGHT):
+        self.players = {}
+        self.foods = []
+        super().__init__(difficulty, game_mode, seed, width, height)
+
+    def reset_game(self, seed=None):
+        """Set up an empty board with ROOM_FOOD food and no snakes."""
+        self.foods = []
+        super().reset_game(seed)
+        for x, y in self.snake:
+            self.vacate(y * self.width + x)
+        self.snake.clear()
+        self.foods = [self.food_position]
+        for _ in range(ROOM_FOOD - 1):
+            self.foods.append(self.generate_food())
+        self.pending = bytearray()
+        for player in self.players.values():
+            player.body.clear()
+            player.alive = False
+            player.respawn_tick = 0
+
+    def cell(self, position):
+        x, y = position
+        return y * self.width + x
+
+    def is_food(self, position):
+        """Return True if any of the room's ROOM_FOOD food lies on an (x, y)."""
+        return position in self.foods
+
+    def add_player(self, name):
+        """Add a player who spawns on the next tick and return it, or None if the room is full."""
+        free = [i for i in range(MAX_PLAYERS) if i not in self.players]
+        if not free:
+            return None
+        player = Player(free[0], name)
+        player.respawn_tick = self.ticks + 1
+        self.players[player.id] = player
+        self.pending.append(ENTER)
+        write_varint(self.pending, player.id)
+        write_text(self.pending, name)
+        return player
+
+    def remove_player(self, player):
+        """Take a player's snake off the board and out of the room."""
+        if player.alive:
+            self.kill(player, "left", self.pending)
+        del self.players[player.id]
+        self.pending.append(LEAVE)
+        write_varint(self.pending, player.id)
+
+    def kill(self, player, cause, events):
+        """End a player's snake; it respawns after RESPAWN_TICKS."""
+        for position in player.body:
+            self.vacate(self.cell(position))
+        player.body.clear()
+        player.alive = False
+        player.respawn_tick = self.ticks + RESPAWN_TICKS
+        events.append(DIE)
+        write_varint(events, player.id)
+        events.append(CAUSES.index(cause))
+
+    def spawn(self, player, events):
+        """Put a player's snake on a random free cell inside the border."""
+        if self.sparse:
+            position = self.sample_free_cell(1, 1, self.width - 1, self.height - 1)
+            if position is None:
+                return
+            cell = self.cell(position)
+        elif len(self.free_inner):
+            cell = self.free_inner.cells[self.rng.randrange(len(self.free_inner))]
+        else:
+            return
+        self.occupy(cell, SNAKE)
+        player.body.append((cell % self.width, cell // self.width))
+        player.direction = player.next_direction = self.rng.choice(DIRECTIONS)
+        player.alive = True
+        events.append(SPAWN)
+        write_varint(events, player.id)
+        write_varint(events, cell)
+        events.append(DIRECTIONS.index(player.direction))
+
+    def tick(self):
+        """Move every snake one cell and return the TICK message payload."""
+        self.ticks += 1
+        events = self.pending
+        self.pending = bytearray()
+        living = [p for p in self.players.values() if p.alive]
+
+        # All snakes move at once: a head may not enter any cell occupied
+        # before the move, tails included, nor a cell another head enters
+        heads = {}
+        for player in living:
+            player.direction = player.next_direction
+            head_x, head_y = player.body[0]
+            dx, dy = player.direction.value
+            heads[player.id] = (head_x + dx, head_y + dy)
+        entering = {}
+        for head in heads.values():
+            entering[head] = entering.get(head, 0) + 1
+        dying = []
+        for player in living:
+            head = heads[player.id]
+            cause = self.check_collision(head) or ("head" if entering[head] > 1 else None)
+            if cause:
+                dying.append((player, cause))
+
+        dead = {player.id for player, _ in dying}
+        for player in living:
+            if player.id in dead:
+                continue
+            head = heads[player.id]
+            player.body.appendleft(head)
+            self.occupy(self.cell(head), SNAKE)
+            events.append(HEAD)
+            write_varint(events, player.id)
+            write_varint(events, self.cell(head))
+            if head in self.foods:
+                slot = self.foods.index(head)
+                player.eaten += 1
+                self.foods[slot] = self.generate_food()
+                events.append(EAT)
+                write_varint(events, player.id)
+                events.append(FOOD)
+                events.append(slot)
+                food = self.foods[slot]
+                write_varint(events, 0 if food is None else self.cell(food) + 1)
+            else:
+                tail = player.body.pop()
+                self.vacate(self.cell(tail))
+                events.append(TAIL)
+                write_varint(events, player.id)
+
+        for player, cause in dying:
+            self.kill(player, cause, events)
+        for player in self.players.values():
+            if not player.alive and player.respawn_tick <= self.ticks:
+                self.spawn(player, events)
+
+        if self.ticks % CHECK_INTERVAL == 0:
+            events.append(CHECK)
+            write_varint(events, self.checksum())
+
+        payload = bytearray([TICK])
+        write_varint(payload, self.ticks)
+        return payload + events
+
+    def checksum(self):
+        """Return state_checksum() of this room."""
+        return state_checksum(self.width, {p.id: p.body for p in self.players.values()}, self.foods)
+
+    def snapshot(self, player_id):
+        """Return the WELCOME payload telling player_id the whole room."""
+        out = bytearray([WELCOME])
+        write_varint(out, player_id)
+        write_varint(out, self.width)
+        write_varint(out, self.height)
+        out.append(int(self.game_mode.value["walls"]))
+        out.append(self.difficulty.value["speed"])
+        out += struct.pack("<d", 10 * self.difficulty.value["multiplier"])
+        write_varint(out, self.ticks)
+        write_varint(out, len(self.obstacles))
+        for position in self.obstacles:
+            write_varint(out, self.cell(position))
+        write_varint(out, len(self.foods))
+        for food in self.foods:
+            write_varint(out, 0 if food is None else self.cell(food) + 1)
+        others = [p for p in self.players.values() if p.id != player_id]
+        write_varint(out, len(others))
+        for player in others:
+            write_varint(out, player.id)
+            write_text(out, player.name)
+            write_varint(out, player.eaten)
+            write_varint(out, len(player.body))
+            for position in player.body:
+                write_varint(out, self.cell(position))
+        return out
+
+class Room:
+    """A RoomEngine with its connected clients and its tick loop."""
+
+    def __init__(self, name, engine):
+        self.name = name
+        self.engine = engine
+        self.writers = {}
+        self.task = None
+        self.bytes_sent = 0
+
+    def broadcast(self, payload):
+        """Send a message to every client, dropping any that cannot keep up."""
+        message = frame(payload)
+        for player_id, writer in list(self.writers.items()):
+            if writer.transport.get_write_buffer_size() > MAX_BACKLOG:
+                writer.close()
+                continue
+            writer.write(message)
+            self.bytes_sent += len(message)
+
+    async def run(self):
+        """Tick at the difficulty speed while anyone is in the room."""
+        loop = asyncio.get_running_loop()
+        interval = 1.0 / self.engine.difficulty.value["speed"]
+        next_tick = loop.time()
+        while self.writers:
+            next_tick += interval
+            delay = next_tick - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            else:
+                # Fell behind; skip ahead rather than racing to catch up
+                next_tick = loop.time()
+            self.broadcast(self.engine.tick())
+
+class SnakeServer:
+    """Accepts clients and keeps one Room per room name."""
+
+    def __init__(self, difficulty=Difficulty.NORMAL, game_mode=GameMode.CLASSIC,
+                 width=GRID_WIDTH, height=GRID_HEIGHT, seed=None):
+        self.difficulty = difficulty
+        self.game_mode = game_mode
+        self.width = width
+        self.height = height
+        self.seeds = random.Random(seed)
+        self.rooms = {}
+
+    async def serve(self, host="0.0.0.0", port=DEFAULT_PORT):
+        """Start listening and return the asyncio server."""
+        return await asyncio.start_server(self.handle_client, host, port)
+
+    async def handle_client(self, reader, writer):
+        """Serve one connection: a JOIN, then turns until it closes."""
+        room = player = None
+        try:
+            message = await read_message(reader)
+            if not message or message[0] != JOIN:
+                return
+            try:
+                room_name, offset = read_text(message, 1)
+                name, _ = read_text(message, offset)
+            except (IndexError, ValueError):
+                return
+            room = self.rooms.get(room_name)
+            if room is None:
+                engine = RoomEngine(self.difficulty, self.game_mode, self.seeds.getrandbits(32),
+                                    self.width, self.height)
+                room = self.rooms[room_name] = Room(room_name, engine)
+            player = room.engine.add_player(name[:32])
+            if player is None:
+                refused = bytearray([REFUSED])
+                write_text(refused, "room is full")
+                writer.write(frame(refused))
+                return
+            writer.write(frame(room.engine.snapshot(player.id)))
+            room.writers[player.id] = writer
+            if room.task is None or room.task.done():
+                room.task = asyncio.create_task(room.run())
+
+            while True:
+                message = await read_message(reader)
+                # Anything but a well-formed turn drops the connection
+                if message is None or len(message) != 2 or message[0] != TURN or message[1] >= len(DIRECTIONS):
+                    break
+                player.turn(DIRECTIONS[message[1]])
+        finally:
+            if player is not None:
+                room.writers.pop(player.id, None)
+                room.engine.remove_player(player)
+                if not room.writers and self.rooms.get(room.name) is room:
+                    del self.rooms[room.name]
+            writer.close()
+
+class ClientState:
+    """A client's copy of a room, built from WELCOME and kept current by TICK messages."""
+
+    def __init__(self, welcome):
+        offset = 1
+        self.player_id, offset = read_varint(welcome, offset)
+        self.width, offset = read_varint(welcome, offset)
+        self.height, offset = read_varint(welcome, offset)
+        self.walls = bool(welcome[offset])
+        self.speed = welcome[offset + 1]
+        self.points = struct.unpack_from("<d", welcome, offset + 2)[0]
+        offset += 10
+        self.tick, offset = read_varint(welcome, offset)
+        count, offset = read_varint(welcome, offset)
+        self.obstacles = set()
+        for _ in range(count):
+            cell, offset = read_varint(welcome, offset)
+            self.obstacles.add(self.position(cell))
+        count, offset = read_varint(welcome, offset)
+        self.foods = []
+        for _ in range(count):
+            cell, offset = read_varint(welcome, offset)
+            self.foods.append(self.position(cell - 1) if cell else None)
+        self.names = {}
+        self.eaten = {}
+        self.snakes = {}
+        self.directions = {}
+        # Snake cells with how many bodies cover them, for bots avoiding them
+        self.occupied = {}
+        count, offset = read_varint(welcome, offset)
+        for _ in range(count):
+            player_id, offset = read_varint(welcome, offset)
+            self.names[player_id], offset = read_text(welcome, offset)
+            self.eaten[player_id], offset = read_varint(welcome, offset)
+            length, offset = read_varint(welcome, offset)
+            body = self.snakes[player_id] = deque()
+            for _ in range(length):
+                cell, offset = read_varint(welcome, offset)
+                body.append(self.position(cell))
+                self.cover(body[-1], 1)
+        self.checks = 0
+        self.mismatches = 0
+
+    def position(self, cell):
+        return (cell % self.width, cell // self.width)
+
+    def cover(self, position, change):
+        count = self.occupied.get(position, 0) + change
+        if count:
+            self.occupied[position] = count
+        else:
+            del self.occupied[position]
+
+    def apply(self, message):
+        """Apply one TICK message."""
+        self.tick, offset = read_varint(message, 1)
+        end = len(message)
+        while offset < end:
+            event = message[offset]
+            offset += 1
+            if event == CHECK:
+                checksum, offset = read_varint(message, offset)
+                self.checks += 1
+                if checksum != state_checksum(self.width, self.snakes, self.foods):
+                    self.mismatches += 1
+                continue
+            if event == FOOD:
+                slot = message[offset]
+                cell, offset = read_varint(message, offset + 1)
+                self.foods[slot] = self.position(cell - 1) if cell else None
+                continue
+            player_id, offset = read_varint(message, offset)
+            if event == HEAD:
+                cell, offset = read_varint(message, offset)
+                body = self.snakes[player_id]
+                if body:
+                    head = body[0]
+                    position = self.position(cell)
+                    self.directions[player_id] = Direction((position[0] - head[0], position[1] - head[1]))
+                body.appendleft(self.position(cell))
+                self.cover(body[0], 1)
+            elif event == TAIL:
+                self.cover(self.snakes[player_id].pop(), -1)
+            elif event == EAT:
+                self.eaten[player_id] += 1
+            elif event == DIE:
+                offset += 1
+                # A player who left just before we joined is already gone
+                body = self.snakes.get(player_id, ())
+                for position in body:
+                    self.cover(position, -1)
+                if body:
+                    body.clear()
+            elif event == SPAWN:
+                cell, offset = read_varint(message, offset)
+                self.directions[player_id] = DIRECTIONS[message[offset]]
+                offset += 1
+                self.snakes[player_id].append(self.position(cell))
+                self.cover(self.snakes[player_id][0], 1)
+            elif event == ENTER:
+                self.names[player_id], offset = read_text(message, offset)
+                self.eaten[player_id] = 0
+                self.snakes[player_id] = deque()
+            elif event == LEAVE:
+                for table in (self.names, self.eaten, self.snakes, self.directions):
+                    table.pop(player_id, None)
+
+    def blocked(self, position):
+        """Return True if moving onto position would be fatal right now."""
+        x, y = position
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return True
+        if self.walls and (x in (0, self.width - 1) or y in (0, self.height - 1)):
+            return True
+        return position in self.occupied or position in self.obstacles
+
+async def connect(host, port, room, name):
+    """Join a room and return (reader, writer, ClientState)."""
+    reader, writer = await asyncio.open_connection(host, port)
+    join = bytearray([JOIN])
+    write_text(join, room)
+    write_text(join, name)
+    writer.write(frame(join))
+    welcome = await read_message(reader, MAX_SERVER_MESSAGE)
+    if welcome is None:
+        raise ConnectionError("server closed the connection")
+    if welcome[0] == REFUSED:
+        raise ConnectionError(read_text(welcome, 1)[0])
+    return reader, writer, ClientState(welcome)
+
+def send_turn(writer, direction):
+    """Send a direction change."""
+    writer.write(frame(bytes([TURN, DIRECTIONS.index(direction)])))
+
+def bot_direction(state):
+    """Pick a move for the client's own snake: toward the nearest food, never into a blocked cell."""
+    body = state.snakes.get(state.player_id)
+    if not body:
+        return None
+    head_x, head_y = body[0]
+    current = state.directions.get(state.player_id)
+    foods = [f for f in state.foods if f is not None]
+    best = None
+    for direction in DIRECTIONS:
+        if current is not None and direction == OPPOSITE[current]:
+            continue
+        dx, dy = direction.value
+        position = (head_x + dx, head_y + dy)
+        if state.blocked(position):
+            continue
+        distance = min((abs(position[0] - x) + abs(position[1] - y) for x, y in foods), default=0)
+        if best is None or distance < best[0]:
+            best = (distance, direction)
+    return best[1] if best else None
+
+async def run_bot(host, port, room, name, seconds):
+    """Play as a bot for a number of seconds and return its ClientState."""
+    reader, writer, state = await connect(host, port, room, name)
+    deadline = time.monotonic() + seconds
+    try:
+        while time.monotonic() < deadline:
+            try:
+                message = await asyncio.wait_for(read_message(reader, MAX_SERVER_MESSAGE), deadline - time.monotonic())
+            except asyncio.TimeoutError:
+                break
+            if message is None:
+                break
+            state.apply(message)
+            direction = bot_direction(state)
+            if direction is not None and direction != state.directions.get(state.player_id):
+                send_turn(writer, direction)
+    finally:
+        writer.close()
+    return state
+
+async def run_bots(host, port, rooms, bots, seconds, local=False):
+    """Run rooms x bots bot clients and print what they saw.
+
+    With local=True a server is started in this process on a free port.
+    Returns True if every bot's copy of its room matched the server's.
+    """
+    server = None
+    if local:
+        server = await SnakeServer().serve("127.0.0.1", 0)
+        host, port = "127.0.0.1", server.sockets[0].getsockname()[1]
+    try:
+        states = await asyncio.gather(*(run_bot(host, port, f"room-{r}", f"bot-{r}-{b}", seconds)
+                                        for r in range(rooms) for b in range(bots)))
+    finally:
+        if server is not None:
+            server.close()
+            await server.wait_closed()
+    ticks = sum(state.tick for state in states)
+    checks = sum(state.checks for state in states)
+    mismatches = sum(state.mismatches for state in states)
+    eaten = sum(sum(state.eaten.values()) for state in states) // max(1, bots)
+    print(f"{len(states)} bots in {rooms} rooms: {ticks} ticks seen, {eaten} food eaten, "
+          f"{checks} state checks, {mismatches} mismatches")
+    return mismatches == 0
+
+async def play(host, port, room, name):
+    """Play in a pygame window until it is closed or ESC is pressed."""
+    import pygame
+    import snake_game
+
+    reader, writer, state = await connect(host, port, room, name)
+    snake_game.init_pygame()
+    screen = pygame.display.set_mode((snake_game.WINDOW_WIDTH, snake_game.WINDOW_HEIGHT))
+    pygame.display.set_caption(f"Snake Multiplayer - {room}")
+    font = pygame.font.Font(None, 24)
+    colors = [snake_game.ORANGE, snake_game.BLUE, snake_game.YELLOW, snake_game.WHITE, snake_game.PURPLE]
+    size = snake_game.GRID_SIZE
+    keys = {pygame.K_UP: Direction.UP, pygame.K_DOWN: Direction.DOWN,
+            pygame.K_LEFT: Direction.LEFT, pygame.K_RIGHT: Direction.RIGHT}
+
+    async def receive():
+        while True:
+            message = await read_message(reader, MAX_SERVER_MESSAGE)
+            if message is None:
+                return
+            state.apply(message)
+
+    receiver = asyncio.create_task(receive())
+    try:
+        while not receiver.done():
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+                    return
+                if event.type == pygame.KEYDOWN and event.key in keys:
+                    send_turn(writer, keys[event.key])
+
+            # Follow our own head like SnakeGame's camera
+            body = state.snakes.get(state.player_id)
+            head_x, head_y = body[0] if body else (state.width // 2, state.height // 2)
+            left = min(max(0, head_x - snake_game.VIEW_COLUMNS // 2), max(0, state.width - snake_game.VIEW_COLUMNS))
+            top = min(max(0, head_y - snake_game.VIEW_ROWS // 2), max(0, state.height - snake_game.VIEW_ROWS))
+
+            def cell_rect(position):
+                return pygame.Rect((position[0] - left) * size, (position[1] - top) * size, size, size)
+
+            right = left + snake_game.VIEW_COLUMNS
+            bottom = top + snake_game.VIEW_ROWS
+
+            def in_view(position):
+                return left <= position[0] < right and top <= position[1] < bottom
+
+            screen.fill(snake_game.BLACK)
+            if state.walls:
+                # Only the border cells in view
+                columns = range(left, min(right, state.width))
+                rows = range(top, min(bottom, state.height))
+                for y in (0, state.height - 1):
+                    if y in rows:
+                        for x in columns:
+                            pygame.draw.rect(screen, snake_game.BLUE, cell_rect((x, y)))
+                for x in (0, state.width - 1):
+                    if x in columns:
+                        for y in rows:
+                            pygame.draw.rect(screen, snake_game.BLUE, cell_rect((x, y)))
+            for position in state.obstacles:
+                if in_view(position):
+                    pygame.draw.rect(screen, snake_game.PURPLE, cell_rect(position))
+            for food in state.foods:
+                if food is not None and in_view(food):
+                    pygame.draw.rect(screen, snake_game.RED, cell_rect(food))
+            for player_id, snake in state.snakes.items():
+                color = snake_game.GREEN if player_id == state.player_id else colors[player_id % len(colors)]
+                for position in snake:
+                    if in_view(position):
+                        pygame.draw.rect(screen, color, cell_rect(position))
+            ranking = sorted(state.names, key=lambda p: -state.eaten[p])
+            for i, player_id in enumerate(ranking):
+                text = f"{state.names[player_id]}: {state.eaten[player_id] * state.points:g}"
+                screen.blit(font.render(text, True, snake_game.WHITE), (10, 10 + i * 20))
+            pygame.display.flip()
+            await asyncio.sleep(1 / snake_game.FRAME_RATE)
+    finally:
+        receiver.cancel()
+        writer.close()
+        pygame.quit()
+
+def main():
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Multiplayer snake over the network.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    server_parser = commands.add_parser("server", help="run a server")
+    server_parser.add_argument("--host", default="0.0.0.0")
+    server_parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    server_parser.add_argument("--difficulty", choices=list(DIFFICULTIES), default="normal")
+    server_parser.add_argument("--mode", choices=list(MODES), default="classic")
+    server_parser.add_argument("--board", default=f"{GRID_WIDTH}x{GRID_HEIGHT}", help="board size as WIDTHxHEIGHT")
+
+    play_parser = commands.add_parser("play", help="join a game in a window")
+    play_parser.add_argument("host")
+    play_parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    play_parser.add_argument("--room", default="lobby")
+    play_parser.add_argument("--name", default="player")
+
+    bots_parser = commands.add_parser("bots", help="load-test a server with scripted bots")
+    bots_parser.add_argument("host", nargs="?", default="127.0.0.1")
+    bots_parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    bots_parser.add_argument("--local", action="store_true", help="start a server in this process")
+    bots_parser.add_argument("--rooms", type=int, default=8)
+    bots_parser.add_argument("--bots", type=int, default=4, help="bots per room")
+    bots_parser.add_argument("--seconds", type=float, default=10.0)
+    args = parser.parse_args()
+
+    if args.command == "server":
+        width, height = (int(n) for n in args.board.lower().split("x"))
+        server = SnakeServer(DIFFICULTIES[args.difficulty], MODES[args.mode], width, height)
+
+        async def serve():
+            listener = await server.serve(args.host, args.port)
+            print(f"serving on {args.host}:{args.port}")
+            async with listener:
+                await listener.serve_forever()
+        try:
+            asyncio.run(serve())
+        except KeyboardInterrupt:
+            pass
+    elif args.command == "play":
+        asyncio.run(play(args.host, args.port, args.room, args.name))
+    else:
+        ok = asyncio.run(run_bots(args.host, args.port, args.rooms, args.bots, args.seconds, args.local))
+        sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+"""
+Snake Replay - record, save and play back single snake games.
+
+A game is fully determined by its seed, difficulty, mode, board size and the
+ticks at which the snake changed direction, so a replay stores only those: a short
+header followed by one varint per turn, usually a single byte.
+
+    python snake_replay.py game.snkr              # watch at normal speed
+    python snake_replay.py game.snkr --rate 4     # watch four times faster
+    python snake_replay.py game.snkr --headless   # re-simulate and verify
+"""
+import argparse
+import struct
+
+from snake_engine import (
+    GRID_WIDTH, GRID_HEIGHT, MIN_BOARD_SIZE, MAX_BOARD_SIZE, Direction, Difficulty, GameMode, SnakeEngine
+)
+
+MAGIC = b"SNKR"
+VERSION = 3
+
+DIFFICULTIES = list(Difficulty)
+MODES = list(GameMode)
+DIRECTIONS = list(Direction)
+
+# magic, version, difficulty, mode, seed, claimed score
+_HEADER = struct.Struct("<4sBBBId")
+# Board width and height, after the header from version 2 on; version 1
+# replays were all played on the default board
+_BOARD = struct.Struct("<HH")
+# Versions before 3 were recorded before obstacles kept the board connected
+# (see SnakeEngine.connected_obstacles)
+CONNECTED_OBSTACLES_VERSION = 3
+
+def write_varint(out, value):
+    """Append an unsigned LEB128 varint to a bytearray."""
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+def read_varint(data, offset):
+    """Read an unsigned LEB128 varint, returning (value, next offset)."""
+    value = 0
+    shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+class ReplayError(ValueError):
+    """Raised for data that is not a valid replay."""
+
+class Replay:
+    """A recorded game: seed, settings, length and the (tick, Direction) turns.
+
+    connected_obstacles is False for replays of older versions, whose
+    obstacles were placed without keeping the board connected.
+    """
+
+    def __init__(self, seed, difficulty, game_mode, turns=None, ticks=0, score=0,
+                 width=GRID_WIDTH, height=GRID_HEIGHT, connected_obstacles=True):
+        self.seed = seed
+        self.difficulty = difficulty
+        self.game_mode = game_mode
+        self.width = width
+        self.height = height
+        self.turns = turns if turns is not None else []
+        self.ticks = ticks
+        self.score = score
+        self.connected_obstacles = connected_obstacles
+
+    def to_bytes(self):
+        """Pack the replay into its binary form."""
+        version = VERSION if self.connected_obstacles else CONNECTED_OBSTACLES_VERSION - 1
+        out = bytearray(_HEADER.pack(MAGIC, version, DIFFICULTIES.index(self.difficulty),
+                                     MODES.index(self.game_mode), self.seed, self.score))
+        out += _BOARD.pack(self.width, self.height)
+        write_varint(out, self.ticks)
+        write_varint(out, len(self.turns))
+        previous = 0
+        for tick, direction in self.turns:
+            # Tick gap and direction share one varint: (gap << 2) | direction
+            write_varint(out, (tick - previous) << 2 | DIRECTIONS.index(direction))
+            previous = tick
+        return bytes(out)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Unpack a replay produced by to_bytes()."""
+        try:
+            magic, version, difficulty, mode, seed, score = _HEADER.unpack_from(data)
+            if magic != MAGIC or not 1 <= version <= VERSION:
+                raise ReplayError(f"not a version 1-{VERSION} snake replay")
+            offset = _HEADER.size
+            width, height = GRID_WIDTH, GRID_HEIGHT
+            if version >= 2:
+                width, height = _BOARD.unpack_from(data, offset)
+                offset += _BOARD.size
+                if not (MIN_BOARD_SIZE <= width <= MAX_BOARD_SIZE and MIN_BOARD_SIZE <= height <= MAX_BOARD_SIZE):
+                    raise ReplayError(f"corrupt snake replay: {width}x{height} board")
+            ticks, offset = read_varint(data, offset)
+            count, offset = read_varint(data, offset)
+            turns = []
+            tick = 0
+            for _ in range(count):
+                packed, offset = read_varint(data, offset)
+                tick += packed >> 2
+                turns.append((tick, DIRECTIONS[packed & 3]))
+            return cls(seed, DIFFICULTIES[difficulty], MODES[mode], turns, ticks, score, width, height,
+                       version >= CONNECTED_OBSTACLES_VERSION)
+        except (struct.error, IndexError) as e:
+            raise ReplayError(f"corrupt snake replay: {e}") from e
+
+    def save(self, path):
+        """Write the replay to a file."""
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        """Read a replay from a file."""
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
+
+class ReplayRecorder:
+    """Record the game an engine is playing, starting from its current reset.
+
+    Call record() after every engine step; finish() returns the Replay. Pass
+    the replay of a game resumed mid-way to carry on recording it.
+    """
+
+    def __init__(self, engine, replay=None):
+        self.engine = engine
+        self.replay = replay or Replay(engine.seed, engine.difficulty, engine.game_mode,
+                                       width=engine.width, height=engine.height,
+                                       connected_obstacles=engine.connected_obstacles)
+        self.direction = engine.direction
+
+    def record(self):
+        """Note the direction the last tick moved in, if it changed."""
+        engine = self.engine
+        if engine.direction != self.direction:
+            self.direction = engine.direction
+            self.replay.turns.append((engine.ticks - 1, engine.direction))
+        self.replay.ticks = engine.ticks
+        self.replay.score = engine.score
+
+    def rewind(self):
+        """Drop the turns of ticks the engine has been rewound past."""
+        engine = self.engine
+        turns = self.replay.turns
+        while turns and turns[-1][0] >= engine.ticks:
+            turns.pop()
+        self.direction = engine.direction
+        self.replay.ticks = engine.ticks
+        self.replay.score = engine.score
+
+    def finish(self):
+        """Return the replay recorded so far."""
+        return self.replay
+
+def replay_actions(replay):
+    """Yield the action to pass to SnakeEngine.step for each tick of the replay."""
+    turns = iter(replay.turns)
+    next_turn = next(turns, None)
+    for tick in range(replay.ticks):
+        if next_turn is not None and next_turn[0] == tick:
+            yield next_turn[1]
+            next_turn = next(turns, None)
+        else:
+            yield None
+
+def simulate(replay, engine=None):
+    """Play a replay headlessly at full speed and return the engine at its end."""
+    if engine is None or (engine.width, engine.height) != (replay.width, replay.height):
+        engine = SnakeEngine(replay.difficulty, replay.game_mode,
+                             width=replay.width, height=replay.height)
+    else:
+        engine.difficulty = replay.difficulty
+        engine.game_mode = replay.game_mode
+    engine.connected_obstacles = replay.connected_obstacles
+    engine.reset_game(replay.seed)
+    for action in replay_actions(replay):
+        engine.step(action)
+        if engine.game_over:
+            break
+    return engine
+
+def verify(replay):
+    """Return True if re-simulating the replay reproduces its length and score."""
+    engine = simulate(replay)
+    return engine.ticks == replay.ticks and engine.score == replay.score
+
+def play(replay, rate=1.0):
+    """Show a replay in a window at rate times the difficulty speed (0 for unlimited).
+
+    ESC or closing the window stops playback early.
+    """
+    import pygame
+    from snake_game import SnakeGame
+
+    game = SnakeGame(board_size=(replay.width, replay.height))
+    game.difficulty = replay.difficulty
+    game.game_mode = replay.game_mode
+    game.connected_obstacles = replay.connected_obstacles
+    game.reset_game(replay.seed)
+    fps = replay.difficulty.value["speed"] * rate
+    for action in replay_actions(replay):
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+                return game
+        game.step(action)
+        game.update_camera()
+        game.render()
+        game.clock.tick(fps)
+        if game.game_over:
+            break
+    return game
+
+def main():
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Play back a recorded snake game.")
+    parser.add_argument("path", help="replay file (.snkr)")
+    parser.add_argument("--rate", type=float, default=1.0,
+                        help="playback speed multiplier, 0 for as fast as possible")
+    parser.add_argument("--headless", action="store_true",
+                        help="re-simulate without a window and check the recorded score")
+    args = parser.parse_args()
+
+    replay = Replay.load(args.path)
+    if args.headless:
+        status = "OK" if verify(replay) else "MISMATCH"
+        print(f"{status}: recorded score {replay.score} in {replay.ticks} ticks")
+    else:
+        play(replay, args.rate)
+
+if __name__ == "__main__":
+    main()
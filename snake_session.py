@@ -0,0 +1,39 @@
+"""
+Snake Session - the snake game kept running between launcher sessions.
+
+The launcher plays snake through play() and calls close() when it exits.
+The game, its window, fonts and score store are created on the first
+play() and reused after that; between sessions the window is hidden.
+"""
+from snake_game import SnakeGame
+
+# The snake game, created on its first launch and reused after that
+_game = None
+
+def play():
+    """Play the snake game in this process, reusing its window from the last session."""
+    global _game
+    if _game is None:
+        _game = SnakeGame()
+    else:
+        _game.show_window()
+    try:
+        _game.run(keep_open=True)
+    except Exception:
+        # Start from scratch next time rather than reuse a broken game
+        close()
+        raise
+    finally:
+        # Also on Ctrl+C, so the window does not stay over the console menu
+        if _game is not None:
+            _game.show_window(False)
+
+def close():
+    """Close the score store and shut pygame down if a game was started."""
+    global _game
+    if _game is not None:
+        import pygame
+
+        _game.score_store.close()
+        pygame.quit()
+        _game = None
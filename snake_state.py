@@ -0,0 +1,317 @@
+"""
+Snake State - save states and rewind for SnakeEngine games.
+
+A Snapshot packs everything a game needs to carry on - snake, direction,
+score, level, food, obstacles, the free cell pools and the random generator -
+into flat arrays, a few kilobytes on disk, for suspending a game and resuming
+it later exactly where it left off:
+
+    Snapshot.capture(engine).save("game.snks")
+    Snapshot.load("game.snks").restore(engine)
+
+A RewindBuffer steps an engine and keeps, for each of the last capacity
+ticks, just what that tick changed, so rewinding any number of them is
+instant and takes memory per tick that does not grow with the snake.
+"""
+import random
+import struct
+import sys
+from array import array
+from collections import deque
+
+from snake_engine import (
+    DEATH_CAUSES, EDGE, EMPTY, SNAKE, WALL, OBSTACLE, Direction, Difficulty, GameMode,
+    CellPool, SparseGrid,
+)
+
+MAGIC = b"SNKS"
+VERSION = 1
+
+DIFFICULTIES = list(Difficulty)
+MODES = list(GameMode)
+DIRECTIONS = list(Direction)
+CAUSES = [None, EDGE] + list(DEATH_CAUSES.values())
+
+# magic, version, difficulty, mode, width, height, seed, ticks, score, level,
+# food eaten, food for next level, direction, next direction, game over,
+# won, death cause, food cell + 1 (0 for none), random generator gauss_next
+_HEADER = struct.Struct("<4sBBBHHIIdIIIBBBBBId")
+
+# Arrays are stored little-endian whatever the machine
+_SWAP = sys.byteorder == "big"
+
+class SnapshotError(ValueError):
+    """Raised for data that is not a valid snapshot."""
+
+def cell_array(width, height, cells=()):
+    """Return an array of cell indices, 16-bit when the board allows it."""
+    return array("H" if width * height <= 1 << 16 else "I", cells)
+
+def rng_words(rng):
+    """Return a random.Random's state as (array of 625 words, gauss_next)."""
+    version, words, gauss_next = rng.getstate()
+    return array("I", words), gauss_next
+
+def set_rng_words(rng, words, gauss_next):
+    """Put back a state from rng_words()."""
+    rng.setstate((3, tuple(words), gauss_next))
+
+def write_array(out, values):
+    """Append an array to a bytearray as typecode, length and little-endian items."""
+    if _SWAP:
+        values = array(values.typecode, values)
+        values.byteswap()
+    out += values.typecode.encode() + struct.pack("<I", len(values)) + values.tobytes()
+
+def read_array(data, offset):
+    """Read an array written by write_array, returning (array, next offset)."""
+    typecode = chr(data[offset])
+    if typecode not in "HI":
+        raise SnapshotError(f"corrupt snapshot: bad array type {typecode!r}")
+    (count,) = struct.unpack_from("<I", data, offset + 1)
+    offset += 5
+    values = array(typecode)
+    end = offset + count * values.itemsize
+    if end > len(data):
+        raise SnapshotError("corrupt snapshot: truncated")
+    values.frombytes(data[offset:end])
+    if _SWAP:
+        values.byteswap()
+    return values, end
+
+class Snapshot:
+    """The complete state of one SnakeEngine game at one tick.
+
+    Cells are stored as y * width + x. The free pools are kept in their
+    exact order because food and obstacle picks index into them, so a
+    restored game places the same food the original would have.
+    """
+
+    __slots__ = ("difficulty", "game_mode", "width", "height", "seed", "ticks", "score", "level",
+                 "food_eaten", "food_for_next_level", "direction", "next_direction", "game_over",
+                 "won", "death_cause", "food", "snake", "obstacles", "free_inner", "free_edge",
+                 "rng_words", "gauss_next")
+
+    @classmethod
+    def capture(cls, engine):
+        """Return a snapshot of the engine's current game."""
+        snapshot = cls()
+        width = engine.width
+        snapshot.difficulty = engine.difficulty
+        snapshot.game_mode = engine.game_mode
+        snapshot.width = width
+        snapshot.height = engine.height
+        snapshot.seed = engine.seed
+        snapshot.ticks = engine.ticks
+        snapshot.score = engine.score
+        snapshot.level = engine.level
+        snapshot.food_eaten = engine.food_eaten
+        snapshot.food_for_next_level = engine.food_for_next_level
+        snapshot.direction = engine.direction
+        snapshot.next_direction = engine.next_direction
+        snapshot.game_over = engine.game_over
+        snapshot.won = engine.won
+        snapshot.death_cause = engine.death_cause
+        food = engine.food_position
+        snapshot.food = None if food is None else food[1] * width + food[0]
+        snapshot.snake = cell_array(width, engine.height, (y * width + x for x, y in engine.snake))
+        snapshot.obstacles = cell_array(width, engine.height, (y * width + x for x, y in engine.obstacles))
+        if engine.sparse:
+            snapshot.free_inner = snapshot.free_edge = None
+        else:
+            snapshot.free_inner = cell_array(width, engine.height, engine.free_inner.cells)
+            snapshot.free_edge = cell_array(width, engine.height, engine.free_edge.cells)
+        snapshot.rng_words, snapshot.gauss_next = rng_words(engine.rng)
+        return snapshot
+
+    def restore(self, engine):
+        """Put the engine into this snapshot's game; the board sizes must match."""
+        if (engine.width, engine.height) != (self.width, self.height):
+            raise ValueError(f"snapshot is for a {self.width}x{self.height} board, "
+                             f"not {engine.width}x{engine.height}")
+        width, height = self.width, self.height
+        walls = self.game_mode.value["walls"]
+        engine.difficulty = self.difficulty
+        engine.game_mode = self.game_mode
+        engine.seed = self.seed
+        engine.rng = random.Random()
+        set_rng_words(engine.rng, self.rng_words, self.gauss_next)
+        engine.ticks = self.ticks
+        engine.score = self.score
+        engine.level = self.level
+        engine.food_eaten = self.food_eaten
+        engine.food_for_next_level = self.food_for_next_level
+        engine.direction = self.direction
+        engine.next_direction = self.next_direction
+        engine.game_over = self.game_over
+        engine.won = self.won
+        engine.death_cause = self.death_cause
+        engine.food_position = None if self.food is None else (self.food % width, self.food // width)
+        engine.snake = deque((cell % width, cell // width) for cell in self.snake)
+        engine.obstacles = [(cell % width, cell // width) for cell in self.obstacles]
+
+        if engine.sparse:
+            engine.grid = SparseGrid(width, height, walls)
+            engine.free_inner = engine.free_edge = None
+            engine.walls = []
+        else:
+            engine.grid = bytearray(width * height)
+            engine.free_inner = CellPool(self.free_inner)
+            engine.free_edge = CellPool(self.free_edge)
+            engine.walls = engine.generate_walls() if walls else []
+            for x, y in engine.walls:
+                engine.grid[y * width + x] = WALL
+        for cell in self.obstacles:
+            engine.grid[cell] = OBSTACLE
+        for cell in self.snake:
+            engine.grid[cell] = SNAKE
+
+    def to_bytes(self):
+        """Pack the snapshot into its binary form."""
+        gauss_next = float("nan") if self.gauss_next is None else self.gauss_next
+        out = bytearray(_HEADER.pack(
+            MAGIC, VERSION, DIFFICULTIES.index(self.difficulty), MODES.index(self.game_mode),
+            self.width, self.height, self.seed, self.ticks, self.score, self.level,
+            self.food_eaten, self.food_for_next_level, DIRECTIONS.index(self.direction),
+            DIRECTIONS.index(self.next_direction), self.game_over, self.won,
+            CAUSES.index(self.death_cause), 0 if self.food is None else self.food + 1, gauss_next))
+        write_array(out, self.snake)
+        write_array(out, self.obstacles)
+        write_array(out, self.rng_words)
+        if self.free_inner is not None:
+            write_array(out, self.free_inner)
+            write_array(out, self.free_edge)
+        return bytes(out)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Unpack a snapshot produced by to_bytes()."""
+        try:
+            (magic, version, difficulty, mode, width, height, seed, ticks, score, level,
+             food_eaten, food_for_next_level, direction, next_direction, game_over, won,
+             cause, food, gauss_next) = _HEADER.unpack_from(data)
+            if magic != MAGIC or version != VERSION:
+                raise SnapshotError(f"not a version {VERSION} snake snapshot")
+            snapshot = cls()
+            snapshot.difficulty = DIFFICULTIES[difficulty]
+            snapshot.game_mode = MODES[mode]
+            snapshot.width = width
+            snapshot.height = height
+            snapshot.seed = seed
+            snapshot.ticks = ticks
+            snapshot.score = score
+            snapshot.level = level
+            snapshot.food_eaten = food_eaten
+            snapshot.food_for_next_level = food_for_next_level
+            snapshot.direction = DIRECTIONS[direction]
+            snapshot.next_direction = DIRECTIONS[next_direction]
+            snapshot.game_over = bool(game_over)
+            snapshot.won = bool(won)
+            snapshot.death_cause = CAUSES[cause]
+            snapshot.food = food - 1 if food else None
+            snapshot.gauss_next = None if gauss_next != gauss_next else gauss_next
+            offset = _HEADER.size
+            snapshot.snake, offset = read_array(data, offset)
+            snapshot.obstacles, offset = read_array(data, offset)
+            snapshot.rng_words, offset = read_array(data, offset)
+            snapshot.free_inner = snapshot.free_edge = None
+            if offset < len(data):
+                snapshot.free_inner, offset = read_array(data, offset)
+                snapshot.free_edge, offset = read_array(data, offset)
+            return snapshot
+        except (struct.error, IndexError) as e:
+            raise SnapshotError(f"corrupt snake snapshot: {e}") from e
+
+    def save(self, path):
+        """Write the snapshot to a file."""
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        """Read a snapshot from a file."""
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
+
+class RewindBuffer:
+    """Steps an engine and remembers how to undo each of the last capacity ticks.
+
+    Each tick keeps a tuple of the values it may change and a journal of
+    free pool edits; the random generator's state is only kept for ticks
+    that drew from it (placing food or obstacles). Call reset() after the
+    engine starts a new game or is restored from a snapshot.
+    """
+
+    def __init__(self, engine, capacity):
+        self.engine = engine
+        self.ticks = deque(maxlen=capacity)
+        self.reset()
+
+    def __len__(self):
+        return len(self.ticks)
+
+    def reset(self):
+        """Forget every recorded tick."""
+        self.ticks.clear()
+        # The generator's state since it was last drawn from
+        self.rng_state = rng_words(self.engine.rng)
+
+    def step(self, action=None):
+        """Advance the engine one tick with engine.step(action), recording how to undo it."""
+        engine = self.engine
+        journal = []
+        if not engine.sparse:
+            engine.free_inner.journal = engine.free_edge.journal = journal
+        tail = engine.snake[-1]
+        length = len(engine.snake)
+        obstacles = len(engine.obstacles)
+        food = engine.food_position
+        before = (engine.direction, engine.next_direction, engine.score, engine.level,
+                  engine.food_eaten, engine.food_for_next_level, engine.ticks, engine.game_over,
+                  engine.won, engine.death_cause, food)
+        try:
+            result = engine.step(action)
+        finally:
+            if not engine.sparse:
+                engine.free_inner.journal = engine.free_edge.journal = None
+
+        if engine.ticks == before[6]:
+            # The game was already over; nothing changed
+            return result
+        # Unless it crashed the snake gained a head, and lost its tail if it did not grow
+        moved = engine.death_cause is None
+        lost_tail = moved and len(engine.snake) == length
+        rng_state = None
+        if engine.food_position != food or len(engine.obstacles) != obstacles:
+            rng_state = self.rng_state
+            self.rng_state = rng_words(engine.rng)
+        self.ticks.append((before, moved, lost_tail, tail, obstacles, journal or None, rng_state))
+        return result
+
+    def rewind(self, count=1):
+        """Undo up to count of the latest ticks and return how many were undone."""
+        engine = self.engine
+        width = engine.width
+        undone = 0
+        while undone < count and self.ticks:
+            before, moved, lost_tail, tail, obstacles, journal, rng_state = self.ticks.pop()
+            for x, y in engine.obstacles[obstacles:]:
+                engine.grid[y * width + x] = EMPTY
+            del engine.obstacles[obstacles:]
+            if moved:
+                x, y = engine.snake.popleft()
+                engine.grid[y * width + x] = EMPTY
+                if lost_tail:
+                    engine.snake.append(tail)
+                    engine.grid[tail[1] * width + tail[0]] = SNAKE
+            if journal:
+                for pool, cell, slot in reversed(journal):
+                    pool.undo(cell, slot)
+            if rng_state is not None:
+                set_rng_words(engine.rng, *rng_state)
+                self.rng_state = rng_state
+            (engine.direction, engine.next_direction, engine.score, engine.level,
+             engine.food_eaten, engine.food_for_next_level, engine.ticks, engine.game_over,
+             engine.won, engine.death_cause, engine.food_position) = before
+            undone += 1
+        return undone
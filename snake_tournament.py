@@ -0,0 +1,253 @@
+"""
+Snake Tournament - play many headless games with agents across every
+difficulty and mode on all CPU cores, and summarise the results.
+
+Each game is fixed by its agent, difficulty, mode and seed. Game i uses the
+i-th seed drawn from --seed, the same for every agent, difficulty and mode,
+so results do not depend on how games are spread over worker processes and
+agents are compared on the same games.
+
+    python snake_tournament.py --games 200
+    python snake_tournament.py --agents autopilot,greedy --modes Extreme --results games.jsonl
+    python snake_tournament.py --set FIRST_LEVEL_FOOD=3 --set OBSTACLES_PER_LEVEL=2
+
+Agents are objects with next_direction(engine), made fresh for each game
+by a factory taking the game seed. Name a built-in agent (see AGENTS) or any
+factory as module:function.
+"""
+import argparse
+import importlib
+import json
+import os
+import random
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import snake_engine
+from snake_engine import OPPOSITE, Direction, Difficulty, GameMode, SnakeEngine
+from snake_autopilot import Autopilot
+
+# Games per task sent to a worker
+CHUNK_SIZE = 8
+
+# Balance constants in snake_engine that --set may change
+SETTINGS = ("FIRST_LEVEL_FOOD", "LEVEL_FOOD_STEP", "START_OBSTACLES", "OBSTACLES_PER_LEVEL")
+
+# Death cause recorded for games cut off by --max-ticks
+TIMEOUT = "timeout"
+
+class StraightAgent:
+    """Never turns."""
+
+    def next_direction(self, engine):
+        return None
+
+class RandomAgent:
+    """Turns at random, never straight back onto its neck."""
+
+    def __init__(self, seed):
+        self.rng = random.Random(seed)
+
+    def next_direction(self, engine):
+        return self.rng.choice([d for d in Direction if d != OPPOSITE[engine.direction]])
+
+class GreedyAgent:
+    """Steps toward the food along any move that does not collide at once."""
+
+    def next_direction(self, engine):
+        head_x, head_y = engine.snake[0]
+        food_x, food_y = engine.food_position or (head_x, head_y)
+        best = None
+        for direction in Direction:
+            dx, dy = direction.value
+            position = (head_x + dx, head_y + dy)
+            if engine.check_collision(position):
+                continue
+            distance = abs(position[0] - food_x) + abs(position[1] - food_y)
+            if best is None or distance < best[0]:
+                best = (distance, direction)
+        return best[1] if best else None
+
+AGENTS = {
+    "autopilot": lambda seed: Autopilot(),
+    "greedy": lambda seed: GreedyAgent(),
+    "random": RandomAgent,
+    "straight": lambda seed: StraightAgent(),
+}
+
+def load_agent(spec):
+    """Return the agent factory for a built-in name or a module:function spec."""
+    if spec in AGENTS:
+        return AGENTS[spec]
+    module, _, name = spec.partition(":")
+    if not name:
+        raise ValueError(f"unknown agent {spec!r}; use one of {', '.join(AGENTS)} or module:function")
+    return getattr(importlib.import_module(module), name)
+
+def game_seeds(seed, count):
+    """Return the seed of every game in a tournament."""
+    rng = random.Random(seed)
+    return [rng.getrandbits(32) for _ in range(count)]
+
+def apply_settings(settings):
+    """Override snake_engine balance constants in this process."""
+    for name, value in settings.items():
+        setattr(snake_engine, name, value)
+
+def play_games(agent_spec, difficulty, game_mode, seeds, max_ticks):
+    """Play one game per seed and return a result dict for each."""
+    factory = load_agent(agent_spec)
+    engine = SnakeEngine(difficulty, game_mode)
+    results = []
+    for seed in seeds:
+        engine.reset_game(seed)
+        agent = factory(seed)
+        start = time.perf_counter()
+        while not engine.game_over and engine.ticks < max_ticks:
+            engine.step(agent.next_direction(engine))
+        if engine.won:
+            cause = None
+        elif engine.game_over:
+            cause = engine.death_cause
+        else:
+            cause = TIMEOUT
+        results.append({
+            "agent": agent_spec,
+            "difficulty": difficulty.value["name"],
+            "mode": game_mode.value["name"],
+            "seed": seed,
+            "score": engine.score,
+            "level": engine.level,
+            "ticks": engine.ticks,
+            "length": len(engine.snake),
+            "won": engine.won,
+            "death_cause": cause,
+            "seconds": time.perf_counter() - start,
+        })
+    return results
+
+def run_tournament(agents, difficulties, modes, games, seed=0, max_ticks=10000,
+                   workers=None, settings=None):
+    """Play every game on a process pool, yielding results as they finish."""
+    seeds = game_seeds(seed, games)
+    chunks = [seeds[i:i + CHUNK_SIZE] for i in range(0, games, CHUNK_SIZE)]
+    with ProcessPoolExecutor(max_workers=workers, initializer=apply_settings,
+                             initargs=(settings or {},)) as pool:
+        futures = [pool.submit(play_games, agent, difficulty, mode, chunk, max_ticks)
+                   for agent in agents
+                   for difficulty in difficulties
+                   for mode in modes
+                   for chunk in chunks]
+        for future in as_completed(futures):
+            yield from future.result()
+
+def summarize(results):
+    """Group results by agent, difficulty and mode into summary rows."""
+    groups = {}
+    for result in results:
+        key = (result["agent"], result["difficulty"], result["mode"])
+        groups.setdefault(key, []).append(result)
+    rows = []
+    for key in sorted(groups):
+        games = groups[key]
+        scores = sorted(g["score"] for g in games)
+        causes = Counter(g["death_cause"] or "won" for g in games)
+        rows.append({
+            "agent": key[0],
+            "difficulty": key[1],
+            "mode": key[2],
+            "games": len(games),
+            "mean_score": sum(scores) / len(games),
+            "median_score": scores[len(scores) // 2],
+            "max_score": scores[-1],
+            "mean_level": sum(g["level"] for g in games) / len(games),
+            "mean_ticks": sum(g["ticks"] for g in games) / len(games),
+            "causes": dict(causes.most_common()),
+        })
+    return rows
+
+def print_table(rows):
+    """Print summary rows as a text table."""
+    print(f"{'agent':<12} {'difficulty':<10} {'mode':<10} {'games':>6} {'mean':>10} "
+          f"{'median':>10} {'max':>10} {'level':>6} {'ticks':>8}  end of game")
+    for row in rows:
+        causes = ", ".join(f"{cause} {count}" for cause, count in row["causes"].items())
+        print(f"{row['agent']:<12} {row['difficulty']:<10} {row['mode']:<10} {row['games']:>6} "
+              f"{row['mean_score']:>10.1f} {row['median_score']:>10} {row['max_score']:>10} "
+              f"{row['mean_level']:>6.2f} {row['mean_ticks']:>8.0f}  {causes}")
+
+def parse_setting(text):
+    """Parse a NAME=VALUE --set argument."""
+    name, _, value = text.partition("=")
+    if name not in SETTINGS:
+        raise argparse.ArgumentTypeError(f"unknown setting {name!r}; choose from {', '.join(SETTINGS)}")
+    try:
+        return name, int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"{name} needs an integer value")
+
+def main():
+    """Command line entry point."""
+    difficulties = {d.value["name"].lower(): d for d in Difficulty}
+    modes = {m.value["name"].lower(): m for m in GameMode}
+
+    def choices(table):
+        def parse(text):
+            try:
+                return [table[name.strip().lower()] for name in text.split(",")]
+            except KeyError as e:
+                raise argparse.ArgumentTypeError(f"unknown name {e}; choose from {', '.join(table)}")
+        return parse
+
+    parser = argparse.ArgumentParser(description="Play headless snake games with agents on all cores.")
+    parser.add_argument("--agents", default="autopilot",
+                        help=f"comma-separated agents: {', '.join(AGENTS)} or module:function")
+    parser.add_argument("--difficulties", type=choices(difficulties), default=list(Difficulty),
+                        help="comma-separated difficulties (default all)")
+    parser.add_argument("--modes", type=choices(modes), default=list(GameMode),
+                        help="comma-separated game modes (default all)")
+    parser.add_argument("--games", type=int, default=100, help="games per agent, difficulty and mode")
+    parser.add_argument("--seed", type=int, default=0, help="seed the game seeds are drawn from")
+    parser.add_argument("--max-ticks", type=int, default=10000,
+                        help="end a game as a timeout after this many ticks")
+    parser.add_argument("--workers", type=int, help="worker processes (default one per core)")
+    parser.add_argument("--set", type=parse_setting, action="append", default=[], metavar="NAME=VALUE",
+                        help=f"override a balance constant: {', '.join(SETTINGS)}")
+    parser.add_argument("--results", help="also write every game's result to this JSON Lines file")
+    parser.add_argument("--json", action="store_true", help="print the summary as JSON instead of a table")
+    args = parser.parse_args()
+
+    agents = [a.strip() for a in args.agents.split(",")]
+    for agent in agents:
+        try:
+            load_agent(agent)
+        except (ValueError, ImportError, AttributeError) as e:
+            parser.error(str(e))
+
+    total = len(agents) * len(args.difficulties) * len(args.modes) * args.games
+    results = []
+    out = open(args.results, "w") if args.results else None
+    start = time.perf_counter()
+    try:
+        for result in run_tournament(agents, args.difficulties, args.modes, args.games, args.seed,
+                                     args.max_ticks, args.workers, dict(args.set)):
+            results.append(result)
+            if out:
+                out.write(json.dumps(result) + "\n")
+            print(f"\r{len(results)}/{total} games", end="", file=sys.stderr, flush=True)
+    finally:
+        if out:
+            out.close()
+    print(f"\r{total} games in {time.perf_counter() - start:.1f}s on {args.workers or os.cpu_count()} workers",
+          file=sys.stderr)
+
+    rows = summarize(results)
+    if args.json:
+        print(json.dumps({"settings": dict(args.set), "summary": rows}, indent=2))
+    else:
+        print_table(rows)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+import struct
+
+import numpy as np
+import pygame
+import pytest
+
+from frame_capture import GifWriter, gif_palette, lzw_encode
+
+def palette_image(indices):
+    """RGB pixels showing palette indices, so quantizing them gives the indices back."""
+    palette = np.frombuffer(gif_palette(), np.uint8).reshape(256, 3)
+    return palette[indices]
+
+def write_gif(path, frames):
+    writer = GifWriter(str(path), fps=10)
+    for rgb in frames:
+        writer.write(rgb.tobytes(), (rgb.shape[1], rgb.shape[0]))
+    writer.close()
+
+def read_gif(path):
+    """Decode the first frame with SDL_image, independently of our encoder."""
+    surface = pygame.image.load(str(path))
+    return pygame.surfarray.array3d(surface).transpose(1, 0, 2)
+
+def lzw_decode(data, min_code_size):
+    """Decode GIF LZW data as the GIF89a spec describes; return (indices, clear codes seen)."""
+    clear, end = 1 << min_code_size, (1 << min_code_size) + 1
+    initial = [bytes([i]) for i in range(clear)] + [b"", b""]
+    table = list(initial)
+    code_size = min_code_size + 1
+    out = bytearray()
+    clears = 0
+    previous = None
+    buffer = bits = 0
+    data = iter(data)
+    while True:
+        while bits < code_size:
+            buffer |= next(data) << bits
+            bits += 8
+        code = buffer & ((1 << code_size) - 1)
+        buffer >>= code_size
+        bits -= code_size
+        if code == clear:
+            table = list(initial)
+            code_size = min_code_size + 1
+            previous = None
+            clears += 1
+            continue
+        if code == end:
+            return bytes(out), clears
+        if code < len(table):
+            entry = table[code]
+            if previous is not None and len(table) < 4096:
+                table.append(previous + entry[:1])
+        elif code == len(table) and previous is not None:
+            entry = previous + previous[:1]
+            table.append(entry)
+        else:
+            raise ValueError(f"bad LZW code {code}")
+        out += entry
+        previous = entry
+        if len(table) == 1 << code_size and code_size < 12:
+            code_size += 1
+
+def decode_gif(path):
+    """Decode every frame of a GIF, composited as a viewer shows it.
+
+    Returns ([(rgb, delay)], clear codes seen) with one entry per image block.
+    """
+    data = open(path, "rb").read()
+    assert data[:6] == b"GIF89a"
+    width, height, flags = struct.unpack_from("<HHB", data, 6)
+    assert flags & 0x80
+    palette_size = 2 << (flags & 7)
+    palette = np.frombuffer(data, np.uint8, palette_size * 3, 13).reshape(palette_size, 3)
+    offset = 13 + palette_size * 3
+    canvas = np.zeros((height, width, 3), np.uint8)
+    frames = []
+    clears = 0
+    delay, transparent = 0, None
+
+    def blocks(offset):
+        chunks = []
+        while data[offset]:
+            chunks.append(data[offset + 1:offset + 1 + data[offset]])
+            offset += 1 + data[offset]
+        return b"".join(chunks), offset + 1
+
+    while data[offset] != 0x3B:
+        kind = data[offset]
+        if kind == 0x21:
+            label = data[offset + 1]
+            body, offset = blocks(offset + 2)
+            if label == 0xF9:
+                packed, delay, index = struct.unpack_from("<BHB", body)
+                # Only "do not dispose" keeps the last frame under the next one
+                assert packed >> 2 & 7 == 1
+                transparent = index if packed & 1 else None
+        else:
+            assert kind == 0x2C
+            left, top, w, h, packed = struct.unpack_from("<HHHHB", data, offset + 1)
+            assert packed == 0
+            assert left + w <= width and top + h <= height
+            min_code_size = data[offset + 10]
+            compressed, offset = blocks(offset + 11)
+            indices, cleared = lzw_decode(compressed, min_code_size)
+            clears += cleared
+            indices = np.frombuffer(indices, np.uint8)
+            assert len(indices) == w * h
+            indices = indices.reshape(h, w)
+            area = canvas[top:top + h, left:left + w]
+            shown = np.ones((h, w), bool) if transparent is None else indices != transparent
+            area[shown] = palette[indices[shown]]
+            frames.append((canvas.copy(), delay))
+    return frames, clears
+
+@pytest.mark.skipif(not pygame.image.get_extended(), reason="pygame built without GIF loading")
+@pytest.mark.parametrize("pattern", ["flat", "stripes", "noise"])
+def test_gif_decodes_to_the_frame(tmp_path, pattern):
+    rng = np.random.default_rng(0)
+    height, width = 120, 160
+    if pattern == "flat":
+        indices = np.full((height, width), 17, np.uint8)
+    elif pattern == "stripes":
+        indices = (np.arange(width)[None, :] // 3 + np.arange(height)[:, None]).astype(np.uint8) % 200
+    else:
+        # Random pixels fill the 4096-code table several times over
+        indices = rng.integers(0, 216, (height, width), dtype=np.uint8)
+    rgb = palette_image(indices)
+    path = tmp_path / f"{pattern}.gif"
+    write_gif(path, [rgb])
+    assert (read_gif(path) == rgb).all()
+
+def test_lzw_compresses_repetition():
+    data = bytes(100000)
+    assert len(lzw_encode(data)) < len(data) // 50
+    assert lzw_encode(bytes([5])) != lzw_encode(bytes([6]))
+
+def test_every_frame_decodes_to_the_capture(tmp_path):
+    rng = np.random.default_rng(1)
+    height, width = 90, 120
+    indices = (np.arange(width)[None, :] // 4 + np.arange(height)[:, None] // 4).astype(np.uint8) % 216
+    frames = [indices]
+    for step in range(12):
+        if step == 3:
+            # Unchanged: lengthens the last frame instead of adding one
+            frames.append(indices)
+            continue
+        indices = indices.copy()
+        if step == 6:
+            # Two far-apart pixels: a large delta rect, nearly all transparent
+            indices[2, 3] = 100
+            indices[80, 110] = 101
+        elif step == 9:
+            # Random pixels everywhere run the code table full several times
+            indices = rng.integers(0, 216, (height, width), dtype=np.uint8)
+        else:
+            y, x = rng.integers(0, height - 10), rng.integers(0, width - 10)
+            indices[y:y + 10, x:x + 10] = rng.integers(0, 216)
+        frames.append(indices)
+    frames.append(frames[-1])
+    frames.append(frames[-1])
+    path = tmp_path / "frames.gif"
+    write_gif(path, [palette_image(f) for f in frames])
+
+    # Runs of identical frames become one image shown for the whole run
+    expected = []
+    for f in frames:
+        if expected and (expected[-1][0] == f).all():
+            expected[-1][1] += 10
+        else:
+            expected.append([f, 10])
+    decoded, clears = decode_gif(path)
+    assert len(decoded) == len(expected) == len(frames) - 3
+    for (rgb, delay), (f, expected_delay) in zip(decoded, expected):
+        assert (rgb == palette_image(f)).all()
+        assert delay == expected_delay
+    assert clears > 2
@@ -0,0 +1,42 @@
+import json
+
+import pygame
+
+from snake_game import SnakeGame
+
+def overlay_pixels(game):
+    area = game.profiler.overlay_rect()
+    return pygame.image.tobytes(game.screen.subsurface(area), "RGB")
+
+def test_overlay_does_not_darken_dirty_frames():
+    game = SnakeGame(offscreen=True, highlights=False, save_scores=False)
+    # Offscreen games draw in full; force the dirty-rect path the window uses
+    game.dirty_rects = True
+    game.reset_game()
+    presented = []
+    game.present = lambda rects=None: presented.append(rects)
+    game.profiler.enable()
+    game.render()
+    game.render()
+    first = overlay_pixels(game)
+    for _ in range(10):
+        game.render()
+    assert overlay_pixels(game) == first
+    # The overlay is pushed along with the changed cells
+    assert game.profiler.overlay_rect() in presented[-1]
+
+def test_export_trace(tmp_path):
+    game = SnakeGame(offscreen=True, highlights=False, save_scores=False)
+    game.reset_game()
+    game.profiler.enable()
+    for _ in range(3):
+        game.render()
+        game.wait_for_frame()
+    path = tmp_path / "trace.json"
+    assert game.profiler.export_trace(str(path))
+    names = {event["name"] for event in json.loads(path.read_text())["traceEvents"]}
+    assert {"frame", "present", "draw_board"} <= names
+    assert "trace.json" in game.profiler.message
+
+    assert not game.profiler.export_trace(str(tmp_path / "missing" / "trace.json"))
+    assert game.profiler.message.startswith("trace not saved")
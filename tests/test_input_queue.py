@@ -0,0 +1,62 @@
+import pygame
+
+from snake_engine import Direction
+from snake_game import InputQueue, SnakeGame
+
+def test_reversals_and_repeats_are_dropped():
+    queue = InputQueue()
+    assert not queue.push(Direction.LEFT, Direction.RIGHT, 0.0)
+    assert not queue.push(Direction.RIGHT, Direction.RIGHT, 0.0)
+    assert queue.push(Direction.UP, Direction.RIGHT, 0.0)
+    # Checked against the queued UP, not the snake's RIGHT
+    assert not queue.push(Direction.UP, Direction.RIGHT, 0.1)
+    assert not queue.push(Direction.DOWN, Direction.RIGHT, 0.1)
+    assert queue.push(Direction.LEFT, Direction.RIGHT, 0.2)
+    assert queue.pop(1.0) == Direction.UP
+    assert queue.pop(1.0) == Direction.LEFT
+    assert queue.pop(1.0) is None
+
+def test_queue_is_capped():
+    queue = InputQueue(size=2)
+    assert queue.push(Direction.UP, Direction.RIGHT, 0.0)
+    assert queue.push(Direction.LEFT, Direction.RIGHT, 0.0)
+    assert not queue.push(Direction.DOWN, Direction.RIGHT, 0.0)
+    assert [queue.pop(0.0) for _ in range(3)] == [Direction.UP, Direction.LEFT, None]
+    queue.push(Direction.UP, Direction.RIGHT, 0.0)
+    queue.clear()
+    assert queue.pop(0.0) is None
+
+def test_latency_is_press_to_tick():
+    queue = InputQueue()
+    assert queue.latency_stats() is None
+    queue.push(Direction.UP, Direction.RIGHT, 1.0)
+    queue.push(Direction.LEFT, Direction.RIGHT, 1.5)
+    queue.pop(2.0)
+    queue.pop(2.0)
+    mean, worst = queue.latency_stats()
+    assert (mean, worst) == (0.75, 1.0)
+
+def press(key):
+    pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=key, mod=0, unicode="", scancode=0))
+
+def test_smooth_game_reads_input_every_frame():
+    game = SnakeGame(interpolate=True, save_scores=False, highlights=False)
+    assert game.interpolate
+    game.reset_game()
+    game.direction = game.next_direction = Direction.RIGHT
+    pygame.event.clear()
+
+    # Two display frames inside one tick: each one's key is queued as it comes
+    press(pygame.K_UP)
+    running, changed = game.handle_events()
+    assert running and changed
+    assert [turn for turn, _ in game.input_queue.turns] == [Direction.UP]
+    press(pygame.K_LEFT)
+    game.handle_events()
+    assert [turn for turn, _ in game.input_queue.turns] == [Direction.UP, Direction.LEFT]
+
+    game.tick()
+    assert game.direction == Direction.UP
+    game.tick()
+    assert game.direction == Direction.LEFT
+    assert len(game.input_queue.latencies) == 2
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+import rock_paper_scissors
+from rps_simulator import (
+    STRATEGIES, ScalarStrategies, load_strategy, play_matches, scalar_strategies)
+
+MATCHES = 20
+ROUNDS = 200
+
+def play_against(strategy, opponent, decided=None):
+    """Return the moves strategy makes against a fixed (rounds, matches) array of opponent moves.
+
+    decided, if given, is filled with whether each move was certain before
+    any random draw: the same for every implementation of the strategy.
+    """
+    moves = []
+    for round_moves in opponent:
+        if decided is not None:
+            decided.append([random_free(s) for s in strategy.strategies])
+        own = np.asarray(strategy.choose()).copy()
+        moves.append(own)
+        strategy.observe(own, round_moves)
+    return np.array(moves)
+
+def random_free(strategy):
+    """Whether a game strategy's next move is fixed before it draws a random number."""
+    if isinstance(strategy, rock_paper_scissors.RandomStrategy):
+        return False
+    if isinstance(strategy, rock_paper_scissors.BeatLastStrategy):
+        return strategy.last is not None
+    if isinstance(strategy, rock_paper_scissors.MarkovStrategy):
+        counts = strategy.counts[strategy.context]
+        return counts.count(max(counts)) == 1
+    return True
+
+@pytest.mark.parametrize("name", list(STRATEGIES))
+def test_array_versions_play_like_the_game_strategies(name):
+    opponent = np.random.default_rng(1).integers(0, 3, (ROUNDS, MATCHES), dtype=np.int8)
+    array_moves = play_against(STRATEGIES[name](MATCHES, np.random.default_rng(5)), opponent)
+    decided = []
+    scalar = ScalarStrategies(rock_paper_scissors.STRATEGIES[name], MATCHES, np.random.default_rng(5))
+    scalar_moves = play_against(scalar, opponent, decided)
+    decided = np.array(decided)
+    # Only moves that come from a random draw may differ
+    assert (array_moves[decided] == scalar_moves[decided]).all()
+    if name in ("rock", "cycle"):
+        assert decided.all()
+    elif name != "random":
+        assert decided.mean() > 0.5
+
+def test_scalar_strategies_follow_their_seeds():
+    opponent = np.random.default_rng(2).integers(0, 3, (ROUNDS, MATCHES), dtype=np.int8)
+    for name, factory in rock_paper_scissors.STRATEGIES.items():
+        moves = play_against(scalar_strategies(factory)(MATCHES, np.random.default_rng(9)), opponent)
+        again = play_against(scalar_strategies(factory)(MATCHES, np.random.default_rng(9)), opponent)
+        assert (moves == again).all(), name
+        # Each match is the game's strategy object with its own seed
+        seeds = np.random.default_rng(9).integers(0, 2 ** 63, MATCHES)
+        strategy = factory(int(seeds[3]))
+        for round_moves, move in zip(opponent[:, 3], moves[:, 3]):
+            choice = strategy.choose()
+            assert choice == rock_paper_scissors.CHOICES[move]
+            strategy.observe(choice, rock_paper_scissors.CHOICES[round_moves])
+
+def test_every_game_strategy_can_be_simulated(monkeypatch):
+    monkeypatch.setitem(rock_paper_scissors.STRATEGIES, "paper",
+                        lambda seed: rock_paper_scissors.ConstantStrategy("paper"))
+    wins, ties, losses = play_matches("paper", "rock", 5, 10)
+    assert (wins == 10).all() and (ties == 0).all() and (losses == 0).all()
+    for name in rock_paper_scissors.STRATEGIES:
+        wins, ties, losses = play_matches(name, "cycle", 4, 30, scalar=True)
+        assert (wins + ties + losses == 30).all()
+    with pytest.raises(ValueError):
+        load_strategy("no-such-strategy")
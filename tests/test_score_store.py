@@ -0,0 +1,85 @@
+import json
+
+from score_store import ScoreStore
+from snake_engine import Difficulty, GameMode
+
+def test_scores_survive_a_reopen(tmp_path):
+    path = str(tmp_path / "scores.db")
+    store = ScoreStore(path, legacy_path=None)
+    assert store.error is None
+    assert store.submit(Difficulty.HARD, GameMode.WALLS, "ann", 30, 3, played_at=1.0)
+    assert not store.submit(Difficulty.HARD, GameMode.WALLS, "bob", 20, 2, played_at=2.0)
+    store.close()
+    assert not store.writer.is_alive()
+
+    reopened = ScoreStore(path, legacy_path=None)
+    reopened.close()
+    assert [(e.name, e.score, e.level) for e in reopened.top(Difficulty.HARD, GameMode.WALLS)] == [
+        ("ann", 30, 3), ("bob", 20, 2)]
+    assert reopened.best(Difficulty.HARD, GameMode.WALLS) == 30
+    assert reopened.best(Difficulty.EASY, GameMode.WALLS) == 0
+
+def test_flush_writes_queued_scores(tmp_path):
+    path = str(tmp_path / "scores.db")
+    store = ScoreStore(path, legacy_path=None)
+    for score in range(50):
+        store.submit(Difficulty.EASY, GameMode.CLASSIC, "p", score, 1, played_at=score)
+    store.flush()
+    other = ScoreStore(path, legacy_path=None, top_n=3)
+    other.close()
+    store.close()
+    assert [e.score for e in other.top(Difficulty.EASY, GameMode.CLASSIC)] == [49, 48, 47]
+
+def test_leaderboard_order_and_size(tmp_path):
+    store = ScoreStore(None, top_n=3)
+    store.submit(Difficulty.NORMAL, GameMode.CLASSIC, "a", 10, 1, played_at=1.0)
+    store.submit(Difficulty.NORMAL, GameMode.CLASSIC, "b", 30, 1, played_at=2.0)
+    store.submit(Difficulty.NORMAL, GameMode.CLASSIC, "c", 10, 1, played_at=3.0)
+    store.submit(Difficulty.NORMAL, GameMode.CLASSIC, "d", 5, 1, played_at=4.0)
+    store.submit(Difficulty.NORMAL, GameMode.CLASSIC, "e", 20, 1, played_at=5.0)
+    # Best first; the earlier of two equal scores ranks higher
+    assert [e.name for e in store.top(Difficulty.NORMAL, GameMode.CLASSIC)] == ["b", "e", "a"]
+    assert store.top(Difficulty.NORMAL, GameMode.OBSTACLES) == []
+
+    # The database orders ties the same way as the cache
+    path = str(tmp_path / "scores.db")
+    stored = ScoreStore(path, legacy_path=None)
+    for name, score, played_at in [("a", 10, 1.0), ("b", 30, 2.0), ("c", 10, 3.0), ("e", 20, 5.0)]:
+        stored.submit(Difficulty.NORMAL, GameMode.CLASSIC, name, score, 1, played_at=played_at)
+    stored.close()
+    reopened = ScoreStore(path, legacy_path=None, top_n=3)
+    reopened.close()
+    assert [e.name for e in reopened.top(Difficulty.NORMAL, GameMode.CLASSIC)] == ["b", "e", "a"]
+
+def test_legacy_scores_are_imported_once(tmp_path):
+    legacy = tmp_path / "high_scores.json"
+    legacy.write_text(json.dumps({"Hard_Extreme": 120, "Easy_Classic": 40, "Bogus_Classic": 99}))
+    path = str(tmp_path / "scores.db")
+    store = ScoreStore(path, legacy_path=str(legacy))
+    store.close()
+    assert store.best(Difficulty.HARD, GameMode.EXTREME) == 120
+    assert store.best(Difficulty.EASY, GameMode.CLASSIC) == 40
+    assert store.top(Difficulty.HARD, GameMode.EXTREME)[0].name == "-"
+
+    reopened = ScoreStore(path, legacy_path=str(legacy))
+    reopened.close()
+    assert len(reopened.top(Difficulty.HARD, GameMode.EXTREME)) == 1
+
+def test_unreadable_database_falls_back_to_memory(tmp_path):
+    path = tmp_path / "scores.db"
+    path.write_bytes(b"this is not a database" * 100)
+    store = ScoreStore(str(path), legacy_path=None)
+    assert store.error is not None
+    assert store.writer is None
+    assert store.submit(Difficulty.HARD, GameMode.CLASSIC, "ann", 10, 1)
+    assert store.best(Difficulty.HARD, GameMode.CLASSIC) == 10
+    store.flush()
+    store.close()
+    assert path.read_bytes() == b"this is not a database" * 100
+
+def test_memory_store_writes_nothing(tmp_path):
+    store = ScoreStore(None)
+    store.submit(Difficulty.EASY, GameMode.CLASSIC, "ann", 10, 1)
+    store.close()
+    assert store.error is None
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,45 @@
+import random
+
+import numpy as np
+import pytest
+
+from snake_batch import DIRECTIONS, SnakeBatch
+from snake_engine import OBSTACLE, OPPOSITE, Difficulty, GameMode, SnakeEngine
+
+BOARDS = 6
+TICKS = 600
+
+def greedy_action(engine, rng):
+    """Index of a move toward the food that does not collide at once, with some noise."""
+    head_x, head_y = engine.snake[0]
+    food_x, food_y = engine.food_position
+    options = []
+    for index, direction in enumerate(DIRECTIONS):
+        if direction == OPPOSITE[engine.direction]:
+            continue
+        position = (head_x + direction.value[0], head_y + direction.value[1])
+        if engine.check_collision(position):
+            continue
+        options.append((abs(position[0] - food_x) + abs(position[1] - food_y) + 3 * rng.random(), index))
+    return min(options)[1] if options else -1
+
+@pytest.mark.parametrize("game_mode", list(GameMode))
+def test_batch_matches_engine(game_mode):
+    batch = SnakeBatch(BOARDS, Difficulty.HARD, game_mode, seed=100)
+    engines = [SnakeEngine(Difficulty.HARD, game_mode, seed=100 + i) for i in range(BOARDS)]
+    rng = random.Random(5)
+    for _ in range(TICKS):
+        actions = np.array([greedy_action(engine, rng) for engine in engines])
+        _, rewards, dones = batch.step(actions)
+        for b, engine in enumerate(engines):
+            action = actions[b]
+            _, reward, done = engine.step(DIRECTIONS[action] if action >= 0 else None)
+            assert (reward, done) == (rewards[b], dones[b])
+            if done:
+                assert engine.score == batch.last_score[b]
+                engine.reset_game()
+            assert list(engine.snake) == batch.snake(b)
+            assert engine.food_position == (batch.food[b] % engine.width, batch.food[b] // engine.width)
+            assert (engine.score, engine.level) == (batch.score[b], batch.level[b])
+            obstacles = {(int(x), int(y)) for y, x in np.argwhere(batch.grid[b] == OBSTACLE)}
+            assert obstacles == set(engine.obstacles)
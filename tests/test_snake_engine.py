@@ -0,0 +1,75 @@
+import pytest
+
+from snake_engine import EMPTY, OBSTACLE, OBSTACLE_TRIES, WALL, Difficulty, GameMode, SnakeEngine
+from snake_multiplayer import RoomEngine
+
+def sparse_engine(game_mode=GameMode.CLASSIC, seed=1):
+    engine = SnakeEngine(Difficulty.NORMAL, game_mode, seed=seed, width=300, height=300)
+    assert engine.sparse
+    return engine
+
+def fill(engine, left, top, right, bottom, value=OBSTACLE):
+    for y in range(top, bottom):
+        for x in range(left, right):
+            engine.grid[y * engine.width + x] = value
+
+def test_free_cell_in_a_full_area_is_none():
+    engine = sparse_engine()
+    fill(engine, 10, 10, 30, 30)
+    assert engine.sample_free_cell(10, 10, 30, 30) is None
+    # One free cell left is found by the scan, whatever the random picks hit
+    engine.grid[17 * engine.width + 23] = EMPTY
+    for _ in range(20):
+        assert engine.sample_free_cell(10, 10, 30, 30) == (23, 17)
+    engine.food_position = (23, 17)
+    assert engine.sample_free_cell(10, 10, 30, 30) is None
+
+def test_free_cell_keeps_off_room_food():
+    engine = RoomEngine(Difficulty.NORMAL, GameMode.CLASSIC, seed=2, width=300, height=300)
+    fill(engine, 50, 50, 60, 60)
+    engine.grid[55 * engine.width + 55] = EMPTY
+    engine.grid[56 * engine.width + 56] = EMPTY
+    engine.foods.append((55, 55))
+    assert engine.sample_free_cell(50, 50, 60, 60) == (56, 56)
+    engine.foods.append((56, 56))
+    assert engine.sample_free_cell(50, 50, 60, 60) is None
+
+def open_cells_reachable(engine):
+    """Flood-fill from the head; return True if every cell but walls and obstacles is reached."""
+    grid, width = engine.grid, engine.width
+    open_cells = {cell for cell in range(width * engine.height) if grid[cell] not in (WALL, OBSTACLE)}
+    x, y = engine.snake[0]
+    seen = {y * width + x}
+    stack = list(seen)
+    while stack:
+        cell = stack.pop()
+        x, y = cell % width, cell // width
+        for nx, ny in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+            # Classic boards wrap around, but EXTREME has walls all round
+            if 0 <= nx < width and 0 <= ny < engine.height:
+                neighbour = ny * width + nx
+                if neighbour in open_cells and neighbour not in seen:
+                    seen.add(neighbour)
+                    stack.append(neighbour)
+    return seen == open_cells
+
+@pytest.mark.parametrize("size", [(12, 10), (20, 15), (40, 30)])
+def test_obstacles_never_cut_off_free_cells(size):
+    seeds = 150 if size[0] < 40 else 25
+    for seed in range(seeds):
+        engine = SnakeEngine(Difficulty.HARD, GameMode.EXTREME, seed=seed, width=size[0], height=size[1])
+        assert open_cells_reachable(engine), seed
+        for _ in range(30):
+            engine.level_up()
+            assert open_cells_reachable(engine), (seed, engine.level)
+        # High levels ask for far more obstacles than fit
+        assert len(engine.obstacles) < (size[0] - 2) * (size[1] - 2)
+        assert engine.food_position not in engine.obstacles
+
+@pytest.mark.parametrize("width", [40, 300])
+def test_obstacle_tries_bound_placement(width, monkeypatch):
+    engine = SnakeEngine(Difficulty.HARD, GameMode.OBSTACLES, seed=5, width=width, height=width)
+    tried = []
+    monkeypatch.setattr(engine, "obstacle_allowed", lambda cell: tried.append(cell) or False)
+    assert engine.generate_obstacles(50) == []
+    assert len(tried) == OBSTACLE_TRIES
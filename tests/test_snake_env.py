@@ -0,0 +1,117 @@
+import numpy as np
+import pytest
+
+from snake_autopilot import Autopilot
+from snake_engine import OBSTACLE, SNAKE, WALL, Difficulty, Direction, GameMode
+from snake_env import (
+    ACTIONS, FOOD_PLANE, HEAD_PLANE, OBSTACLE_PLANE, SNAKE_PLANE, WALL_PLANE, SharedVectorEnv, SnakeEnv)
+
+def expected_planes(engine):
+    grid = np.frombuffer(engine.grid, dtype=np.uint8).reshape(engine.height, engine.width)
+    planes = np.zeros((5, engine.height, engine.width), dtype=np.uint8)
+    planes[SNAKE_PLANE] = grid == SNAKE
+    planes[WALL_PLANE] = grid == WALL
+    planes[OBSTACLE_PLANE] = grid == OBSTACLE
+    x, y = engine.snake[0]
+    planes[HEAD_PLANE, y, x] = 1
+    if engine.food_position is not None:
+        x, y = engine.food_position
+        planes[FOOD_PLANE, y, x] = 1
+    return planes
+
+@pytest.mark.parametrize("game_mode", list(GameMode))
+def test_observation_matches_the_engine(game_mode):
+    env = SnakeEnv(Difficulty.HARD, game_mode, seed=4, width=20, height=15)
+    observation, _ = env.reset()
+    autopilot = Autopilot(20, 15)
+    rng = np.random.default_rng(0)
+    games = 0
+    for _ in range(3000):
+        engine = env.engine
+        # Mostly the autopilot, so games last long enough to gain obstacles and levels
+        if rng.random() < 0.1:
+            action = int(rng.integers(-1, len(ACTIONS)))
+        else:
+            action = ACTIONS.index(autopilot.next_direction(engine))
+        observation, _, terminated, truncated, _ = env.step(action)
+        assert (observation["planes"] == expected_planes(engine)).all()
+        assert observation["direction"].tolist() == [int(d == engine.direction) for d in ACTIONS]
+        if terminated or truncated:
+            games += 1
+            observation, _ = env.reset()
+            assert (observation["planes"] == expected_planes(env.engine)).all()
+    assert games > 0
+
+def test_eating_pays_the_level():
+    env = SnakeEnv(Difficulty.NORMAL, GameMode.CLASSIC, seed=1, width=20, height=15)
+    env.reset()
+    autopilot = Autopilot(20, 15)
+    paid = []
+    while len(paid) < 15:
+        level = env.engine.level
+        eaten = env.engine.food_eaten
+        _, reward, terminated, truncated, info = env.step(ACTIONS.index(autopilot.next_direction(env.engine)))
+        assert not (terminated or truncated)
+        if env.engine.food_eaten > eaten:
+            assert reward == pytest.approx(level)
+            paid.append(level)
+        else:
+            assert reward == 0
+    assert max(paid) > 1
+
+def test_dying_adds_the_death_reward():
+    env = SnakeEnv(Difficulty.EASY, GameMode.WALLS, seed=2, width=20, height=15, death_reward=-5.0)
+    env.reset()
+    terminated = False
+    while not terminated:
+        _, reward, terminated, truncated, info = env.step(ACTIONS.index(Direction.UP))
+    assert info["death_cause"] is not None
+    assert reward == -5.0
+
+    # A finished game does not move on or pay again
+    state = (list(env.engine.snake), env.engine.ticks, env.engine.score)
+    with pytest.raises(RuntimeError):
+        env.step(-1)
+    assert (list(env.engine.snake), env.engine.ticks, env.engine.score) == state
+    env.reset()
+    assert env.step(-1)[2] is False
+
+def test_truncated_game_needs_a_reset():
+    env = SnakeEnv(seed=3, width=20, height=15, max_ticks=5)
+    env.reset()
+    autopilot = Autopilot(20, 15)
+    for _ in range(5):
+        _, _, terminated, truncated, _ = env.step(ACTIONS.index(autopilot.next_direction(env.engine)))
+    assert truncated and not terminated
+    with pytest.raises(RuntimeError):
+        env.step(-1)
+
+def test_vector_env_matches_independent_envs():
+    num_envs, seed = 5, 11
+    options = {"difficulty": Difficulty.HARD, "game_mode": GameMode.EXTREME,
+               "width": 12, "height": 10, "max_ticks": 60}
+    envs = [SnakeEnv(seed=seed + i, **options) for i in range(num_envs)]
+    for env in envs:
+        env.reset()
+    rng = np.random.default_rng(seed)
+    finished = 0
+    with SharedVectorEnv(num_envs, seed=seed, workers=2, **options) as vector:
+        observation, info = vector.reset()
+        for env, planes in zip(envs, observation["planes"]):
+            assert (planes == env.planes).all()
+        for _ in range(300):
+            actions = rng.integers(-1, len(ACTIONS), num_envs, dtype=np.int8)
+            observation, rewards, terminated, truncated, info = vector.step(actions)
+            for i, env in enumerate(envs):
+                _, reward, ended, cut, _ = env.step(int(actions[i]))
+                assert rewards[i] == pytest.approx(reward)
+                assert (terminated[i], truncated[i]) == (ended, cut)
+                if ended or cut:
+                    finished += 1
+                    assert (info["final_score"][i], info["final_level"][i]) == (env.engine.score,
+                                                                                env.engine.level)
+                    env.reset()
+                assert (observation["planes"][i] == env.planes).all()
+                assert (observation["direction"][i] == env.direction).all()
+                assert (info["score"][i], info["level"][i]) == (env.engine.score, env.engine.level)
+    assert finished > num_envs
@@ -0,0 +1,58 @@
+import asyncio
+
+import snake_multiplayer
+from snake_engine import Difficulty, GameMode
+from snake_multiplayer import (
+    JOIN, TURN, SnakeServer, frame, read_message, run_bot, write_text)
+
+def join_message(room, name):
+    join = bytearray([JOIN])
+    write_text(join, room)
+    write_text(join, name)
+    return bytes(join)
+
+# Each is sent by one misbehaving client, which the server should hang up on
+MALFORMED = [
+    [bytes([JOIN])],
+    [bytes([JOIN, 0x80])],
+    [bytes([JOIN, 200]) + b"lobby"],
+    [bytes([JOIN, 2]) + b"\xff\xfe" + bytes([3]) + b"bad"],
+    [join_message("lobby", "turns"), bytes([TURN, 9])],
+    [join_message("lobby", "turns"), bytes([TURN])],
+    [join_message("lobby", "turns"), b"?" * 10],
+]
+
+async def misbehave(host, port, messages):
+    reader, writer = await asyncio.open_connection(host, port)
+    for message in messages:
+        await asyncio.sleep(0.2)
+        writer.write(frame(message))
+    # The server closes the connection; skip the WELCOME and any ticks
+    while await asyncio.wait_for(read_message(reader, 1 << 26), 5) is not None:
+        pass
+    writer.close()
+    return True
+
+async def play_room(seconds):
+    server = SnakeServer(Difficulty.HARD, GameMode.OBSTACLES, 30, 20, seed=3)
+    listener = await server.serve("127.0.0.1", 0)
+    host, port = "127.0.0.1", listener.sockets[0].getsockname()[1]
+    try:
+        bots = [run_bot(host, port, "lobby", f"bot-{b}", seconds) for b in range(3)]
+        clients = [misbehave(host, port, messages) for messages in MALFORMED]
+        results = await asyncio.gather(*bots, *clients)
+        # Still serving after all that
+        late = await run_bot(host, port, "lobby", "late", 0.5)
+    finally:
+        listener.close()
+        await listener.wait_closed()
+    return results[:3] + [late], results[3:]
+
+def test_malformed_clients_are_dropped(monkeypatch):
+    monkeypatch.setattr(snake_multiplayer, "CHECK_INTERVAL", 4)
+    states, dropped = asyncio.run(play_room(2.0))
+    assert all(dropped)
+    for state in states:
+        assert state.checks > 0
+        assert state.mismatches == 0
+    assert states[-1].tick > 0
@@ -0,0 +1,59 @@
+import pytest
+
+from snake_autopilot import Autopilot
+from snake_engine import Difficulty, GameMode, SnakeEngine
+from snake_replay import _BOARD, _HEADER, Replay, ReplayError, ReplayRecorder, simulate, verify
+
+def record_game(game_mode, connected_obstacles=True, ticks=400, size=(40, 30)):
+    engine = SnakeEngine(Difficulty.HARD, game_mode, seed=7, width=size[0], height=size[1])
+    engine.connected_obstacles = connected_obstacles
+    engine.reset_game()
+    recorder = ReplayRecorder(engine)
+    autopilot = Autopilot(engine.width, engine.height)
+    while not engine.game_over and engine.ticks < ticks:
+        engine.step(autopilot.next_direction(engine))
+        recorder.record()
+    return engine, recorder.finish()
+
+def same_replay(a, b):
+    return (a.seed, a.difficulty, a.game_mode, a.width, a.height, a.turns, a.ticks, a.score,
+            a.connected_obstacles) == (b.seed, b.difficulty, b.game_mode, b.width, b.height,
+                                       b.turns, b.ticks, b.score, b.connected_obstacles)
+
+@pytest.mark.parametrize("game_mode", list(GameMode))
+def test_round_trip_replays_the_game(game_mode):
+    engine, replay = record_game(game_mode)
+    loaded = Replay.from_bytes(replay.to_bytes())
+    assert same_replay(loaded, replay)
+    assert verify(loaded)
+    end = simulate(loaded)
+    assert list(end.snake) == list(engine.snake)
+    assert end.obstacles == engine.obstacles
+
+def test_older_obstacle_placement_round_trips():
+    engine, replay = record_game(GameMode.EXTREME, connected_obstacles=False)
+    loaded = Replay.from_bytes(replay.to_bytes())
+    assert not loaded.connected_obstacles
+    assert simulate(loaded).obstacles == engine.obstacles
+
+def test_board_size_round_trips():
+    _, replay = record_game(GameMode.WALLS, size=(60, 20))
+    loaded = Replay.from_bytes(replay.to_bytes())
+    assert (loaded.width, loaded.height) == (60, 20)
+    assert verify(loaded)
+
+def test_corrupt_data_is_rejected():
+    _, replay = record_game(GameMode.CLASSIC)
+    data = replay.to_bytes()
+    with pytest.raises(ReplayError):
+        Replay.from_bytes(b"XXXX" + data[4:])
+    with pytest.raises(ReplayError):
+        Replay.from_bytes(data[:10])
+    # Board sizes outside the engine's limits
+    offset = _HEADER.size
+    for width, height in ((0, 30), (40, 4), (2001, 30), (40, 65535)):
+        with pytest.raises(ReplayError):
+            Replay.from_bytes(data[:offset] + _BOARD.pack(width, height) + data[offset + _BOARD.size:])
+    for size in (5, 2000):
+        loaded = Replay.from_bytes(data[:offset] + _BOARD.pack(size, size) + data[offset + _BOARD.size:])
+        assert (loaded.width, loaded.height) == (size, size)
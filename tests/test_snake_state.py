@@ -0,0 +1,81 @@
+import random
+
+import pytest
+
+from snake_autopilot import Autopilot
+from snake_engine import CellPool, Direction, Difficulty, GameMode, SnakeEngine
+from snake_state import RewindBuffer, Snapshot, SnapshotError
+
+def state(engine):
+    """Everything that decides how a game carries on."""
+    pools = None
+    if not engine.sparse:
+        pools = (list(engine.free_inner.cells), dict(engine.free_inner.slots),
+                 list(engine.free_edge.cells), dict(engine.free_edge.slots))
+    grid = bytes(engine.grid) if not engine.sparse else dict(engine.grid.cells)
+    return (list(engine.snake), engine.direction, engine.next_direction, engine.score, engine.level,
+            engine.food_eaten, engine.food_for_next_level, engine.ticks, engine.game_over,
+            engine.won, engine.death_cause, engine.food_position, list(engine.obstacles),
+            grid, pools, engine.rng.getstate())
+
+def play(engine, ticks, seed=0):
+    """Mostly follow the autopilot, with some random turns; only random turns on huge boards."""
+    rng = random.Random(seed)
+    autopilot = None if engine.sparse else Autopilot(engine.width, engine.height)
+    for _ in range(ticks):
+        if engine.game_over:
+            break
+        if autopilot and rng.random() < 0.9:
+            engine.step(autopilot.next_direction(engine))
+        else:
+            engine.step(rng.choice(list(Direction)))
+
+def test_cell_pool_journal_undo():
+    pool = CellPool(range(10))
+    before = (list(pool.cells), dict(pool.slots))
+    pool.journal = journal = []
+    rng = random.Random(1)
+    for _ in range(200):
+        cell = rng.randrange(20)
+        if rng.random() < 0.5:
+            pool.add(cell)
+        else:
+            pool.discard(cell)
+    pool.journal = None
+    for owner, cell, slot in reversed(journal):
+        owner.undo(cell, slot)
+    assert (pool.cells, pool.slots) == before
+
+@pytest.mark.parametrize("game_mode", list(GameMode))
+@pytest.mark.parametrize("size", [(40, 30), (300, 300)], ids=["dense", "sparse"])
+def test_snapshot_restores_and_continues(game_mode, size):
+    engine = SnakeEngine(Difficulty.HARD, game_mode, seed=3, width=size[0], height=size[1])
+    play(engine, 300)
+    restored = SnakeEngine(Difficulty.EASY, GameMode.CLASSIC, width=size[0], height=size[1])
+    Snapshot.from_bytes(Snapshot.capture(engine).to_bytes()).restore(restored)
+    assert state(restored) == state(engine)
+    play(engine, 300, seed=1)
+    play(restored, 300, seed=1)
+    assert state(restored) == state(engine)
+
+def test_corrupt_snapshot_is_rejected():
+    data = Snapshot.capture(SnakeEngine(seed=1)).to_bytes()
+    with pytest.raises(SnapshotError):
+        Snapshot.from_bytes(b"XXXX" + data[4:])
+
+@pytest.mark.parametrize("game_mode", list(GameMode))
+def test_rewind_restores_earlier_ticks(game_mode):
+    engine = SnakeEngine(Difficulty.HARD, game_mode, seed=11)
+    buffer = RewindBuffer(engine, 50)
+    autopilot = Autopilot()
+    rng = random.Random(2)
+    history = [state(engine)]
+    while not engine.game_over and engine.ticks < 1500:
+        buffer.step(autopilot.next_direction(engine) if rng.random() < 0.9 else rng.choice(list(Direction)))
+        history.append(state(engine))
+        if rng.random() < 0.05:
+            undone = buffer.rewind(rng.randint(1, 60))
+            assert 1 <= undone <= 50
+            del history[len(history) - undone:]
+            assert state(engine) == history[-1]
+            autopilot = Autopilot()